@@ -0,0 +1,50 @@
+"""
+Entorno de Alembic: migraciones sobre los modelos ORM de app/adapters/database
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.db.base import Base
+from app.db.config import DATABASE_URL
+import app.adapters.database.models  # noqa: F401 - registra las tablas en Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    # Sin desactivar los loggers ya creados: la app aplica migraciones al arrancar (preparar_esquema)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def url_base_datos() -> str:
+    """URL de la configuración de Alembic si se indicó (-x / set_main_option), o la de la app"""
+    return config.get_main_option("sqlalchemy.url") or DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)"""
+    context.configure(
+        url=url_base_datos(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(url_base_datos(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,154 @@
+"""Esquema base: tablas tal como las creaba create_all antes de las migraciones
+
+Reproduce también las restricciones y los índices que añadía la segunda copia de
+los modelos en app/adapters/database/__init__.py (únicos por columna en reservas,
+índices ix_<tabla>_id), para que 'alembic stamp 0001' describa fielmente una base
+de datos creada entonces. Las revisiones siguientes la llevan al esquema actual.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 06:28:58
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('bloques_horarios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hora_inicio', sa.Time(), nullable=False),
+    sa.Column('hora_fin', sa.Time(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_bloques_horarios_id', 'bloques_horarios', ['id'], unique=False)
+    op.create_index('ix_bloques_horarios_inicio_fin', 'bloques_horarios', ['hora_inicio', 'hora_fin'], unique=False)
+    op.create_table('citas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('inicio', sa.DateTime(), nullable=False),
+    sa.Column('fin', sa.DateTime(), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('google_event_id', sa.String(length=255), nullable=False),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('google_event_id', name='citas_google_event_id_key')
+    )
+    op.create_index('ix_citas_email', 'citas', ['email'], unique=False)
+    op.create_index('ix_citas_google_event_id', 'citas', ['google_event_id'], unique=True)
+    op.create_index('ix_citas_id', 'citas', ['id'], unique=False)
+    op.create_index('ix_citas_inicio', 'citas', ['inicio'], unique=False)
+    op.create_index('ix_citas_inicio_fin', 'citas', ['inicio', 'fin'], unique=False)
+    op.create_table('espacios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('nombre', name='espacios_nombre_key')
+    )
+    op.create_index('ix_espacios_id', 'espacios', ['id'], unique=False)
+    op.create_table('fisioterapeutas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('nombre', name='fisioterapeutas_nombre_key')
+    )
+    op.create_index('ix_fisioterapeutas_id', 'fisioterapeutas', ['id'], unique=False)
+    op.create_table('maquinas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codigo', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('codigo', name='maquinas_codigo_key')
+    )
+    op.create_index('ix_maquinas_codigo', 'maquinas', ['codigo'], unique=True)
+    op.create_index('ix_maquinas_id', 'maquinas', ['id'], unique=False)
+    op.create_table('pacientes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('telefono', sa.Integer(), nullable=True),
+    sa.Column('fecha_nacimiento', sa.Date(), nullable=True),
+    sa.Column('centro_terapia_id', sa.Integer(), nullable=True),
+    sa.Column('usa_magneto', sa.Boolean(), nullable=True),
+    sa.Column('requiere_tratamiento_especial', sa.Boolean(), nullable=True),
+    sa.Column('seguro_medico', sa.Boolean(), nullable=True),
+    sa.Column('aseguradora', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pacientes_created_at', 'pacientes', ['created_at'], unique=False)
+    op.create_index('ix_pacientes_id', 'pacientes', ['id'], unique=False)
+    op.create_index('ix_pacientes_nombre', 'pacientes', ['nombre'], unique=False)
+    op.create_index('ix_pacientes_nombre_created', 'pacientes', ['nombre', 'created_at'], unique=False)
+    op.create_table('diagnosticos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('paciente_id', sa.Integer(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('treatment', sa.String(length=255), nullable=False),
+    sa.ForeignKeyConstraint(['paciente_id'], ['pacientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_diagnosticos_id', 'diagnosticos', ['id'], unique=False)
+    op.create_index('ix_diagnosticos_paciente', 'diagnosticos', ['paciente_id'], unique=False)
+    op.create_table('reservas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('paciente_id', sa.Integer(), nullable=False),
+    sa.Column('fisioterapeuta_id', sa.Integer(), nullable=False),
+    sa.Column('espacio_id', sa.Integer(), nullable=False),
+    sa.Column('bloque_id', sa.Integer(), nullable=False),
+    sa.Column('maquina_id', sa.Integer(), nullable=True),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['bloque_id'], ['bloques_horarios.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['espacio_id'], ['espacios.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['fisioterapeuta_id'], ['fisioterapeutas.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['maquina_id'], ['maquinas.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['paciente_id'], ['pacientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('bloque_id', name='reservas_bloque_id_key'),
+    sa.UniqueConstraint('espacio_id', name='reservas_espacio_id_key'),
+    sa.UniqueConstraint('fecha', name='reservas_fecha_key')
+    )
+    op.create_index('ix_reservas_fecha', 'reservas', ['fecha'], unique=False)
+    op.create_index('ix_reservas_fisio_fecha', 'reservas', ['fisioterapeuta_id', 'fecha'], unique=False)
+    op.create_index('ix_reservas_id', 'reservas', ['id'], unique=False)
+    op.create_index('ix_reservas_paciente_fecha', 'reservas', ['paciente_id', 'fecha'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservas_paciente_fecha', table_name='reservas')
+    op.drop_index('ix_reservas_id', table_name='reservas')
+    op.drop_index('ix_reservas_fisio_fecha', table_name='reservas')
+    op.drop_index('ix_reservas_fecha', table_name='reservas')
+    op.drop_table('reservas')
+    op.drop_index('ix_diagnosticos_paciente', table_name='diagnosticos')
+    op.drop_index('ix_diagnosticos_id', table_name='diagnosticos')
+    op.drop_table('diagnosticos')
+    op.drop_index('ix_pacientes_nombre_created', table_name='pacientes')
+    op.drop_index('ix_pacientes_nombre', table_name='pacientes')
+    op.drop_index('ix_pacientes_id', table_name='pacientes')
+    op.drop_index('ix_pacientes_created_at', table_name='pacientes')
+    op.drop_table('pacientes')
+    op.drop_index('ix_maquinas_id', table_name='maquinas')
+    op.drop_index('ix_maquinas_codigo', table_name='maquinas')
+    op.drop_table('maquinas')
+    op.drop_index('ix_fisioterapeutas_id', table_name='fisioterapeutas')
+    op.drop_table('fisioterapeutas')
+    op.drop_index('ix_espacios_id', table_name='espacios')
+    op.drop_table('espacios')
+    op.drop_index('ix_citas_inicio_fin', table_name='citas')
+    op.drop_index('ix_citas_inicio', table_name='citas')
+    op.drop_index('ix_citas_id', table_name='citas')
+    op.drop_index('ix_citas_google_event_id', table_name='citas')
+    op.drop_index('ix_citas_email', table_name='citas')
+    op.drop_table('citas')
+    op.drop_index('ix_bloques_horarios_inicio_fin', table_name='bloques_horarios')
+    op.drop_index('ix_bloques_horarios_id', table_name='bloques_horarios')
+    op.drop_table('bloques_horarios')
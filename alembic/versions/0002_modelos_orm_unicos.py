@@ -0,0 +1,51 @@
+"""Modelos ORM únicos: quitar lo que añadía la segunda copia de los modelos
+
+Los únicos por columna de reservas (una sola reserva por fecha, por bloque y por
+espacio en toda la tabla) y los índices ix_<tabla>_id, redundantes con la clave
+primaria, venían de las clases duplicadas de app/adapters/database/__init__.py.
+En citas y maquinas queda solo el índice único.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 06:28:59
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLAS_CON_INDICE_ID = ('bloques_horarios', 'citas', 'espacios', 'fisioterapeutas', 'maquinas', 'pacientes', 'diagnosticos', 'reservas')
+
+
+def upgrade() -> None:
+    for tabla in TABLAS_CON_INDICE_ID:
+        op.drop_index(f'ix_{tabla}_id', table_name=tabla)
+    with op.batch_alter_table('reservas') as batch_op:
+        batch_op.drop_constraint('reservas_bloque_id_key', type_='unique')
+        batch_op.drop_constraint('reservas_espacio_id_key', type_='unique')
+        batch_op.drop_constraint('reservas_fecha_key', type_='unique')
+    with op.batch_alter_table('maquinas') as batch_op:
+        batch_op.drop_constraint('maquinas_codigo_key', type_='unique')
+    with op.batch_alter_table('citas') as batch_op:
+        batch_op.drop_constraint('citas_google_event_id_key', type_='unique')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('citas') as batch_op:
+        batch_op.create_unique_constraint('citas_google_event_id_key', ['google_event_id'])
+    with op.batch_alter_table('maquinas') as batch_op:
+        batch_op.create_unique_constraint('maquinas_codigo_key', ['codigo'])
+    with op.batch_alter_table('reservas') as batch_op:
+        batch_op.create_unique_constraint('reservas_fecha_key', ['fecha'])
+        batch_op.create_unique_constraint('reservas_espacio_id_key', ['espacio_id'])
+        batch_op.create_unique_constraint('reservas_bloque_id_key', ['bloque_id'])
+    for tabla in TABLAS_CON_INDICE_ID:
+        op.create_index(f'ix_{tabla}_id', tabla, ['id'], unique=False)
@@ -0,0 +1,67 @@
+"""Reservas exclusivas: un espacio y una máquina por fecha y bloque
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 06:29:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Recursos que las restricciones hacen exclusivos por (fecha, bloque)
+RECURSOS = ("espacio_id", "maquina_id")
+
+
+def reservas_en_conflicto(conn) -> list:
+    """Grupos (fecha, bloque_id, recurso, id del recurso, ids de reserva) con más de una reserva"""
+    conflictos = []
+    for recurso in RECURSOS:
+        filas = conn.execute(sa.text(
+            f"SELECT r.fecha, r.bloque_id, r.{recurso}, r.id FROM reservas r"
+            f" JOIN (SELECT fecha, bloque_id, {recurso} FROM reservas"
+            f"       WHERE {recurso} IS NOT NULL"
+            f"       GROUP BY fecha, bloque_id, {recurso} HAVING COUNT(*) > 1) d"
+            f" ON d.fecha = r.fecha AND d.bloque_id = r.bloque_id AND d.{recurso} = r.{recurso}"
+            f" ORDER BY r.fecha, r.bloque_id, r.{recurso}, r.id"
+        )).all()
+        grupos = {}
+        for fecha, bloque_id, recurso_id, reserva_id in filas:
+            grupos.setdefault((fecha, bloque_id, recurso_id), []).append(reserva_id)
+        conflictos += [(*clave[:2], recurso, clave[2], ids) for clave, ids in grupos.items()]
+    return conflictos
+
+
+def upgrade() -> None:
+    # Sin las restricciones pudieron confirmarse reservas dobles del mismo espacio o
+    # máquina. No se borra ninguna: la migración se detiene con el detalle para que
+    # se reasignen o cancelen a mano antes de volver a ejecutarla
+    conflictos = reservas_en_conflicto(op.get_bind())
+    if conflictos:
+        detalle = "\n".join(
+            f"  fecha={fecha} bloque_id={bloque_id} {recurso}={recurso_id}: reservas {ids}"
+            for fecha, bloque_id, recurso, recurso_id, ids in conflictos
+        )
+        raise RuntimeError(
+            f"Hay {len(conflictos)} espacios o máquinas reservados más de una vez en el mismo "
+            f"bloque; resuélvelos (reasignar o cancelar reservas) y vuelve a migrar:\n{detalle}"
+        )
+    
+    with op.batch_alter_table('reservas') as batch_op:
+        batch_op.create_unique_constraint('uq_reservas_fecha_bloque_espacio', ['fecha', 'bloque_id', 'espacio_id'])
+        batch_op.create_unique_constraint('uq_reservas_fecha_bloque_maquina', ['fecha', 'bloque_id', 'maquina_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reservas') as batch_op:
+        batch_op.drop_constraint('uq_reservas_fecha_bloque_maquina', type_='unique')
+        batch_op.drop_constraint('uq_reservas_fecha_bloque_espacio', type_='unique')
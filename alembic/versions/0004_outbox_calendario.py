@@ -0,0 +1,46 @@
+"""Outbox de Google Calendar: tabla outbox_calendario y citas.google_event_id opcional
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 06:29:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL hasta que el worker del outbox crea el evento en Google Calendar
+    with op.batch_alter_table('citas') as batch_op:
+        batch_op.alter_column('google_event_id', existing_type=sa.String(length=255), nullable=True)
+    op.create_table('outbox_calendario',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cita_id', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('proximo_intento', sa.DateTime(), nullable=False),
+    sa.Column('ultimo_error', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cita_id'], ['citas.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_calendario_estado_proximo', 'outbox_calendario', ['estado', 'proximo_intento'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_calendario_estado_proximo', table_name='outbox_calendario')
+    op.drop_table('outbox_calendario')
+    # Las citas sin evento no admiten la restricción NOT NULL
+    op.execute("DELETE FROM citas WHERE google_event_id IS NULL")
+    with op.batch_alter_table('citas') as batch_op:
+        batch_op.alter_column('google_event_id', existing_type=sa.String(length=255), nullable=False)
@@ -0,0 +1,26 @@
+"""Paginación por cursor: índice (created_at, id) de pacientes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 06:29:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_pacientes_created_id', 'pacientes', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pacientes_created_id', table_name='pacientes')
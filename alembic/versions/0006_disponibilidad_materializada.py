@@ -0,0 +1,62 @@
+"""Disponibilidad materializada: disponibilidad_diaria y carga_fisioterapeuta_bloque
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 06:29:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('disponibilidad_diaria',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('bloque_id', sa.Integer(), nullable=False),
+    sa.Column('espacios_ocupados', sa.Integer(), nullable=False),
+    sa.Column('maquinas_en_uso', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['bloque_id'], ['bloques_horarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('fecha', 'bloque_id')
+    )
+    op.create_table('carga_fisioterapeuta_bloque',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('bloque_id', sa.Integer(), nullable=False),
+    sa.Column('fisioterapeuta_id', sa.Integer(), nullable=False),
+    sa.Column('pacientes', sa.Integer(), nullable=False),
+    sa.Column('pacientes_trato_especial', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['bloque_id'], ['bloques_horarios.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['fisioterapeuta_id'], ['fisioterapeutas.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('fecha', 'bloque_id', 'fisioterapeuta_id')
+    )
+    
+    # Carga inicial desde las reservas existentes (como reconstruir_disponibilidad).
+    # Las reservas que se confirmen mientras tanto no se cuentan: se bloquean hasta el commit
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.text("LOCK TABLE reservas IN SHARE MODE"))
+    op.execute(sa.text(
+        "INSERT INTO disponibilidad_diaria (fecha, bloque_id, espacios_ocupados, maquinas_en_uso) "
+        "SELECT fecha, bloque_id, COUNT(id), COUNT(maquina_id) FROM reservas "
+        "GROUP BY fecha, bloque_id"
+    ))
+    op.execute(sa.text(
+        "INSERT INTO carga_fisioterapeuta_bloque "
+        "(fecha, bloque_id, fisioterapeuta_id, pacientes, pacientes_trato_especial) "
+        "SELECT r.fecha, r.bloque_id, r.fisioterapeuta_id, COUNT(r.id), "
+        "COUNT(CASE WHEN p.requiere_tratamiento_especial THEN 1 END) "
+        "FROM reservas r LEFT OUTER JOIN pacientes p ON r.paciente_id = p.id "
+        "GROUP BY r.fecha, r.bloque_id, r.fisioterapeuta_id"
+    ))
+
+
+def downgrade() -> None:
+    op.drop_table('carga_fisioterapeuta_bloque')
+    op.drop_table('disponibilidad_diaria')
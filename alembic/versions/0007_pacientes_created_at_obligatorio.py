@@ -0,0 +1,36 @@
+"""pacientes.created_at obligatorio (clave de la paginación por cursor)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 09:12:40
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Un NULL no se puede comparar en (created_at, id) > (:v1, :v2): esas filas
+    # desaparecían de las páginas siguientes. Las que no tienen fecha toman la de
+    # la migración (UTC, como datetime.utcnow en el ORM)
+    op.execute(
+        sa.text("UPDATE pacientes SET created_at = :ahora WHERE created_at IS NULL")
+        .bindparams(ahora=datetime.utcnow())
+    )
+    with op.batch_alter_table('pacientes') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('pacientes') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
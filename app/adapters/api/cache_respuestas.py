@@ -0,0 +1,101 @@
+"""
+Caché de respuestas HTTP con ETag
+
+Guarda el cuerpo ya serializado de una respuesta junto con la versión de los
+datos con que se calculó. Mientras la versión no cambie (y no venza el TTL) la
+respuesta se sirve sin recalcular, y si el cliente envía el ETag en
+If-None-Match se contesta 304 sin cuerpo.
+
+El ETag es un hash del cuerpo: si tras un cambio de versión el resultado es el
+mismo, el cliente sigue recibiendo 304. Las entradas menos usadas se descartan
+al superar el límite de memoria.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from fastapi import Response
+
+from app.db.config import RESPUESTAS_CACHE_MAX_BYTES, RESPUESTAS_CACHE_TTL_SEGUNDOS
+
+
+@dataclass
+class EntradaRespuesta:
+    version: Hashable
+    etag: str
+    cuerpo: bytes
+    creada_en: float
+
+
+class CacheRespuestas:
+    """Caché LRU de cuerpos de respuesta acotada por bytes"""
+    
+    def __init__(self, max_bytes: int = RESPUESTAS_CACHE_MAX_BYTES, ttl: float = RESPUESTAS_CACHE_TTL_SEGUNDOS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartadas = 0
+        self._entradas: "OrderedDict[Hashable, EntradaRespuesta]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entradas)
+    
+    def obtener(self, clave: Hashable, version: Hashable) -> Optional[EntradaRespuesta]:
+        """Entrada vigente para la clave, o None si no existe, es de otra versión o venció"""
+        entrada = self._entradas.get(clave)
+        if entrada is None or entrada.version != version or time.monotonic() - entrada.creada_en > self.ttl:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada
+    
+    def guardar(self, clave: Hashable, version: Hashable, cuerpo: bytes) -> EntradaRespuesta:
+        entrada = EntradaRespuesta(
+            version=version,
+            etag=f'"{hashlib.sha1(cuerpo).hexdigest()}"',
+            cuerpo=cuerpo,
+            creada_en=time.monotonic()
+        )
+        self._quitar(clave)
+        if len(cuerpo) <= self.max_bytes:
+            self._entradas[clave] = entrada
+            self.bytes += len(cuerpo)
+            while self.bytes > self.max_bytes:
+                self._quitar(next(iter(self._entradas)))
+                self.descartadas += 1
+        return entrada
+    
+    def limpiar(self) -> None:
+        self._entradas.clear()
+        self.bytes = 0
+    
+    def _quitar(self, clave: Hashable) -> None:
+        entrada = self._entradas.pop(clave, None)
+        if entrada is not None:
+            self.bytes -= len(entrada.cuerpo)
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara el ETag con la cabecera If-None-Match (comparación débil, admite listas y *)"""
+    if not if_none_match:
+        return False
+    candidatos = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidatos or any(c.removeprefix("W/") == etag for c in candidatos)
+
+
+def respuesta_con_etag(entrada: EntradaRespuesta, if_none_match: Optional[str]) -> Response:
+    """200 con el cuerpo guardado, o 304 si el cliente ya tiene esa versión"""
+    cabeceras = {"ETag": entrada.etag, "Cache-Control": "no-cache"}
+    if etag_coincide(if_none_match, entrada.etag):
+        return Response(status_code=304, headers=cabeceras)
+    return Response(content=entrada.cuerpo, media_type="application/json", headers=cabeceras)
+
+
+# Respuestas de GET /api/citas/disponibles
+cache_disponibilidad = CacheRespuestas()
@@ -0,0 +1,81 @@
+"""
+Exportación en streaming (NDJSON / CSV)
+
+Las filas se serializan a medida que llegan del cursor del servidor y se envían
+en trozos, así que la memoria no crece con el tamaño de la tabla y el primer
+byte sale con la primera fila.
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, Literal, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+FormatoExportacion = Literal["ndjson", "csv"]
+
+# Filas por trozo enviado al cliente
+FILAS_POR_TROZO = 500
+
+TIPOS_MEDIA = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+
+def respuesta_exportacion(
+    abrir_filas: Callable[[], AsyncIterator[object]],
+    schema: Type[BaseModel],
+    formato: FormatoExportacion,
+    nombre: str
+) -> StreamingResponse:
+    """
+    ``abrir_filas`` se invoca al empezar a enviar el cuerpo: debe abrir su propia
+    sesión, porque las dependencias de FastAPI se cierran antes del streaming.
+    """
+    extension = "ndjson" if formato == "ndjson" else "csv"
+    return StreamingResponse(
+        _serializar(abrir_filas, schema, formato),
+        media_type=TIPOS_MEDIA[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.{extension}"'}
+    )
+
+
+async def _serializar(
+    abrir_filas: Callable[[], AsyncIterator[object]],
+    schema: Type[BaseModel],
+    formato: FormatoExportacion
+) -> AsyncIterator[str]:
+    campos = list(schema.model_fields)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer) if formato == "csv" else None
+    
+    if escritor is not None:
+        escritor.writerow(campos)
+        yield _vaciar(buffer)
+    
+    pendientes = 0
+    async for entidad in abrir_filas():
+        fila = schema.model_validate(entidad).model_dump(mode="json")
+        if escritor is not None:
+            escritor.writerow([fila[c] for c in campos])
+        else:
+            buffer.write(json.dumps(fila, ensure_ascii=False))
+            buffer.write("\n")
+        pendientes += 1
+        # El primer trozo sale con la primera fila; luego se agrupan
+        if pendientes == 1 or pendientes % FILAS_POR_TROZO == 0:
+            yield _vaciar(buffer)
+    
+    resto = _vaciar(buffer)
+    if resto:
+        yield resto
+
+
+def _vaciar(buffer: io.StringIO) -> str:
+    contenido = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return contenido
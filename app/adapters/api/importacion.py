@@ -0,0 +1,130 @@
+"""
+Importación masiva desde CSV o NDJSON
+
+El archivo se recorre fila a fila: cada fila se valida con el schema Pydantic y
+las válidas se cargan por lotes, así que la memoria depende del tamaño del lote
+y no del archivo. Las filas inválidas se reportan con su número y sus errores.
+
+La lectura del archivo (síncrona, sobre el archivo temporal del upload) y la
+validación se hacen en un hilo (asyncio.to_thread), un lote cada vez: el bucle
+de eventos solo espera a la base de datos.
+"""
+
+import asyncio
+import csv
+import io
+import json
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+
+from app.shared.schemas import ErrorFilaImportacion, ResultadoImportacion
+from app.adapters.api.exportacion import FormatoExportacion
+
+# Filas válidas por lote enviado a la base de datos
+IMPORTACION_TAMANO_LOTE = 1000
+
+# Errores listados en la respuesta (el resto solo se cuenta)
+MAX_ERRORES_REPORTADOS = 1000
+
+
+def detectar_formato(archivo: UploadFile, formato: Optional[FormatoExportacion]) -> FormatoExportacion:
+    """Formato explícito o, si no, deducido de la extensión o del content-type"""
+    if formato:
+        return formato
+    nombre = (archivo.filename or "").lower()
+    tipo = archivo.content_type or ""
+    if nombre.endswith((".ndjson", ".jsonl")) or "ndjson" in tipo or "json" in tipo:
+        return "ndjson"
+    return "csv"
+
+
+def _leer_filas(archivo: UploadFile, formato: FormatoExportacion) -> Iterator[Tuple[int, Any]]:
+    """(número de fila, dict | mensaje de error) sin leer todo el archivo en memoria"""
+    texto = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", newline="")
+    if formato == "csv":
+        for numero, fila in enumerate(csv.DictReader(texto), start=1):
+            # En CSV una celda vacía equivale a un campo ausente (toma el valor por defecto)
+            yield numero, {k: v for k, v in fila.items() if k and v not in ("", None)}
+        return
+    
+    numero = 0
+    for linea in texto:
+        if not linea.strip():
+            continue
+        numero += 1
+        try:
+            fila = json.loads(linea)
+        except json.JSONDecodeError as e:
+            yield numero, f"JSON inválido: {e.msg}"
+            continue
+        yield numero, fila if isinstance(fila, dict) else "Se esperaba un objeto JSON"
+
+
+def _mensajes(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(p) for p in e['loc']) or 'fila'}: {e['msg']}"
+        for e in error.errors()
+    ]
+
+
+async def importar_archivo(
+    archivo: UploadFile,
+    formato: FormatoExportacion,
+    schema: Type[BaseModel],
+    a_entidad: Callable[[Dict[str, Any]], Any],
+    cargar_lote: Callable[[List[Any]], Awaitable[int]],
+    tamano_lote: int = IMPORTACION_TAMANO_LOTE
+) -> ResultadoImportacion:
+    """
+    Valida cada fila con ``schema`` y entrega las válidas, convertidas con
+    ``a_entidad``, a ``cargar_lote`` en lotes de ``tamano_lote``.
+    Si un lote falla en la base de datos, todas sus filas se reportan con ese error.
+    """
+    resultado = ResultadoImportacion(total_filas=0, importados=0)
+    lote: List[Any] = []
+    filas_lote: List[int] = []
+    
+    def reportar(fila: int, errores: List[str]):
+        if len(resultado.errores) < MAX_ERRORES_REPORTADOS:
+            resultado.errores.append(ErrorFilaImportacion(fila=fila, errores=errores))
+        else:
+            resultado.errores_omitidos += 1
+    
+    async def vaciar_lote():
+        try:
+            resultado.importados += await cargar_lote(lote)
+        except Exception as e:
+            for fila in filas_lote:
+                reportar(fila, [f"Error al guardar el lote: {e}"])
+        lote.clear()
+        filas_lote.clear()
+    
+    filas = _leer_filas(archivo, formato)
+    
+    def leer_lote() -> bool:
+        """Lee y valida filas hasta completar un lote; False si se acabó el archivo"""
+        for numero, datos in filas:
+            resultado.total_filas = numero
+            if isinstance(datos, str):
+                reportar(numero, [datos])
+                continue
+            try:
+                validado = schema.model_validate(datos)
+            except ValidationError as e:
+                reportar(numero, _mensajes(e))
+                continue
+            
+            lote.append(a_entidad(validado.model_dump()))
+            filas_lote.append(numero)
+            if len(lote) >= tamano_lote:
+                return True
+        return False
+    
+    while await asyncio.to_thread(leer_lote):
+        await vaciar_lote()
+    
+    if lote:
+        await vaciar_lote()
+    return resultado
@@ -0,0 +1,207 @@
+"""
+Métricas de peticiones HTTP por ruta
+
+MiddlewareMetricas (ASGI) abre una MedicionPeticion por petición, añade la
+cabecera Server-Timing al empezar la respuesta (db, fases marcadas, el resto
+como app y los conflictos de reserva, si hubo) y, al terminar, acumula latencia,
+consultas, tiempo de base de datos, filas y conflictos en RegistroMetricas, con
+la plantilla de la ruta como etiqueta (/api/citas/disponibles, no la URL con
+parámetros).
+
+RegistroMetricas se exporta en formato de texto de Prometheus en /metrics. Es
+local al proceso: con varios workers, cada uno publica sus propios contadores.
+
+Con DETECTOR_CONSULTAS (desarrollo) cada petición lleva además un
+DetectorConsultas y se avisa de las sentencias repetidas más de
+DETECTOR_UMBRAL_REPETICIONES veces, con sus sitios de llamada.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.db.config import METRICAS_SERVER_TIMING, DETECTOR_CONSULTAS, DETECTOR_UMBRAL_REPETICIONES
+from app.db.detector_consultas import DetectorConsultas
+from app.db.instrumentacion import MedicionPeticion, medicion_actual
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+
+class Histograma:
+    """Histograma acumulativo con buckets fijos, como los de Prometheus"""
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.cuentas = [0] * len(buckets)
+        self.total = 0
+        self.suma = 0.0
+    
+    def observar(self, valor: float) -> None:
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.cuentas[i] += 1
+        self.total += 1
+        self.suma += valor
+
+
+class EstadisticasRuta:
+    """Acumulados de una (método, ruta)"""
+    
+    def __init__(self):
+        self.peticiones_por_estado: Dict[int, int] = defaultdict(int)
+        self.duracion = Histograma(BUCKETS_SEGUNDOS)
+        self.consultas = Histograma(BUCKETS_CONSULTAS)
+        self.tiempo_db = 0.0
+        self.filas = 0
+        self.conflictos = 0
+
+
+class RegistroMetricas:
+    """Métricas de todas las rutas del proceso"""
+    
+    def __init__(self, prefijo: str = "fisioterapia"):
+        self.prefijo = prefijo
+        self.rutas: Dict[Tuple[str, str], EstadisticasRuta] = defaultdict(EstadisticasRuta)
+    
+    def registrar(self, metodo: str, ruta: str, estado: int, duracion: float, medicion: MedicionPeticion) -> None:
+        estadisticas = self.rutas[(metodo, ruta)]
+        estadisticas.peticiones_por_estado[estado] += 1
+        estadisticas.duracion.observar(duracion)
+        estadisticas.consultas.observar(medicion.consultas)
+        estadisticas.tiempo_db += medicion.tiempo_db
+        estadisticas.filas += medicion.filas
+        estadisticas.conflictos += medicion.conflictos
+    
+    def limpiar(self) -> None:
+        self.rutas.clear()
+    
+    def exportar_prometheus(self) -> str:
+        """Formato de texto de Prometheus (version 0.0.4)"""
+        p = self.prefijo
+        lineas: List[str] = []
+        
+        def cabecera(nombre: str, tipo: str, ayuda: str) -> None:
+            lineas.append(f"# HELP {p}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {p}_{nombre} {tipo}")
+        
+        def histograma(nombre: str, etiquetas: str, h: Histograma) -> None:
+            for limite, cuenta in zip(h.buckets, h.cuentas):
+                lineas.append(f'{p}_{nombre}_bucket{{{etiquetas},le="{limite:g}"}} {cuenta}')
+            lineas.append(f'{p}_{nombre}_bucket{{{etiquetas},le="+Inf"}} {h.total}')
+            lineas.append(f"{p}_{nombre}_sum{{{etiquetas}}} {h.suma:.6f}")
+            lineas.append(f"{p}_{nombre}_count{{{etiquetas}}} {h.total}")
+        
+        rutas = sorted(self.rutas.items())
+        etiquetas = {clave: f'metodo="{clave[0]}",ruta="{_escapar(clave[1])}"' for clave, _ in rutas}
+        
+        cabecera("http_peticiones_total", "counter", "Peticiones HTTP por ruta y código de estado")
+        for clave, e in rutas:
+            for estado, cuenta in sorted(e.peticiones_por_estado.items()):
+                lineas.append(f'{p}_http_peticiones_total{{{etiquetas[clave]},estado="{estado}"}} {cuenta}')
+        
+        cabecera("http_duracion_segundos", "histogram", "Latencia de las peticiones HTTP")
+        for clave, e in rutas:
+            histograma("http_duracion_segundos", etiquetas[clave], e.duracion)
+        
+        cabecera("db_consultas_por_peticion", "histogram", "Consultas SQL ejecutadas en cada petición")
+        for clave, e in rutas:
+            histograma("db_consultas_por_peticion", etiquetas[clave], e.consultas)
+        
+        cabecera("db_tiempo_segundos_total", "counter", "Tiempo total en consultas SQL")
+        for clave, e in rutas:
+            lineas.append(f"{p}_db_tiempo_segundos_total{{{etiquetas[clave]}}} {e.tiempo_db:.6f}")
+        
+        cabecera("db_filas_total", "counter", "Filas devueltas o afectadas según el driver")
+        for clave, e in rutas:
+            lineas.append(f"{p}_db_filas_total{{{etiquetas[clave]}}} {e.filas}")
+        
+        cabecera("reservas_conflictos_total", "counter", "Reservas rechazadas por conflicto (reintentos de la reserva optimista)")
+        for clave, e in rutas:
+            lineas.append(f"{p}_reservas_conflictos_total{{{etiquetas[clave]}}} {e.conflictos}")
+        
+        return "\n".join(lineas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def cabecera_server_timing(medicion: MedicionPeticion) -> str:
+    """db (con el número de consultas), cada fase marcada, el resto como app y los conflictos de reserva"""
+    total = medicion.transcurrido()
+    partes = [f'db;dur={medicion.tiempo_db * 1000:.2f};desc="{medicion.consultas} consultas"']
+    otras = 0.0
+    for nombre, segundos in medicion.fases.items():
+        partes.append(f"{nombre};dur={segundos * 1000:.2f}")
+        otras += segundos
+    partes.append(f"app;dur={max(total - medicion.tiempo_db - otras, 0) * 1000:.2f}")
+    partes.append(f"total;dur={total * 1000:.2f}")
+    if medicion.conflictos:
+        partes.append(f'conflictos;desc="{medicion.conflictos}"')
+    return ", ".join(partes)
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI: Server-Timing en cada respuesta y métricas por ruta"""
+    
+    def __init__(
+        self,
+        app: Callable,
+        registro: Optional[RegistroMetricas] = None,
+        server_timing: bool = METRICAS_SERVER_TIMING,
+        detectar_repetidas: bool = DETECTOR_CONSULTAS,
+        umbral_repeticiones: int = DETECTOR_UMBRAL_REPETICIONES
+    ):
+        self.app = app
+        self.registro = registro if registro is not None else registro_metricas
+        self.server_timing = server_timing
+        self.detectar_repetidas = detectar_repetidas
+        self.umbral_repeticiones = umbral_repeticiones
+        self._rutas: Dict[Any, str] = {}
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        medicion = MedicionPeticion(detector=DetectorConsultas() if self.detectar_repetidas else None)
+        token = medicion_actual.set(medicion)
+        estado = 500
+        
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                if self.server_timing:
+                    cabeceras = list(mensaje.get("headers", []))
+                    cabeceras.append((b"server-timing", cabecera_server_timing(medicion).encode()))
+                    mensaje = {**mensaje, "headers": cabeceras}
+            await send(mensaje)
+        
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            medicion_actual.reset(token)
+            ruta = self._plantilla(scope)
+            self.registro.registrar(scope["method"], ruta, estado, medicion.transcurrido(), medicion)
+            if medicion.detector is not None:
+                informe = medicion.detector.informe(self.umbral_repeticiones)
+                if informe:
+                    print(f"⚠️ Consultas repetidas en {scope['method']} {ruta} "
+                          f"({medicion.consultas} consultas):\n{informe}")
+    
+    def _plantilla(self, scope) -> str:
+        """Ruta declarada del endpoint que atendió la petición (el router la deja en el scope)"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "sin_ruta"
+        if endpoint not in self._rutas:
+            rutas = getattr(scope.get("app"), "routes", [])
+            self._rutas[endpoint] = next(
+                (r.path for r in rutas if getattr(r, "endpoint", None) is endpoint), scope["path"]
+            )
+        return self._rutas[endpoint]
+
+
+# Registro compartido por el middleware y /metrics
+registro_metricas = RegistroMetricas()
@@ -4,5 +4,8 @@ Rutas de la API - Adaptadores de FastAPI
 
 from .pacientes import router as pacientes_router
 from .citas import router as citas_router
+from .reservas import router as reservas_router
+from .salud import router as salud_router
+from .metricas import router as metricas_router
 
-__all__ = ["pacientes_router", "citas_router"]
+__all__ = ["pacientes_router", "citas_router", "reservas_router", "salud_router", "metricas_router"]
@@ -3,58 +3,62 @@ Rutas de Citas - Adaptador API Hexagonal
 """
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from googleapiclient.errors import HttpError
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response
 from datetime import date
 from typing import Optional
-from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.shared.container import RequestScope, get_scope, get_container
 from app.schemas.fisioterapia import (
     DisponibilidadResponse,
     BloqueDisponible,
+    MatrizDisponibilidadResponse,
     TratamientoCreate,
     TratamientoResponse,
-    SesionAgendada
+    SesionAgendada,
+    SesionPropuesta,
+    PropuestaTratamientoSchema,
+    PropuestasTratamientoResponse,
+    LoteTratamientosCreate,
+    LoteTratamientosResponse,
+    ResultadoTratamientoLoteSchema
 )
 from app.domain.usecases import ConsultarDisponibilidad, AgendarTratamientoRecurrente
-from app.adapters.database.models import (
-    PacienteRepositoryImpl,
-    FisioterapeutaRepositoryImpl,
-    EspacioRepositoryImpl,
-    BloqueHorarioRepositoryImpl,
-    MaquinaRepositoryImpl,
-    ReservaRepositoryImpl
-)
+from app.domain.entities import ConflictoReservaError, Cita
+from app.adapters.api.cache_respuestas import respuesta_con_etag
+from app.db.instrumentacion import fase
 
 router = APIRouter(prefix="/api/citas", tags=["citas"])
 
 
 # ==================== DEPENDENCY INJECTION ====================
 
-def get_paciente_repo(db: Session = Depends(get_db)):
-    return PacienteRepositoryImpl(db)
+def get_paciente_repo(scope: RequestScope = Depends(get_scope)):
+    return scope.get_repository('paciente')
+
+
+def get_fisioterapeuta_repo(scope: RequestScope = Depends(get_scope)):
+    return scope.get_repository('fisioterapeuta')
 
 
-def get_fisioterapeuta_repo(db: Session = Depends(get_db)):
-    return FisioterapeutaRepositoryImpl(db)
+def get_espacio_repo(scope: RequestScope = Depends(get_scope)):
+    return scope.get_repository('espacio')
 
 
-def get_espacio_repo(db: Session = Depends(get_db)):
-    return EspacioRepositoryImpl(db)
+def get_bloque_repo(scope: RequestScope = Depends(get_scope)):
+    return scope.get_repository('bloque_horario')
 
 
-def get_bloque_repo(db: Session = Depends(get_db)):
-    return BloqueHorarioRepositoryImpl(db)
+def get_maquina_repo(scope: RequestScope = Depends(get_scope)):
+    return scope.get_repository('maquina')
 
 
-def get_maquina_repo(db: Session = Depends(get_db)):
-    return MaquinaRepositoryImpl(db)
+def get_reserva_repo(scope: RequestScope = Depends(get_scope)):
+    return scope.get_repository('reserva')
 
 
-def get_reserva_repo(db: Session = Depends(get_db)):
-    return ReservaRepositoryImpl(db)
+def get_cita_repo(scope: RequestScope = Depends(get_scope)):
+    return scope.get_repository('cita')
 
 
 # ==================== ENDPOINTS ====================
@@ -65,12 +69,12 @@ async def consultar_disponibilidad(
     fecha_fin: date = Query(..., description="Fecha final del rango de consulta"),
     paciente_id: Optional[int] = Query(None, description="ID del paciente (opcional)"),
     fisioterapeuta_id: Optional[int] = Query(None, description="ID del fisioterapeuta (opcional)"),
+    if_none_match: Optional[str] = Header(None),
     espacio_repo = Depends(get_espacio_repo),
     bloque_repo = Depends(get_bloque_repo),
-    fisio_repo = Depends(get_fisioterapeuta_repo),
-    maquina_repo = Depends(get_maquina_repo),
-    paciente_repo = Depends(get_paciente_repo)
-) -> DisponibilidadResponse:
+    paciente_repo = Depends(get_paciente_repo),
+    reserva_repo = Depends(get_reserva_repo)
+) -> Response:
     """
     Consulta bloques horarios disponibles para un rango de fechas.
     
@@ -88,22 +92,34 @@ async def consultar_disponibilidad(
     
     **Retorna:**
     Lista de bloques disponibles con información de espacios y máquinas disponibles.
+    
+    **Caché:** la respuesta lleva un `ETag`; si se reenvía en `If-None-Match` y
+    ninguna reserva del rango cambió, se responde `304 Not Modified`.
     """
+    # Validar que fecha_fin >= fecha_inicio
+    if fecha_fin < fecha_inicio:
+        raise HTTPException(
+            status_code=400,
+            detail="La fecha_fin debe ser mayor o igual a fecha_inicio"
+        )
+    
+    container = get_container()
+    cache = container.cache_disponibilidad
+    clave = (fecha_inicio, fecha_fin, paciente_id, fisioterapeuta_id)
+    # La versión se lee antes de calcular: una escritura concurrente deja la entrada obsoleta
+    version = container.version_disponibilidad(fecha_inicio, fecha_fin)
+    entrada = cache.obtener(clave, version)
+    if entrada is not None:
+        return respuesta_con_etag(entrada, if_none_match)
+    
     try:
-        # Validar que fecha_fin >= fecha_inicio
-        if fecha_fin < fecha_inicio:
-            raise HTTPException(
-                status_code=400,
-                detail="La fecha_fin debe ser mayor o igual a fecha_inicio"
-            )
-        
         # Ejecutar caso de uso
         use_case = ConsultarDisponibilidad(
             espacio_repo=espacio_repo,
             bloque_repo=bloque_repo,
-            fisio_repo=fisio_repo,
-            maquina_repo=maquina_repo,
-            paciente_repo=paciente_repo
+            paciente_repo=paciente_repo,
+            reserva_repo=reserva_repo,
+            materializada=container.disponibilidad_materializada
         )
         
         bloques_data = await use_case.ejecutar(
@@ -116,7 +132,7 @@ async def consultar_disponibilidad(
         # Convertir a schemas
         bloques = [BloqueDisponible(**bloque) for bloque in bloques_data]
         
-        return DisponibilidadResponse(
+        respuesta = DisponibilidadResponse(
             bloques_disponibles=bloques,
             total_bloques=len(bloques),
             fecha_inicio=fecha_inicio,
@@ -130,12 +146,64 @@ async def consultar_disponibilidad(
             status_code=500,
             detail=f"Error al consultar disponibilidad: {str(e)}"
         )
+    
+    with fase("serializacion"):
+        cuerpo = respuesta.model_dump_json().encode()
+    entrada = cache.guardar(clave, version, cuerpo)
+    return respuesta_con_etag(entrada, if_none_match)
+
+
+@router.get("/disponibles/matriz", response_model=MatrizDisponibilidadResponse)
+async def consultar_matriz_disponibilidad(
+    fecha_inicio: date = Query(..., description="Fecha inicial del rango de consulta"),
+    fecha_fin: date = Query(..., description="Fecha final del rango de consulta"),
+    paciente_id: Optional[int] = Query(None, description="ID del paciente (opcional)"),
+    if_none_match: Optional[str] = Header(None),
+    scope: RequestScope = Depends(get_scope)
+) -> Response:
+    """
+    Disponibilidad de **todos** los fisioterapeutas para cada fecha y bloque del rango,
+    calculada con una sola lectura de las reservas.
+    
+    **Formato columnar:** `fechas`, `bloque_ids` y `fisioterapeuta_ids` son los ejes;
+    `espacios_disponibles`, `maquinas_disponibles` y cada fila de `cupos` tienen una
+    celda por (fecha, bloque), en el índice `i_fecha * len(bloque_ids) + i_bloque`.
+    
+    Admite `If-None-Match` igual que `/disponibles`.
+    """
+    if fecha_fin < fecha_inicio:
+        raise HTTPException(
+            status_code=400,
+            detail="La fecha_fin debe ser mayor o igual a fecha_inicio"
+        )
+    
+    container = get_container()
+    cache = container.cache_disponibilidad
+    clave = ("matriz", fecha_inicio, fecha_fin, paciente_id)
+    version = container.version_disponibilidad(fecha_inicio, fecha_fin)
+    entrada = cache.obtener(clave, version)
+    if entrada is not None:
+        return respuesta_con_etag(entrada, if_none_match)
+    
+    try:
+        matriz = await scope.get_use_case('consultar_matriz_disponibilidad').ejecutar(
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            paciente_id=paciente_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    respuesta = MatrizDisponibilidadResponse(**matriz)
+    with fase("serializacion"):
+        cuerpo = respuesta.model_dump_json().encode()
+    entrada = cache.guardar(clave, version, cuerpo)
+    return respuesta_con_etag(entrada, if_none_match)
 
 
 @router.post("/agendar", response_model=TratamientoResponse)
 async def agendar_tratamiento(
     tratamiento: TratamientoCreate,
-    db: Session = Depends(get_db),
     paciente_repo = Depends(get_paciente_repo),
     fisio_repo = Depends(get_fisioterapeuta_repo),
     espacio_repo = Depends(get_espacio_repo),
@@ -170,16 +238,18 @@ async def agendar_tratamiento(
     
     **Validaciones:**
     - Valida TODAS las reglas antes de insertar
-    - Usa transacciones SQL (rollback automático si falla)
+    - Inserta todas las sesiones con un único INSERT multi-fila en una transacción
     - Si alguna sesión no puede agendarse, aborta toda la operación
+    - Si otra petición reserva a la vez el mismo espacio o máquina, reintenta con
+      el siguiente libre; si el conflicto persiste responde 409
+    - Con `"optimizar": true` agenda la mejor propuesta de `/agendar/propuestas`
     
     **Retorna:**
     Lista de sesiones agendadas con detalles (fecha, espacio, máquina, horario).
     """
     try:
-        # Ejecutar caso de uso con transacción
+        # Ejecutar caso de uso (inserción de todas las sesiones en una transacción)
         use_case = AgendarTratamientoRecurrente(
-            db=db,
             paciente_repo=paciente_repo,
             fisio_repo=fisio_repo,
             espacio_repo=espacio_repo,
@@ -194,7 +264,9 @@ async def agendar_tratamiento(
             bloque_id=tratamiento.bloque_id,
             fecha_inicio=tratamiento.fecha_inicio,
             total_sesiones=tratamiento.total_sesiones,
-            requiere_maquina=tratamiento.requiere_maquina
+            requiere_maquina=tratamiento.requiere_maquina,
+            optimizar=tratamiento.optimizar,
+            dias_semana=tratamiento.dias_semana
         )
         
         # Obtener información de bloques horarios para las respuestas
@@ -231,6 +303,9 @@ async def agendar_tratamiento(
             mensaje=f"Tratamiento agendado exitosamente: {len(sesiones)} sesiones creadas"
         )
     
+    except ConflictoReservaError as e:
+        # Conflictos concurrentes que persistieron tras los reintentos
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         # Errores de validación de negocio
         raise HTTPException(status_code=400, detail=str(e))
@@ -241,6 +316,114 @@ async def agendar_tratamiento(
             detail=f"Error al agendar tratamiento: {str(e)}"
         )
 
+
+@router.post("/agendar/lote", response_model=LoteTratamientosResponse)
+async def agendar_lote(
+    lote: LoteTratamientosCreate,
+    scope: RequestScope = Depends(get_scope)
+) -> LoteTratamientosResponse:
+    """
+    Agenda varios tratamientos recurrentes en una sola operación.
+    
+    Lee la ocupación una vez para todas las fechas del lote, planifica los
+    tratamientos en un orden determinista (primero los más restringidos) y
+    escribe todas las sesiones con un único INSERT en una transacción.
+    
+    Cada tratamiento tiene su propio resultado: uno que no puede agendarse se
+    devuelve con `error` y no impide los demás. Si un conflicto concurrente
+    persiste tras los reintentos, no se agenda nada y se responde 409.
+    """
+    try:
+        resultados = await scope.get_use_case('agendar_tratamiento').ejecutar_lote(
+            [t.model_dump() for t in lote.tratamientos]
+        )
+    except ConflictoReservaError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    bloques = {b.id: b for b in await scope.get_repository('bloque_horario').listar(limit=100)}
+    respuesta = [
+        ResultadoTratamientoLoteSchema(
+            indice=r.indice,
+            paciente_id=r.paciente_id,
+            fisioterapeuta_id=r.fisioterapeuta_id,
+            exito=r.exito,
+            error=r.error,
+            sesiones=[
+                SesionAgendada(
+                    id=reserva.id,
+                    fecha=reserva.fecha,
+                    bloque_id=reserva.bloque_id,
+                    espacio_id=reserva.espacio_id,
+                    maquina_id=reserva.maquina_id,
+                    hora_inicio=bloques[reserva.bloque_id].hora_inicio,
+                    hora_fin=bloques[reserva.bloque_id].hora_fin
+                )
+                for reserva in r.reservas
+            ]
+        )
+        for r in resultados
+    ]
+    return LoteTratamientosResponse(
+        total_tratamientos=len(respuesta),
+        total_agendados=sum(r.exito for r in respuesta),
+        total_sesiones_agendadas=sum(len(r.sesiones) for r in respuesta),
+        resultados=respuesta
+    )
+
+
+@router.post("/agendar/propuestas", response_model=PropuestasTratamientoResponse)
+async def proponer_tratamiento(
+    tratamiento: TratamientoCreate,
+    max_alternativas: int = Query(5, ge=1, le=50, description="Número máximo de propuestas"),
+    scope: RequestScope = Depends(get_scope)
+) -> PropuestasTratamientoResponse:
+    """
+    Planificador: propone horarios para un tratamiento recurrente sin reservar nada.
+    
+    Explora todos los bloques horarios y los 7 días de inicio a partir de
+    `fecha_inicio` (o solo `dias_semana`) y asigna espacio y máquina a cada sesión
+    con el mínimo de cambios entre sesiones. Las propuestas se ordenan por cercanía
+    al bloque y fecha pedidos y, a igualdad, por fragmentación.
+    """
+    try:
+        propuestas = await scope.get_use_case('agendar_tratamiento').proponer(
+            paciente_id=tratamiento.paciente_id,
+            fisioterapeuta_id=tratamiento.fisioterapeuta_id,
+            bloque_id=tratamiento.bloque_id,
+            fecha_inicio=tratamiento.fecha_inicio,
+            total_sesiones=tratamiento.total_sesiones,
+            requiere_maquina=tratamiento.requiere_maquina,
+            max_alternativas=max_alternativas,
+            dias_semana=tratamiento.dias_semana
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    bloques = {b.id: b for b in await scope.get_repository('bloque_horario').listar(limit=100)}
+    return PropuestasTratamientoResponse(
+        paciente_id=tratamiento.paciente_id,
+        fisioterapeuta_id=tratamiento.fisioterapeuta_id,
+        total_propuestas=len(propuestas),
+        propuestas=[
+            PropuestaTratamientoSchema(
+                bloque_id=p.bloque_id,
+                fecha_inicio=p.fecha_inicio,
+                hora_inicio=getattr(bloques.get(p.bloque_id), "hora_inicio", None),
+                hora_fin=getattr(bloques.get(p.bloque_id), "hora_fin", None),
+                desviacion_dias=p.desviacion_dias,
+                desviacion_bloques=p.desviacion_bloques,
+                cambios_espacio=p.cambios_espacio,
+                cambios_maquina=p.cambios_maquina,
+                sesiones=[
+                    SesionPropuesta(fecha=r.fecha, espacio_id=r.espacio_id, maquina_id=r.maquina_id)
+                    for r in p.reservas
+                ]
+            )
+            for p in propuestas
+        ]
+    )
+
+
 class CitaRequest(BaseModel):
     """DTO para crear citas"""
     cliente: str
@@ -250,49 +433,57 @@ class CitaRequest(BaseModel):
 class CitaResponse(BaseModel):
     """DTO de respuesta de citas"""
     message: str
-    google_event_ids: list[str]
+    cita_ids: list[int]
     total_eventos: int
+
+@router.post("/google/agendar", response_model=CitaResponse, status_code=202)
+async def agendar_citas(
+    cita: CitaRequest,
+    cita_repo = Depends(get_cita_repo)
+) -> CitaResponse:
+    """
+    Agendar citas con Google Calendar.
     
-@router.post("/google/agendar", response_model=CitaResponse)
-async def agendar_citas(cita: CitaRequest) -> CitaResponse:
-    """Agendar citas con Google Calendar"""
+    Guarda cada cita junto con su evento pendiente en una sola transacción y
+    responde de inmediato (202). El SincronizadorCalendario crea los eventos en
+    Google en segundo plano, con reintentos, y completa google_event_id.
+    """
     try:
-        from app.adapters.external.google_calendar import calendar_service, CALENDAR_ID
-        
-        event_ids = []
-        
+        citas = []
+        eventos = []
         for fecha_inicial in cita.fechas_iniciales:
-            evento = {
-                "summary": f"Cita con {cita.cliente}",
-                "description": "Cita agendada automáticamente - Se repite semanalmente 3 veces",
+            fecha_final = fecha_inicial + timedelta(hours=2)
+            nueva_cita = Cita(
+                titulo=f"Cita con {cita.cliente}",
+                descripcion="Cita agendada automáticamente - Se repite semanalmente 3 veces",
+                inicio=fecha_inicial,
+                fin=fecha_final
+            )
+            citas.append(nueva_cita)
+            eventos.append({
+                "summary": nueva_cita.titulo,
+                "description": nueva_cita.descripcion,
                 "start": {
                     "dateTime": fecha_inicial.isoformat(),
                     "timeZone": "America/Lima"
                 },
                 "end": {
-                    "dateTime": (fecha_inicial + timedelta(hours=2)).isoformat(),
+                    "dateTime": fecha_final.isoformat(),
                     "timeZone": "America/Lima"
                 },
                 "recurrence": ["RRULE:FREQ=WEEKLY;COUNT=3"]
-            }
-            
-            evento_creado = calendar_service.events().insert(
-                calendarId=CALENDAR_ID or "primary",
-                body=evento,
-                sendUpdates="all"
-            ).execute()
-            
-            event_ids.append(evento_creado["id"])
+            })
+        
+        creadas = await cita_repo.crear_con_evento_pendiente(citas, eventos)
+        
+        sincronizador = get_container().sincronizador_calendario
+        if sincronizador is not None:
+            sincronizador.notificar()
         
         return CitaResponse(
-            message=f"Citas creadas correctamente: {len(event_ids)} eventos",
-            google_event_ids=event_ids,
-            total_eventos=len(event_ids)
-        )
-    except HttpError as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Error al crear eventos en Google Calendar: {str(e)}"
+            message=f"Citas registradas: {len(creadas)} eventos en cola para Google Calendar",
+            cita_ids=[c.id for c in creadas],
+            total_eventos=len(creadas)
         )
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,23 @@
+"""
+Rutas de API Hexagonal - Métricas (formato Prometheus)
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.adapters.api.metricas import registro_metricas
+
+
+router = APIRouter(tags=["metricas"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metricas():
+    """
+    Latencia, consultas SQL, tiempo de base de datos y filas por ruta de este
+    worker, en formato de texto de Prometheus.
+    """
+    return PlainTextResponse(
+        registro_metricas.exportar_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
@@ -2,31 +2,37 @@
 Rutas de API Hexagonal - Pacientes
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-
-from app.shared.schemas import PacienteCreate, PacienteResponse, PacienteConHistorial
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from typing import Literal, Optional
+
+from app.shared.schemas import (
+    PacienteCreate,
+    PacienteResponse,
+    PacienteConHistorial,
+    PacientePagina,
+    ResultadoImportacion
+)
 from app.domain.usecases import (
     CrearPaciente,
     ObtenerPaciente,
-    ListarPacientes,
+    ListarPacientesPorCursor,
+    ImportarPacientes,
     ActualizarPaciente,
     EliminarPaciente
 )
 from app.domain.entities import Paciente as PacienteEntity
 from app.domain.ports import PacienteRepository
-from app.db.session import get_db
-from app.adapters.database.models import PacienteRepositoryImpl
+from app.shared.container import RequestScope, get_scope, get_container
+from app.adapters.api.exportacion import FormatoExportacion, respuesta_exportacion
+from app.adapters.api.importacion import detectar_formato, importar_archivo
 
 
 router = APIRouter(prefix="/api/pacientes", tags=["pacientes"])
 
 
-def get_paciente_repo(db=Depends(get_db)) -> PacienteRepository:
+def get_paciente_repo(scope: RequestScope = Depends(get_scope)) -> PacienteRepository:
     """Inyectar el repositorio de Paciente"""
-    return PacienteRepositoryImpl(db)
-    from app.adapters.database import PacienteRepositoryImpl
-    return PacienteRepositoryImpl(db)
+    return scope.get_repository('paciente')
 
 
 @router.post("/", response_model=PacienteResponse)
@@ -43,6 +49,42 @@ async def crear_paciente(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=ResultadoImportacion)
+async def importar_pacientes(
+    archivo: UploadFile = File(..., description="CSV con cabecera o NDJSON (un paciente por línea)"),
+    formato: Optional[FormatoExportacion] = Query(None, description="Se deduce del archivo si se omite"),
+    repo: PacienteRepository = Depends(get_paciente_repo)
+) -> ResultadoImportacion:
+    """
+    Importar pacientes de forma masiva.
+    Cada fila se valida como PacienteCreate; las válidas se cargan por lotes con
+    COPY y las inválidas se devuelven con su número de fila y sus errores.
+    """
+    use_case = ImportarPacientes(repo)
+    return await importar_archivo(
+        archivo,
+        detectar_formato(archivo, formato),
+        PacienteCreate,
+        lambda datos: PacienteEntity(**datos),
+        use_case.ejecutar
+    )
+
+
+@router.get("/export")
+async def exportar_pacientes(formato: FormatoExportacion = "ndjson"):
+    """
+    Exportar todos los pacientes en streaming (NDJSON o CSV).
+    Las filas se leen con un cursor del servidor: la memoria no depende del tamaño de la tabla.
+    """
+    async def abrir_filas():
+        # Sesión propia: la del request se cierra antes de enviar el cuerpo
+        async with get_container().scope() as scope:
+            async for paciente in scope.get_use_case('exportar_pacientes').ejecutar():
+                yield paciente
+    
+    return respuesta_exportacion(abrir_filas, PacienteResponse, formato, "pacientes")
+
+
 @router.get("/{paciente_id}", response_model=PacienteResponse)
 async def obtener_paciente(
     paciente_id: int,
@@ -59,17 +101,24 @@ async def obtener_paciente(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[PacienteResponse])
+@router.get("/", response_model=PacientePagina)
 async def listar_pacientes(
-    skip: int = 0,
-    limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor opaco devuelto como next_cursor"),
+    limit: int = Query(10, ge=1, le=100),
+    orden: Literal["id", "created_at"] = "id",
     repo: PacienteRepository = Depends(get_paciente_repo)
-) -> List[PacienteResponse]:
-    """Listar pacientes con paginación"""
-    use_case = ListarPacientes(repo)
+) -> PacientePagina:
+    """
+    Listar pacientes con paginación por cursor.
+    Para la página siguiente se envía el next_cursor recibido; es null en la última.
+    """
+    use_case = ListarPacientesPorCursor(repo)
     try:
-        pacientes = await use_case.ejecutar(skip, limit)
-        return [PacienteResponse.from_orm(p) for p in pacientes]
+        pagina = await use_case.ejecutar(cursor, limit, orden)
+        return PacientePagina(
+            items=[PacienteResponse.from_orm(p) for p in pagina.items],
+            next_cursor=pagina.siguiente_cursor
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
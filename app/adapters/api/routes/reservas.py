@@ -0,0 +1,57 @@
+"""
+Rutas de API Hexagonal - Reservas
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal, Optional
+
+from app.shared.schemas import ReservaResponse, ReservaPagina
+from app.domain.usecases import ListarReservasPorCursor
+from app.domain.ports import ReservaRepository
+from app.shared.container import RequestScope, get_scope, get_container
+from app.adapters.api.exportacion import FormatoExportacion, respuesta_exportacion
+
+
+router = APIRouter(prefix="/api/reservas", tags=["reservas"])
+
+
+def get_reserva_repo(scope: RequestScope = Depends(get_scope)) -> ReservaRepository:
+    """Inyectar el repositorio de Reserva"""
+    return scope.get_repository('reserva')
+
+
+@router.get("/", response_model=ReservaPagina)
+async def listar_reservas(
+    cursor: Optional[str] = Query(None, description="Cursor opaco devuelto como next_cursor"),
+    limit: int = Query(50, ge=1, le=500),
+    orden: Literal["id", "fecha"] = "id",
+    repo: ReservaRepository = Depends(get_reserva_repo)
+) -> ReservaPagina:
+    """
+    Listar reservas con paginación por cursor.
+    Para la página siguiente se envía el next_cursor recibido; es null en la última.
+    """
+    use_case = ListarReservasPorCursor(repo)
+    try:
+        pagina = await use_case.ejecutar(cursor, limit, orden)
+        return ReservaPagina(
+            items=[ReservaResponse.from_orm(r) for r in pagina.items],
+            next_cursor=pagina.siguiente_cursor
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_reservas(formato: FormatoExportacion = "ndjson"):
+    """
+    Exportar todas las reservas en streaming (NDJSON o CSV).
+    Las filas se leen con un cursor del servidor: la memoria no depende del tamaño de la tabla.
+    """
+    async def abrir_filas():
+        # Sesión propia: la del request se cierra antes de enviar el cuerpo
+        async with get_container().scope() as scope:
+            async for reserva in scope.get_use_case('exportar_reservas').ejecutar():
+                yield reserva
+    
+    return respuesta_exportacion(abrir_filas, ReservaResponse, formato, "reservas")
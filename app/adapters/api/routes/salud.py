@@ -0,0 +1,124 @@
+"""
+Rutas de API Hexagonal - Salud (liveness y readiness)
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.db.config import SALUD_TIMEOUT_SEGUNDOS
+from app.shared.container import Container, get_container
+
+
+router = APIRouter(prefix="/health", tags=["salud"])
+
+INICIO = time.monotonic()
+
+
+def _proporcion_aciertos(aciertos: int, fallos: int) -> Optional[float]:
+    total = aciertos + fallos
+    return round(aciertos / total, 4) if total else None
+
+
+async def _ping_base_datos(container: Container) -> Dict[str, Any]:
+    """SELECT 1 con límite de tiempo: si el pool está agotado, la espera cuenta"""
+    inicio = time.perf_counter()
+    try:
+        async def ping():
+            async with container.session_factory() as db:
+                await db.execute(text("SELECT 1"))
+        await asyncio.wait_for(ping(), timeout=SALUD_TIMEOUT_SEGUNDOS)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"sin respuesta en {SALUD_TIMEOUT_SEGUNDOS} s"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latencia_ms": round((time.perf_counter() - inicio) * 1000, 2)}
+
+
+def _estado_pool(container: Container) -> Dict[str, Any]:
+    """Conexiones del pool de SQLAlchemy (QueuePool: tamaño, en uso, overflow)"""
+    engine = container.session_factory.kw.get("bind")
+    pool = getattr(engine, "pool", None)
+    if pool is None or not hasattr(pool, "checkedout"):
+        return {"tipo": type(pool).__name__ if pool is not None else None}
+    tamano = pool.size()
+    en_uso = pool.checkedout()
+    overflow = pool.overflow()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    return {
+        "tipo": type(pool).__name__,
+        "tamano": tamano,
+        "en_uso": en_uso,
+        "libres": pool.checkedin(),
+        "overflow": max(overflow, 0),
+        "max_overflow": max_overflow,
+        "saturado": max_overflow >= 0 and en_uso >= tamano + max_overflow
+    }
+
+
+def _estado_calendario(container: Container) -> Dict[str, Any]:
+    sincronizador = container.sincronizador_calendario
+    if sincronizador is None:
+        return {"configurado": False}
+    return {
+        "configurado": True,
+        "activo": sincronizador.activo,
+        "enviados": sincronizador.enviados,
+        "fallidos": sincronizador.fallidos,
+        "ultimo_error": sincronizador.ultimo_error
+    }
+
+
+def _estado_caches(container: Container) -> Dict[str, Any]:
+    caches = {
+        nombre: {
+            "aciertos": cache.aciertos,
+            "fallos": cache.fallos,
+            "proporcion_aciertos": _proporcion_aciertos(cache.aciertos, cache.fallos)
+        }
+        for nombre, cache in container.caches.items()
+    }
+    respuestas = container.cache_disponibilidad
+    caches["respuestas_disponibilidad"] = {
+        "aciertos": respuestas.aciertos,
+        "fallos": respuestas.fallos,
+        "proporcion_aciertos": _proporcion_aciertos(respuestas.aciertos, respuestas.fallos),
+        "entradas": len(respuestas),
+        "bytes": respuestas.bytes,
+        "descartadas": respuestas.descartadas
+    }
+    return caches
+
+
+@router.get("/live")
+async def liveness():
+    """El proceso responde; no consulta dependencias (para reiniciar workers colgados)"""
+    return {"status": "alive", "uptime_segundos": round(time.monotonic() - INICIO, 1)}
+
+
+@router.get("")
+@router.get("/ready")
+async def readiness():
+    """
+    Puede recibir tráfico: hace ping a la base de datos y devuelve el estado del
+    pool de conexiones, del worker de Google Calendar y de las cachés.
+    
+    Responde 503 si la base de datos no contesta dentro de SALUD_TIMEOUT_SEGUNDOS
+    (también cuando el pool está agotado y no se libera ninguna conexión a tiempo).
+    """
+    container = get_container()
+    base_datos = await _ping_base_datos(container)
+    cuerpo = {
+        "status": "ready" if base_datos["ok"] else "unavailable",
+        "version": "2.0.0",
+        "components": {
+            "database": {**base_datos, "pool": _estado_pool(container)},
+            "calendar_worker": _estado_calendario(container),
+            "caches": _estado_caches(container)
+        }
+    }
+    return JSONResponse(cuerpo, status_code=200 if base_datos["ok"] else 503)
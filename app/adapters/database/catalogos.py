@@ -0,0 +1,74 @@
+"""
+Caché de catálogos: espacios, bloques horarios, máquinas y fisioterapeutas
+
+Son tablas casi estáticas (se cargan una vez con generar_datos.py) que
+las rutas de disponibilidad y agendamiento leen en cada petición. Cada catálogo
+se lee completo una vez y se sirve desde memoria hasta que su repositorio
+escribe (invalidación explícita) o vence el TTL.
+"""
+
+import time
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+from app.db.config import CATALOGO_TTL_SEGUNDOS
+
+T = TypeVar("T")
+
+
+class CacheCatalogo(Generic[T]):
+    """
+    Caché de lectura (read-through) versionada de una tabla de catálogo.
+
+    ``version`` aumenta con cada invalidación; una carga que se solapa con una
+    invalidación no se guarda, para no reinstalar datos anteriores a la escritura.
+    Las entidades devueltas son compartidas y no deben modificarse.
+    """
+
+    def __init__(self, nombre: str, ttl: float = CATALOGO_TTL_SEGUNDOS):
+        self.nombre = nombre
+        self.ttl = ttl
+        self.version = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._entidades: Optional[List[T]] = None
+        self._por_id: Dict[int, T] = {}
+        self._cargado_en = 0.0
+
+    def _vigente(self) -> bool:
+        return (
+            self._entidades is not None
+            and time.monotonic() - self._cargado_en <= self.ttl
+        )
+
+    async def obtener(self, cargar: Callable[[], Awaitable[List[T]]]) -> List[T]:
+        """Todas las entidades del catálogo, leyendo la tabla solo si hace falta"""
+        if self._vigente():
+            self.aciertos += 1
+            return self._entidades
+
+        self.fallos += 1
+        version = self.version
+        entidades = await cargar()
+        if version == self.version:
+            self._entidades = entidades
+            self._por_id = {e.id: e for e in entidades}
+            self._cargado_en = time.monotonic()
+        return entidades
+
+    async def obtener_por_id(self, entidad_id: int, cargar: Callable[[], Awaitable[List[T]]]) -> Optional[T]:
+        entidades = await self.obtener(cargar)
+        if entidades is self._entidades:
+            return self._por_id.get(entidad_id)
+        return next((e for e in entidades if e.id == entidad_id), None)
+
+    def invalidar(self) -> None:
+        self.version += 1
+        self._entidades = None
+        self._por_id = {}
+
+
+# Instancias compartidas por los repositorios del proceso
+cache_espacios: CacheCatalogo = CacheCatalogo("espacios")
+cache_bloques: CacheCatalogo = CacheCatalogo("bloques_horarios")
+cache_maquinas: CacheCatalogo = CacheCatalogo("maquinas")
+cache_fisioterapeutas: CacheCatalogo = CacheCatalogo("fisioterapeutas")
@@ -0,0 +1,328 @@
+"""
+Generador de datos sintéticos de la clínica
+
+Produce, sobre los modelos ORM, un conjunto de datos determinista (misma escala
+y semilla, mismas filas) del tamaño que se pida: fisioterapeutas, los 9
+espacios, las 3 máquinas, bloques horarios, pacientes con su diagnóstico y
+reservas de lunes a viernes. Las reservas cumplen las reglas de agendamiento:
+
+- Un espacio y una máquina solo se reservan una vez por (fecha, bloque).
+- Un fisioterapeuta atiende como máximo MAX_PACIENTES_POR_FISIO pacientes por
+  bloque, y a ninguno más si uno de ellos requiere trato especial.
+- Cada paciente que usa magneto tiene una máquina asignada.
+- Un paciente no tiene dos sesiones en el mismo bloque.
+
+Cada tabla sale de su propio generador aleatorio (semilla + tabla) como tuplas
+en el orden de sus columnas; las reservas se generan en streaming, bloque a
+bloque, sin tenerlas todas en memoria. cargar_datos las escribe en una sola
+transacción con COPY en PostgreSQL (asyncpg), sin índices secundarios ni claves
+foráneas hasta el final, o con INSERT por lotes en otros drivers; ajusta las
+secuencias de los ids y reconstruye la disponibilidad materializada.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import Base
+from app.domain.disponibilidad import MAX_PACIENTES_POR_FISIO, TOTAL_MAQUINAS
+from app.adapters.database.models import (
+    BloqueHorarioORM,
+    CargaFisioterapeutaORM,
+    DiagnosticoORM,
+    DisponibilidadDiariaORM,
+    EspacioORM,
+    FisioterapeutaORM,
+    MaquinaORM,
+    PacienteORM,
+    ReservaORM,
+    reconstruir_disponibilidad
+)
+
+TOTAL_ESPACIOS = 9
+# Horas de inicio de los bloques (sesiones de 40 minutos, sin el bloque de las 13:00)
+HORAS_BLOQUES = (8, 9, 10, 11, 12, 14, 15, 16, 17, 18, 19, 20)
+DURACION_SESION_MINUTOS = 40
+TAMANO_LOTE_INSERT = 5000
+# Memoria para construir los índices tras el COPY (solo en la transacción de carga)
+MEMORIA_INDICES = "256MB"
+
+NOMBRES = (
+    "Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Pedro", "Isabel", "Diego", "Sofía",
+    "Jorge", "Lucía", "Miguel", "Elena", "Andrés", "Carmen", "Pablo", "Rosa", "Javier", "Teresa"
+)
+APELLIDOS = (
+    "García", "López", "Martínez", "Rodríguez", "Fernández", "González", "Pérez", "Sánchez",
+    "Ramírez", "Torres", "Vargas", "Castro", "Morales", "Ruiz", "Herrera", "Mendoza"
+)
+ASEGURADORAS = ("Seguros Unidos", "Salud Plus", "Cobertura Total", "Salud Integral", "Premium Health")
+TRATAMIENTOS = (
+    "Rehabilitación de rodilla post-operatoria", "Magnetoterapia para lumbalgia",
+    "Terapia para dolor cervical", "Rehabilitación geriátrica", "Prevención de lesiones deportivas",
+    "Terapia intensiva post-accidente", "Terapia para artritis", "Evaluación inicial"
+)
+
+
+@dataclass
+class EscalaDatos:
+    """Tamaño y proporciones del conjunto de datos"""
+    fisioterapeutas: int = 5
+    pacientes: int = 200
+    meses: int = 1
+    bloques: int = 10
+    llenado: float = 0.7  # fracción máxima de espacios ocupados por bloque
+    proporcion_magneto: float = 0.3
+    proporcion_trato_especial: float = 0.05
+    fecha_inicio: date = date(2026, 1, 5)
+    semilla: int = 1
+    
+    def __post_init__(self):
+        if not 1 <= self.bloques <= len(HORAS_BLOQUES):
+            raise ValueError(f"El número de bloques debe estar entre 1 y {len(HORAS_BLOQUES)}")
+        if self.fisioterapeutas < 1 or self.pacientes < 1 or self.meses < 0:
+            raise ValueError("Se necesita al menos un fisioterapeuta y un paciente")
+        if not 0 <= self.llenado <= 1:
+            raise ValueError("El llenado debe estar entre 0 y 1")
+    
+    @property
+    def fecha_fin(self) -> date:
+        return self.fecha_inicio + timedelta(days=self.meses * 30 - 1)
+
+
+class GeneradorDatos:
+    """Filas de cada tabla para una escala dada, en orden de carga (claves foráneas)"""
+    
+    def __init__(self, escala: EscalaDatos):
+        self.escala = escala
+        # Magneto y trato especial de cada paciente: los usan pacientes() y reservas()
+        rnd = self._aleatorio("atributos")
+        self.usa_magneto = bytearray(rnd.random() < escala.proporcion_magneto for _ in range(escala.pacientes))
+        self.trato_especial = bytearray(
+            rnd.random() < escala.proporcion_trato_especial for _ in range(escala.pacientes)
+        )
+    
+    def _aleatorio(self, tabla: str) -> random.Random:
+        return random.Random(f"{self.escala.semilla}-{tabla}")
+    
+    def tablas(self) -> List[Tuple[type, Tuple[str, ...], Iterable[tuple]]]:
+        """(modelo ORM, columnas, filas) de cada tabla, padres antes que hijas"""
+        return [
+            (FisioterapeutaORM, ("id", "nombre"), self.fisioterapeutas()),
+            (EspacioORM, ("id", "nombre"), self.espacios()),
+            (MaquinaORM, ("id", "codigo"), self.maquinas()),
+            (BloqueHorarioORM, ("id", "hora_inicio", "hora_fin"), self.bloques()),
+            (PacienteORM, (
+                "id", "nombre", "telefono", "fecha_nacimiento", "centro_terapia_id", "usa_magneto",
+                "requiere_tratamiento_especial", "seguro_medico", "aseguradora", "created_at"
+            ), self.pacientes()),
+            (DiagnosticoORM, ("paciente_id", "sessions", "treatment"), self.diagnosticos()),
+            (ReservaORM, (
+                "paciente_id", "fisioterapeuta_id", "espacio_id", "bloque_id", "maquina_id", "fecha"
+            ), self.reservas())
+        ]
+    
+    def fisioterapeutas(self) -> Iterator[tuple]:
+        combinaciones = len(NOMBRES) * len(APELLIDOS)
+        for i in range(1, self.escala.fisioterapeutas + 1):
+            nombre = NOMBRES[(i - 1) % len(NOMBRES)]
+            apellido = APELLIDOS[(i - 1) // len(NOMBRES) % len(APELLIDOS)]
+            # El nombre es único: se numera a partir de la primera repetición
+            yield (i, f"{nombre} {apellido}" + (f" {i}" if i > combinaciones else ""))
+    
+    def espacios(self) -> Iterator[tuple]:
+        return ((i, f"Espacio {i}") for i in range(1, TOTAL_ESPACIOS + 1))
+    
+    def maquinas(self) -> Iterator[tuple]:
+        return ((i, f"MAG-{i:03d}") for i in range(1, TOTAL_MAQUINAS + 1))
+    
+    def bloques(self) -> Iterator[tuple]:
+        for i, hora in enumerate(HORAS_BLOQUES[:self.escala.bloques], start=1):
+            yield (i, time(hora), time(hora, DURACION_SESION_MINUTOS))
+    
+    def pacientes(self) -> Iterator[tuple]:
+        rnd = self._aleatorio("pacientes")
+        alta = datetime.combine(self.escala.fecha_inicio, time(9)) - timedelta(days=730)
+        # Altas repartidas en los dos años anteriores al inicio, en orden de id
+        paso = timedelta(days=730) / self.escala.pacientes
+        for i in range(1, self.escala.pacientes + 1):
+            asegurado = rnd.random() < 0.6
+            yield (
+                i,
+                f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}",
+                rnd.randint(600000000, 999999999),
+                date(1940, 1, 1) + timedelta(days=rnd.randrange(30000)),
+                1,
+                bool(self.usa_magneto[i - 1]),
+                bool(self.trato_especial[i - 1]),
+                asegurado,
+                rnd.choice(ASEGURADORAS) if asegurado else None,
+                alta + paso * i
+            )
+    
+    def diagnosticos(self) -> Iterator[tuple]:
+        rnd = self._aleatorio("diagnosticos")
+        for i in range(1, self.escala.pacientes + 1):
+            yield (i, rnd.randint(4, 25), rnd.choice(TRATAMIENTOS))
+    
+    def reservas(self) -> Iterator[tuple]:
+        escala = self.escala
+        rnd = self._aleatorio("reservas")
+        espacio_ids = range(1, TOTAL_ESPACIOS + 1)
+        maquina_ids = list(range(1, TOTAL_MAQUINAS + 1))
+        max_ocupados = int(TOTAL_ESPACIOS * escala.llenado)
+        for d in range(escala.meses * 30):
+            fecha = escala.fecha_inicio + timedelta(days=d)
+            if fecha.weekday() >= 5:
+                continue
+            for bloque_id in range(1, escala.bloques + 1):
+                maquinas_libres = rnd.sample(maquina_ids, len(maquina_ids))
+                carga: Dict[int, int] = {}
+                exclusivos = set()
+                pacientes = set()
+                for espacio_id in rnd.sample(espacio_ids, rnd.randint(0, max_ocupados)):
+                    paciente_id = rnd.randint(1, escala.pacientes)
+                    fisio_id = rnd.randint(1, escala.fisioterapeutas)
+                    especial = self.trato_especial[paciente_id - 1]
+                    magneto = self.usa_magneto[paciente_id - 1]
+                    atendidos = carga.get(fisio_id, 0)
+                    if (paciente_id in pacientes or fisio_id in exclusivos
+                            or atendidos >= MAX_PACIENTES_POR_FISIO or (especial and atendidos)
+                            or (magneto and not maquinas_libres)):
+                        continue
+                    pacientes.add(paciente_id)
+                    carga[fisio_id] = atendidos + 1
+                    if especial:
+                        exclusivos.add(fisio_id)
+                    yield (
+                        paciente_id, fisio_id, espacio_id, bloque_id,
+                        maquinas_libres.pop() if magneto else None, fecha
+                    )
+
+
+def _contar(filas: Iterable[tuple], totales: Dict[str, int], tabla: str) -> Iterator[tuple]:
+    totales[tabla] = 0
+    for fila in filas:
+        totales[tabla] += 1
+        yield fila
+
+
+def _lotes(filas: Iterable[tuple], tamano: int) -> Iterator[List[tuple]]:
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+async def tablas_con_datos(db: AsyncSession) -> List[str]:
+    """Tablas del conjunto de datos que ya tienen filas"""
+    ocupadas = []
+    for modelo in (FisioterapeutaORM, PacienteORM, ReservaORM):
+        if (await db.execute(select(func.count()).select_from(modelo))).scalar_one():
+            ocupadas.append(modelo.__tablename__)
+    return ocupadas
+
+
+async def vaciar_tablas(db: AsyncSession) -> None:
+    """Borra todas las filas de las tablas de la aplicación (no la revisión de Alembic)"""
+    tablas = [t.name for t in reversed(Base.metadata.sorted_tables)]
+    if (await db.connection()).dialect.name == "postgresql":
+        await db.execute(text(f"TRUNCATE {', '.join(tablas)} RESTART IDENTITY CASCADE"))
+    else:
+        for tabla in tablas:
+            await db.execute(text(f"DELETE FROM {tabla}"))
+    await db.commit()
+
+
+async def _quitar_indices(db: AsyncSession, tabla: str) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Quita de ``tabla`` las claves foráneas, las restricciones únicas y los índices
+    secundarios (no la clave primaria) y devuelve sus definiciones para recrearlos.
+    """
+    restricciones = (await db.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = CAST(:tabla AS regclass) AND contype IN ('f', 'u')"
+    ), {"tabla": tabla})).all()
+    indices = (await db.execute(text(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid "
+        "WHERE x.indrelid = CAST(:tabla AS regclass) AND c.oid IS NULL"
+    ), {"tabla": tabla})).all()
+    for nombre, _ in restricciones:
+        await db.execute(text(f'ALTER TABLE {tabla} DROP CONSTRAINT "{nombre}"'))
+    for nombre, _ in indices:
+        await db.execute(text(f'DROP INDEX "{nombre}"'))
+    return restricciones, indices
+
+
+async def _cargar_con_copy(db: AsyncSession, generador: GeneradorDatos, totales: Dict[str, int]) -> None:
+    """
+    COPY de cada tabla sin índices secundarios ni claves foráneas: mantenerlos fila
+    a fila multiplica el tiempo de carga, y construir cada índice de una vez y
+    validar cada clave foránea con una sola consulta es mucho más rápido. Se
+    quitan también de la disponibilidad materializada y se recrean al final, en la
+    misma transacción.
+    """
+    conexion = await db.connection()
+    raw = (await conexion.get_raw_connection()).driver_connection
+    await db.execute(text(f"SET LOCAL maintenance_work_mem = '{MEMORIA_INDICES}'"))
+    
+    tablas = generador.tablas()
+    nombres = [modelo.__tablename__ for modelo, _, _ in tablas] + [
+        DisponibilidadDiariaORM.__tablename__, CargaFisioterapeutaORM.__tablename__
+    ]
+    quitados = [await _quitar_indices(db, nombre) for nombre in nombres]
+    
+    for modelo, columnas, filas in tablas:
+        tabla = modelo.__tablename__
+        await raw.copy_records_to_table(tabla, records=_contar(filas, totales, tabla), columns=list(columnas))
+        if "id" in columnas:
+            # Los ids explícitos no avanzan la secuencia: el siguiente alta chocaría
+            await db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), (SELECT MAX(id) FROM {tabla}))"
+            ))
+    await reconstruir_disponibilidad(db, confirmar=False)
+    
+    for nombre, (restricciones, indices) in zip(nombres, quitados):
+        for _, definicion in indices:
+            await db.execute(text(definicion))
+        for restriccion, definicion in restricciones:
+            await db.execute(text(f'ALTER TABLE {nombre} ADD CONSTRAINT "{restriccion}" {definicion}'))
+        # Estadísticas del planificador para las tablas recién cargadas
+        await db.execute(text(f"ANALYZE {nombre}"))
+
+
+async def cargar_datos(db: AsyncSession, generador: GeneradorDatos) -> Dict[str, int]:
+    """
+    Escribe todas las tablas del generador y la disponibilidad materializada en
+    una sola transacción y devuelve las filas de cada tabla.
+    
+    Raises:
+        ValueError: Si ya hay datos (ver vaciar_tablas)
+    """
+    # La comprobación abre además la transacción en la que entra el COPY
+    ocupadas = await tablas_con_datos(db)
+    if ocupadas:
+        raise ValueError(f"Las tablas ya tienen datos: {', '.join(ocupadas)}")
+    totales: Dict[str, int] = {}
+    try:
+        if (await db.connection()).dialect.driver == "asyncpg":
+            await _cargar_con_copy(db, generador, totales)
+        else:
+            for modelo, columnas, filas in generador.tablas():
+                for lote in _lotes(_contar(filas, totales, modelo.__tablename__), TAMANO_LOTE_INSERT):
+                    await db.execute(insert(modelo), [dict(zip(columnas, fila)) for fila in lote])
+            await reconstruir_disponibilidad(db, confirmar=False)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return totales
@@ -2,11 +2,26 @@
 Adaptador de Base de Datos - PostgreSQL con SQLAlchemy
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Date, Time, Index
-from sqlalchemy.orm import relationship, Session
-from typing import List, Optional
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Date, Time, Index, UniqueConstraint, JSON, func, case, select, insert, update, delete, and_, tuple_, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import relationship
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 from app.db.base import Base
+from app.adapters.database.versiones import VersionesReservas, versiones_reservas
+from app.adapters.database.paginacion import listar_por_cursor
+from app.db.config import EXPORTACION_TAMANO_LOTE
+from app.db.instrumentacion import registrar_conflicto
+from app.domain.disponibilidad import MAX_PACIENTES_POR_FISIO
+from app.adapters.database.catalogos import (
+    CacheCatalogo,
+    cache_espacios,
+    cache_bloques,
+    cache_maquinas,
+    cache_fisioterapeutas
+)
 from app.domain.entities import (
     Paciente as PacienteEntity,
     Reserva as ReservaEntity,
@@ -15,7 +30,10 @@ from app.domain.entities import (
     Maquina as MaquinaEntity,
     Espacio as EspacioEntity,
     BloqueHorario as BloqueHorarioEntity,
-    Cita as CitaEntity
+    Cita as CitaEntity,
+    OcupacionBloque,
+    ConflictoReservaError,
+    Pagina
 )
 from app.domain.ports import (
     PacienteRepository,
@@ -27,7 +45,7 @@ from app.domain.ports import (
     BloqueHorarioRepository,
     CitaRepository
 )
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 # ==================== MODELOS ORM POSTGRESQL ====================
@@ -36,10 +54,10 @@ class FisioterapeutaORM(Base):
     """Modelo ORM de Fisioterapeuta"""
     __tablename__ = "fisioterapeutas"
     __table_args__ = {'extend_existing': True}
-
+    
     id = Column(Integer, primary_key=True)
     nombre = Column(String(100), nullable=False, unique=True)
-
+    
     reservas = relationship("ReservaORM", back_populates="fisioterapeuta", cascade="all, delete-orphan")
 
 
@@ -47,10 +65,10 @@ class MaquinaORM(Base):
     """Modelo ORM de Máquina"""
     __tablename__ = "maquinas"
     __table_args__ = {'extend_existing': True}
-
+    
     id = Column(Integer, primary_key=True)
     codigo = Column(String(50), nullable=False, unique=True, index=True)
-
+    
     reservas = relationship("ReservaORM", back_populates="maquina", cascade="all, delete-orphan")
 
 
@@ -58,21 +76,21 @@ class EspacioORM(Base):
     """Modelo ORM de Espacio"""
     __tablename__ = "espacios"
     __table_args__ = {'extend_existing': True}
-
+    
     id = Column(Integer, primary_key=True)
     nombre = Column(String(100), nullable=False, unique=True)
-
+    
     reservas = relationship("ReservaORM", back_populates="espacio", cascade="all, delete-orphan")
 
 
 class BloqueHorarioORM(Base):
     """Modelo ORM de Bloque Horario"""
     __tablename__ = "bloques_horarios"
-
+    
     id = Column(Integer, primary_key=True)
     hora_inicio = Column(Time, nullable=False)
     hora_fin = Column(Time, nullable=False)
-
+    
     reservas = relationship("ReservaORM", back_populates="bloque_horario", cascade="all, delete-orphan")
     
     __table_args__ = (
@@ -84,7 +102,7 @@ class BloqueHorarioORM(Base):
 class PacienteORM(Base):
     """Modelo ORM de Paciente"""
     __tablename__ = "pacientes"
-
+    
     id = Column(Integer, primary_key=True)
     nombre = Column(String(100), nullable=False, index=True)
     telefono = Column(Integer)
@@ -94,13 +112,15 @@ class PacienteORM(Base):
     requiere_tratamiento_especial = Column(Boolean, default=False)
     seguro_medico = Column(Boolean, default=False)
     aseguradora = Column(String(100))
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
-
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
     reservas = relationship("ReservaORM", back_populates="paciente", cascade="all, delete-orphan")
     diagnosticos = relationship("DiagnosticoORM", back_populates="paciente", cascade="all, delete-orphan")
     
     __table_args__ = (
         Index('ix_pacientes_nombre_created', 'nombre', 'created_at'),
+        # Clave de la paginación por cursor en orden de alta
+        Index('ix_pacientes_created_id', 'created_at', 'id'),
         {'extend_existing': True}
     )
 
@@ -108,7 +128,7 @@ class PacienteORM(Base):
 class ReservaORM(Base):
     """Modelo ORM de Reserva"""
     __tablename__ = "reservas"
-
+    
     id = Column(Integer, primary_key=True)
     paciente_id = Column(Integer, ForeignKey("pacientes.id", ondelete="CASCADE"), nullable=False)
     fisioterapeuta_id = Column(Integer, ForeignKey("fisioterapeutas.id", ondelete="CASCADE"), nullable=False)
@@ -116,7 +136,7 @@ class ReservaORM(Base):
     bloque_id = Column(Integer, ForeignKey("bloques_horarios.id", ondelete="CASCADE"), nullable=False)
     maquina_id = Column(Integer, ForeignKey("maquinas.id", ondelete="SET NULL"), nullable=True)
     fecha = Column(Date, nullable=False, index=True)
-
+    
     paciente = relationship("PacienteORM", back_populates="reservas")
     fisioterapeuta = relationship("FisioterapeutaORM", back_populates="reservas")
     espacio = relationship("EspacioORM", back_populates="reservas")
@@ -126,6 +146,10 @@ class ReservaORM(Base):
     __table_args__ = (
         Index('ix_reservas_paciente_fecha', 'paciente_id', 'fecha'),
         Index('ix_reservas_fisio_fecha', 'fisioterapeuta_id', 'fecha'),
+        # Un espacio y una máquina solo pueden reservarse una vez por bloque y fecha.
+        # maquina_id NULL no choca: las sesiones sin máquina no entran en la restricción.
+        UniqueConstraint('fecha', 'bloque_id', 'espacio_id', name='uq_reservas_fecha_bloque_espacio'),
+        UniqueConstraint('fecha', 'bloque_id', 'maquina_id', name='uq_reservas_fecha_bloque_maquina'),
         {'extend_existing': True}
     )
 
@@ -133,12 +157,12 @@ class ReservaORM(Base):
 class DiagnosticoORM(Base):
     """Modelo ORM de Diagnóstico"""
     __tablename__ = "diagnosticos"
-
+    
     id = Column(Integer, primary_key=True)
     paciente_id = Column(Integer, ForeignKey("pacientes.id", ondelete="CASCADE"), nullable=False)
     sessions = Column(Integer, nullable=False)
     treatment = Column(String(255), nullable=False)
-
+    
     paciente = relationship("PacienteORM", back_populates="diagnosticos")
     
     __table_args__ = (
@@ -150,14 +174,15 @@ class DiagnosticoORM(Base):
 class CitaORM(Base):
     """Modelo ORM de Cita"""
     __tablename__ = "citas"
-
+    
     id = Column(Integer, primary_key=True)
     titulo = Column(String(200), nullable=False)
     descripcion = Column(Text)
     inicio = Column(DateTime, nullable=False, index=True)
     fin = Column(DateTime, nullable=False)
     email = Column(String(100), index=True)
-    google_event_id = Column(String(255), unique=True, nullable=False, index=True)
+    # NULL hasta que el worker del outbox crea el evento en Google Calendar
+    google_event_id = Column(String(255), unique=True, nullable=True, index=True)
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
     
     __table_args__ = (
@@ -166,48 +191,383 @@ class CitaORM(Base):
     )
 
 
+class OutboxCalendarioORM(Base):
+    """
+    Outbox de eventos de Google Calendar: se escribe en la misma transacción que
+    la cita y lo vacía en segundo plano el SincronizadorCalendario
+    """
+    __tablename__ = "outbox_calendario"
+    
+    id = Column(Integer, primary_key=True)
+    cita_id = Column(Integer, ForeignKey("citas.id", ondelete="CASCADE"), nullable=False)
+    payload = Column(JSON, nullable=False)  # Cuerpo del evento para events().insert
+    estado = Column(String(20), nullable=False, default="pendiente")  # pendiente | enviado | fallido
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_error = Column(Text)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_outbox_calendario_estado_proximo', 'estado', 'proximo_intento'),
+        {'extend_existing': True}
+    )
+
+
+class DisponibilidadDiariaORM(Base):
+    """
+    Ocupación materializada por (fecha, bloque). La mantiene ReservaRepositoryImpl
+    en la misma transacción que cada alta, baja o cambio de reserva.
+    """
+    __tablename__ = "disponibilidad_diaria"
+    
+    fecha = Column(Date, primary_key=True)
+    bloque_id = Column(Integer, ForeignKey("bloques_horarios.id", ondelete="CASCADE"), primary_key=True)
+    espacios_ocupados = Column(Integer, nullable=False, default=0)
+    maquinas_en_uso = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {'extend_existing': True}
+
+
+class CargaFisioterapeutaORM(Base):
+    """Pacientes de cada fisioterapeuta por (fecha, bloque), materializado junto a disponibilidad_diaria"""
+    __tablename__ = "carga_fisioterapeuta_bloque"
+    
+    fecha = Column(Date, primary_key=True)
+    bloque_id = Column(Integer, ForeignKey("bloques_horarios.id", ondelete="CASCADE"), primary_key=True)
+    fisioterapeuta_id = Column(Integer, ForeignKey("fisioterapeutas.id", ondelete="CASCADE"), primary_key=True)
+    pacientes = Column(Integer, nullable=False, default=0)
+    pacientes_trato_especial = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {'extend_existing': True}
+
+
+# ==================== DISPONIBILIDAD MATERIALIZADA ====================
+
+class FilaOcupacion(NamedTuple):
+    """Datos de una reserva que mueven los contadores de la disponibilidad materializada"""
+    fecha: Date
+    bloque_id: int
+    espacio_id: int
+    maquina_id: Optional[int]
+    fisioterapeuta_id: int
+    trato_especial: bool
+
+
+async def _filas_ocupacion(db: AsyncSession, reservas: List[ReservaEntity]) -> List[FilaOcupacion]:
+    """Filas de ocupación de ``reservas``, con el trato especial de cada paciente"""
+    paciente_ids = {r.paciente_id for r in reservas}
+    result = await db.execute(
+        select(PacienteORM.id, PacienteORM.requiere_tratamiento_especial).where(
+            PacienteORM.id.in_(paciente_ids)
+        )
+    )
+    especiales = {fila.id: bool(fila.requiere_tratamiento_especial) for fila in result.all()}
+    return [
+        FilaOcupacion(r.fecha, r.bloque_id, r.espacio_id, r.maquina_id,
+                      r.fisioterapeuta_id, especiales.get(r.paciente_id, False))
+        for r in reservas
+    ]
+
+
+async def _sumar_contadores(
+    db: AsyncSession,
+    modelo: type,
+    deltas: Dict[Tuple, Dict[str, int]]
+) -> None:
+    """
+    Suma ``deltas`` a los contadores de ``modelo`` con un único
+    INSERT ... ON CONFLICT (clave primaria) DO UPDATE SET c = c + excluded.c
+    """
+    deltas = {clave: d for clave, d in deltas.items() if any(d.values())}
+    if not deltas:
+        return
+    claves = [c.name for c in modelo.__table__.primary_key.columns]
+    dialecto = (await db.connection()).dialect.name
+    insertar = postgresql.insert if dialecto == "postgresql" else sqlite.insert
+    # Siempre en el mismo orden: dos transacciones que tocan las mismas filas no se bloquean en cruz
+    stmt = insertar(modelo).values([
+        {**dict(zip(claves, clave)), **contadores}
+        for clave, contadores in sorted(deltas.items())
+    ])
+    contadores = next(iter(deltas.values())).keys()
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=claves,
+        set_={c: getattr(modelo, c) + getattr(stmt.excluded, c) for c in contadores}
+    ))
+
+
+async def _aplicar_disponibilidad(db: AsyncSession, filas: Iterable[FilaOcupacion], signo: int) -> None:
+    """Suma (signo=1) o resta (signo=-1) las reservas de ``filas`` a la disponibilidad materializada"""
+    por_bloque: Dict[Tuple, Dict[str, int]] = {}
+    por_fisio: Dict[Tuple, Dict[str, int]] = {}
+    for fila in filas:
+        bloque = por_bloque.setdefault(
+            (fila.fecha, fila.bloque_id), {"espacios_ocupados": 0, "maquinas_en_uso": 0}
+        )
+        bloque["espacios_ocupados"] += signo
+        if fila.maquina_id is not None:
+            bloque["maquinas_en_uso"] += signo
+        fisio = por_fisio.setdefault(
+            (fila.fecha, fila.bloque_id, fila.fisioterapeuta_id),
+            {"pacientes": 0, "pacientes_trato_especial": 0}
+        )
+        fisio["pacientes"] += signo
+        if fila.trato_especial:
+            fisio["pacientes_trato_especial"] += signo
+    await _sumar_contadores(db, DisponibilidadDiariaORM, por_bloque)
+    await _sumar_contadores(db, CargaFisioterapeutaORM, por_fisio)
+
+
+async def _carga_excedida(db: AsyncSession, filas: Iterable[FilaOcupacion]) -> Optional[str]:
+    """
+    Relee con SELECT ... FOR UPDATE la carga materializada de los fisioterapeutas
+    de ``filas`` (ya sumadas en la transacción en curso) y devuelve la regla que
+    incumplen, o None. Ninguna restricción de la base cubre estas reglas: esta es
+    la comprobación que vale aunque la planificación leyera una ocupación anterior.
+    """
+    claves = sorted({(f.fecha, f.bloque_id, f.fisioterapeuta_id) for f in filas})
+    if not claves:
+        return None
+    carga = CargaFisioterapeutaORM
+    result = await db.execute(
+        select(
+            carga.fecha, carga.bloque_id, carga.fisioterapeuta_id,
+            carga.pacientes, carga.pacientes_trato_especial
+        ).where(
+            tuple_(carga.fecha, carga.bloque_id, carga.fisioterapeuta_id).in_(claves)
+        ).order_by(carga.fecha, carga.bloque_id, carga.fisioterapeuta_id).with_for_update()
+    )
+    for fila in result.all():
+        if fila.pacientes_trato_especial and fila.pacientes > 1:
+            return (
+                f"el fisioterapeuta {fila.fisioterapeuta_id} no puede atender a otros pacientes "
+                f"junto a uno con trato especial en el bloque {fila.bloque_id}"
+            )
+        if fila.pacientes > MAX_PACIENTES_POR_FISIO:
+            return (
+                f"el fisioterapeuta {fila.fisioterapeuta_id} ya tiene {MAX_PACIENTES_POR_FISIO} "
+                f"pacientes en el bloque {fila.bloque_id}"
+            )
+    return None
+
+
+# Clave del advisory lock de reconstruir_disponibilidad
+BLOQUEO_RECONSTRUCCION = 0x46495344
+
+
+async def reconstruir_disponibilidad(db: AsyncSession, confirmar: bool = True) -> int:
+    """
+    Recalcula la disponibilidad materializada desde las reservas (carga inicial o
+    reparación). Devuelve el número de bloques con ocupación. Sin ``confirmar``
+    queda dentro de la transacción en curso.
+    
+    En PostgreSQL bloquea las escrituras de reservas hasta el commit (las que
+    estén en curso terminan antes) y serializa las reconstrucciones simultáneas.
+    """
+    if (await db.connection()).dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(BLOQUEO_RECONSTRUCCION)))
+        await db.execute(text(f"LOCK TABLE {ReservaORM.__tablename__} IN SHARE MODE"))
+    await db.execute(delete(CargaFisioterapeutaORM))
+    await db.execute(delete(DisponibilidadDiariaORM))
+    await db.execute(insert(DisponibilidadDiariaORM).from_select(
+        ["fecha", "bloque_id", "espacios_ocupados", "maquinas_en_uso"],
+        select(
+            ReservaORM.fecha,
+            ReservaORM.bloque_id,
+            func.count(ReservaORM.id),
+            func.count(ReservaORM.maquina_id)
+        ).group_by(ReservaORM.fecha, ReservaORM.bloque_id)
+    ))
+    await db.execute(insert(CargaFisioterapeutaORM).from_select(
+        ["fecha", "bloque_id", "fisioterapeuta_id", "pacientes", "pacientes_trato_especial"],
+        select(
+            ReservaORM.fecha,
+            ReservaORM.bloque_id,
+            ReservaORM.fisioterapeuta_id,
+            func.count(ReservaORM.id),
+            func.count(case((PacienteORM.requiere_tratamiento_especial == True, 1)))
+        ).outerjoin(
+            PacienteORM, ReservaORM.paciente_id == PacienteORM.id
+        ).group_by(ReservaORM.fecha, ReservaORM.bloque_id, ReservaORM.fisioterapeuta_id)
+    ))
+    if confirmar:
+        await db.commit()
+    result = await db.execute(select(func.count()).select_from(DisponibilidadDiariaORM))
+    return result.scalar_one()
+
+
+def _es_conflicto_reserva(error: IntegrityError) -> bool:
+    """Indica si la violación es de una restricción única de reservas (y no de una FK)"""
+    origen = error.orig
+    if getattr(origen, "sqlstate", None) == "23505":  # unique_violation en PostgreSQL
+        return True
+    return "UNIQUE constraint failed" in str(origen)
+
+
 # ==================== IMPLEMENTACIONES DE REPOSITORIES ====================
 
+
 class PacienteRepositoryImpl(PacienteRepository):
-    """Implementación de PacienteRepository con PostgreSQL"""
+    """Implementación de PacienteRepository con PostgreSQL (asyncpg)"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, versiones: Optional[VersionesReservas] = None):
         self.db = db
+        self.versiones = versiones if versiones is not None else versiones_reservas
     
     async def crear(self, paciente: PacienteEntity) -> PacienteEntity:
         db_paciente = PacienteORM(**{k: v for k, v in paciente.__dict__.items() if v is not None})
         self.db.add(db_paciente)
-        self.db.commit()
-        self.db.refresh(db_paciente)
+        await self.db.commit()
+        await self.db.refresh(db_paciente)
         return self._to_entity(db_paciente)
     
     async def obtener_por_id(self, paciente_id: int) -> Optional[PacienteEntity]:
-        db_paciente = self.db.query(PacienteORM).filter(PacienteORM.id == paciente_id).first()
+        db_paciente = await self._obtener_orm(paciente_id)
         return self._to_entity(db_paciente) if db_paciente else None
     
+    async def obtener_por_ids(self, paciente_ids: List[int]) -> Dict[int, PacienteEntity]:
+        if not paciente_ids:
+            return {}
+        result = await self.db.execute(
+            select(PacienteORM).where(PacienteORM.id.in_(set(paciente_ids)))
+        )
+        return {p.id: self._to_entity(p) for p in result.scalars().all()}
+    
     async def listar(self, skip: int = 0, limit: int = 10) -> List[PacienteEntity]:
-        db_pacientes = self.db.query(PacienteORM).offset(skip).limit(limit).all()
-        return [self._to_entity(p) for p in db_pacientes]
+        result = await self.db.execute(select(PacienteORM).offset(skip).limit(limit))
+        return [self._to_entity(p) for p in result.scalars().all()]
+    
+    # Columnas de la clave de paginación por cada orden admitido
+    ORDENES_CURSOR = {
+        "id": (PacienteORM.id,),
+        "created_at": (PacienteORM.created_at, PacienteORM.id)
+    }
+    
+    async def listar_por_cursor(
+        self, cursor: Optional[str] = None, limit: int = 10, orden: str = "id"
+    ) -> Pagina:
+        """Paginación keyset: coste constante sin importar la profundidad de la página"""
+        if orden not in self.ORDENES_CURSOR:
+            raise ValueError(f"Orden no soportado: {orden}")
+        filas, siguiente = await listar_por_cursor(
+            self.db, select(PacienteORM), orden, self.ORDENES_CURSOR[orden], cursor, limit
+        )
+        return Pagina(items=[self._to_entity(p) for p in filas], siguiente_cursor=siguiente)
+    
+    # Columnas que se cargan en la importación masiva (created_at explícito: COPY no aplica defaults del ORM)
+    COLUMNAS_IMPORTACION = (
+        "nombre", "telefono", "fecha_nacimiento", "centro_terapia_id", "usa_magneto",
+        "requiere_tratamiento_especial", "seguro_medico", "aseguradora", "created_at"
+    )
+    
+    async def crear_muchos(self, pacientes: List[PacienteEntity]) -> int:
+        """
+        Carga el lote con COPY (asyncpg copy_records_to_table) en PostgreSQL; con
+        otros drivers, con un executemany. Un solo commit por lote.
+        """
+        if not pacientes:
+            return 0
+        
+        filas = [tuple(getattr(p, c) for c in self.COLUMNAS_IMPORTACION) for p in pacientes]
+        try:
+            conexion = await self.db.connection()
+            if conexion.dialect.driver == "asyncpg":
+                raw = await conexion.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    PacienteORM.__tablename__,
+                    records=filas,
+                    columns=list(self.COLUMNAS_IMPORTACION)
+                )
+            else:
+                await self.db.execute(
+                    insert(PacienteORM),
+                    [dict(zip(self.COLUMNAS_IMPORTACION, fila)) for fila in filas]
+                )
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return len(filas)
+    
+    async def exportar(self, tamano_lote: int = EXPORTACION_TAMANO_LOTE) -> AsyncIterator[PacienteEntity]:
+        """Cursor del lado del servidor: solo ``tamano_lote`` filas en memoria a la vez"""
+        result = await self.db.stream(
+            select(PacienteORM).order_by(PacienteORM.id).execution_options(yield_per=tamano_lote)
+        )
+        async for db_paciente in result.scalars():
+            yield self._to_entity(db_paciente)
     
     async def actualizar(self, paciente_id: int, datos: dict) -> Optional[PacienteEntity]:
-        db_paciente = self.db.query(PacienteORM).filter(PacienteORM.id == paciente_id).first()
+        db_paciente = await self._obtener_orm(paciente_id)
         if not db_paciente:
             return None
+        trato_especial = db_paciente.requiere_tratamiento_especial
+        usa_magneto = db_paciente.usa_magneto
         for key, value in datos.items():
             if hasattr(db_paciente, key) and value is not None:
                 setattr(db_paciente, key, value)
-        self.db.commit()
-        self.db.refresh(db_paciente)
+        cambia_trato = bool(db_paciente.requiere_tratamiento_especial) != bool(trato_especial)
+        if cambia_trato:
+            # Cambia la restricción de trato especial de todas sus reservas
+            signo = 1 if db_paciente.requiere_tratamiento_especial else -1
+            await _sumar_contadores(self.db, CargaFisioterapeutaORM, {
+                clave: {"pacientes_trato_especial": signo * cantidad}
+                for clave, cantidad in (await self._carga_por_bloque(paciente_id)).items()
+            })
+        await self.db.commit()
+        await self.db.refresh(db_paciente)
+        if cambia_trato or bool(db_paciente.usa_magneto) != bool(usa_magneto):
+            # Cambia la disponibilidad calculada para este paciente o sus fisioterapeutas
+            self.versiones.incrementar()
         return self._to_entity(db_paciente)
     
     async def eliminar(self, paciente_id: int) -> bool:
-        db_paciente = self.db.query(PacienteORM).filter(PacienteORM.id == paciente_id).first()
+        # Bloqueado: no se le pueden añadir reservas mientras se eliminan las suyas
+        db_paciente = await self._obtener_orm(paciente_id, bloquear=True)
         if db_paciente:
-            self.db.delete(db_paciente)
-            self.db.commit()
+            # Sus reservas se borran aquí y no en cascada, para descontar de la
+            # disponibilidad exactamente las que se borran
+            result = await self.db.execute(
+                delete(ReservaORM).where(ReservaORM.paciente_id == paciente_id).returning(
+                    ReservaORM.fecha,
+                    ReservaORM.bloque_id,
+                    ReservaORM.espacio_id,
+                    ReservaORM.maquina_id,
+                    ReservaORM.fisioterapeuta_id
+                )
+            )
+            filas = [
+                FilaOcupacion(*r, bool(db_paciente.requiere_tratamiento_especial))
+                for r in result.all()
+            ]
+            await _aplicar_disponibilidad(self.db, filas, -1)
+            await self.db.delete(db_paciente)
+            await self.db.commit()
+            self.versiones.incrementar()
             return True
         return False
     
+    async def _obtener_orm(self, paciente_id: int, bloquear: bool = False) -> Optional[PacienteORM]:
+        stmt = select(PacienteORM).where(PacienteORM.id == paciente_id)
+        if bloquear:
+            stmt = stmt.with_for_update()
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+    
+    async def _carga_por_bloque(self, paciente_id: int) -> Dict[Tuple, int]:
+        """Reservas del paciente por (fecha, bloque, fisioterapeuta)"""
+        result = await self.db.execute(
+            select(
+                ReservaORM.fecha,
+                ReservaORM.bloque_id,
+                ReservaORM.fisioterapeuta_id,
+                func.count(ReservaORM.id)
+            ).where(
+                ReservaORM.paciente_id == paciente_id
+            ).group_by(ReservaORM.fecha, ReservaORM.bloque_id, ReservaORM.fisioterapeuta_id)
+        )
+        return {(f[0], f[1], f[2]): f[3] for f in result.all()}
+    
     @staticmethod
     def _to_entity(orm: PacienteORM) -> Optional[PacienteEntity]:
         if not orm:
@@ -227,46 +587,30 @@ class PacienteRepositoryImpl(PacienteRepository):
 
 
 class FisioterapeutaRepositoryImpl(FisioterapeutaRepository):
-    """Implementación de FisioterapeutaRepository con PostgreSQL"""
+    """Implementación de FisioterapeutaRepository con PostgreSQL (asyncpg)"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, cache: Optional[CacheCatalogo] = None):
         self.db = db
+        self.cache = cache if cache is not None else cache_fisioterapeutas
     
     async def crear(self, fisioterapeuta: FisioterapeutaEntity) -> FisioterapeutaEntity:
         db_fisio = FisioterapeutaORM(nombre=fisioterapeuta.nombre)
         self.db.add(db_fisio)
-        self.db.commit()
-        self.db.refresh(db_fisio)
+        await self.db.commit()
+        self.cache.invalidar()
+        await self.db.refresh(db_fisio)
         return self._to_entity(db_fisio)
     
     async def obtener_por_id(self, fisioterapeuta_id: int) -> Optional[FisioterapeutaEntity]:
-        db_fisio = self.db.query(FisioterapeutaORM).filter(FisioterapeutaORM.id == fisioterapeuta_id).first()
-        return self._to_entity(db_fisio) if db_fisio else None
+        return await self.cache.obtener_por_id(fisioterapeuta_id, self._cargar_catalogo)
     
     async def listar(self, skip: int = 0, limit: int = 100) -> List[FisioterapeutaEntity]:
-        db_fisios = self.db.query(FisioterapeutaORM).offset(skip).limit(limit).all()
-        return [self._to_entity(f) for f in db_fisios]
-    
-    async def contar_pacientes_en_bloque(self, fisioterapeuta_id: int, fecha: Date, bloque_id: int) -> int:
-        """Cuenta cuántos pacientes tiene el fisio en un bloque específico"""
-        count = self.db.query(ReservaORM).filter(
-            ReservaORM.fisioterapeuta_id == fisioterapeuta_id,
-            ReservaORM.fecha == fecha,
-            ReservaORM.bloque_id == bloque_id
-        ).count()
-        return count
-    
-    async def tiene_paciente_con_trato_especial(self, fisioterapeuta_id: int, fecha: Date, bloque_id: int) -> bool:
-        """Verifica si el fisio tiene un paciente con trato especial en ese bloque"""
-        reserva = self.db.query(ReservaORM).join(
-            PacienteORM, ReservaORM.paciente_id == PacienteORM.id
-        ).filter(
-            ReservaORM.fisioterapeuta_id == fisioterapeuta_id,
-            ReservaORM.fecha == fecha,
-            ReservaORM.bloque_id == bloque_id,
-            PacienteORM.requiere_tratamiento_especial == True
-        ).first()
-        return reserva is not None
+        fisios = await self.cache.obtener(self._cargar_catalogo)
+        return fisios[skip:skip + limit]
+    
+    async def _cargar_catalogo(self) -> List[FisioterapeutaEntity]:
+        result = await self.db.execute(select(FisioterapeutaORM).order_by(FisioterapeutaORM.id))
+        return [self._to_entity(f) for f in result.scalars().all()]
     
     @staticmethod
     def _to_entity(orm: FisioterapeutaORM) -> Optional[FisioterapeutaEntity]:
@@ -276,42 +620,30 @@ class FisioterapeutaRepositoryImpl(FisioterapeutaRepository):
 
 
 class EspacioRepositoryImpl(EspacioRepository):
-    """Implementación de EspacioRepository con PostgreSQL"""
+    """Implementación de EspacioRepository con PostgreSQL (asyncpg)"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, cache: Optional[CacheCatalogo] = None):
         self.db = db
+        self.cache = cache if cache is not None else cache_espacios
     
     async def crear(self, espacio: EspacioEntity) -> EspacioEntity:
         db_espacio = EspacioORM(nombre=espacio.nombre)
         self.db.add(db_espacio)
-        self.db.commit()
-        self.db.refresh(db_espacio)
+        await self.db.commit()
+        self.cache.invalidar()
+        await self.db.refresh(db_espacio)
         return self._to_entity(db_espacio)
     
     async def obtener_por_id(self, espacio_id: int) -> Optional[EspacioEntity]:
-        db_espacio = self.db.query(EspacioORM).filter(EspacioORM.id == espacio_id).first()
-        return self._to_entity(db_espacio) if db_espacio else None
+        return await self.cache.obtener_por_id(espacio_id, self._cargar_catalogo)
     
     async def listar(self, skip: int = 0, limit: int = 100) -> List[EspacioEntity]:
-        db_espacios = self.db.query(EspacioORM).offset(skip).limit(limit).all()
-        return [self._to_entity(e) for e in db_espacios]
-    
-    async def obtener_espacios_ocupados(self, fecha: Date, bloque_id: int) -> List[int]:
-        """Obtiene IDs de espacios ocupados en una fecha y bloque específicos"""
-        reservas = self.db.query(ReservaORM.espacio_id).filter(
-            ReservaORM.fecha == fecha,
-            ReservaORM.bloque_id == bloque_id
-        ).all()
-        return [r.espacio_id for r in reservas]
-    
-    async def esta_disponible(self, espacio_id: int, fecha: Date, bloque_id: int) -> bool:
-        """Verifica si un espacio está disponible"""
-        reserva = self.db.query(ReservaORM).filter(
-            ReservaORM.espacio_id == espacio_id,
-            ReservaORM.fecha == fecha,
-            ReservaORM.bloque_id == bloque_id
-        ).first()
-        return reserva is None
+        espacios = await self.cache.obtener(self._cargar_catalogo)
+        return espacios[skip:skip + limit]
+    
+    async def _cargar_catalogo(self) -> List[EspacioEntity]:
+        result = await self.db.execute(select(EspacioORM).order_by(EspacioORM.id))
+        return [self._to_entity(e) for e in result.scalars().all()]
     
     @staticmethod
     def _to_entity(orm: EspacioORM) -> Optional[EspacioEntity]:
@@ -321,25 +653,32 @@ class EspacioRepositoryImpl(EspacioRepository):
 
 
 class BloqueHorarioRepositoryImpl(BloqueHorarioRepository):
-    """Implementación de BloqueHorarioRepository con PostgreSQL"""
+    """Implementación de BloqueHorarioRepository con PostgreSQL (asyncpg)"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, cache: Optional[CacheCatalogo] = None):
         self.db = db
+        self.cache = cache if cache is not None else cache_bloques
     
     async def crear(self, bloque: BloqueHorarioEntity) -> BloqueHorarioEntity:
         db_bloque = BloqueHorarioORM(hora_inicio=bloque.hora_inicio, hora_fin=bloque.hora_fin)
         self.db.add(db_bloque)
-        self.db.commit()
-        self.db.refresh(db_bloque)
+        await self.db.commit()
+        self.cache.invalidar()
+        await self.db.refresh(db_bloque)
         return self._to_entity(db_bloque)
     
     async def obtener_por_id(self, bloque_id: int) -> Optional[BloqueHorarioEntity]:
-        db_bloque = self.db.query(BloqueHorarioORM).filter(BloqueHorarioORM.id == bloque_id).first()
-        return self._to_entity(db_bloque) if db_bloque else None
+        return await self.cache.obtener_por_id(bloque_id, self._cargar_catalogo)
     
     async def listar(self, skip: int = 0, limit: int = 100) -> List[BloqueHorarioEntity]:
-        db_bloques = self.db.query(BloqueHorarioORM).order_by(BloqueHorarioORM.hora_inicio).offset(skip).limit(limit).all()
-        return [self._to_entity(b) for b in db_bloques]
+        bloques = await self.cache.obtener(self._cargar_catalogo)
+        return bloques[skip:skip + limit]
+    
+    async def _cargar_catalogo(self) -> List[BloqueHorarioEntity]:
+        result = await self.db.execute(
+            select(BloqueHorarioORM).order_by(BloqueHorarioORM.hora_inicio, BloqueHorarioORM.id)
+        )
+        return [self._to_entity(b) for b in result.scalars().all()]
     
     @staticmethod
     def _to_entity(orm: BloqueHorarioORM) -> Optional[BloqueHorarioEntity]:
@@ -353,50 +692,30 @@ class BloqueHorarioRepositoryImpl(BloqueHorarioRepository):
 
 
 class MaquinaRepositoryImpl(MaquinaRepository):
-    """Implementación de MaquinaRepository con PostgreSQL"""
+    """Implementación de MaquinaRepository con PostgreSQL (asyncpg)"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, cache: Optional[CacheCatalogo] = None):
         self.db = db
+        self.cache = cache if cache is not None else cache_maquinas
     
     async def crear(self, maquina: MaquinaEntity) -> MaquinaEntity:
         db_maquina = MaquinaORM(codigo=maquina.codigo)
         self.db.add(db_maquina)
-        self.db.commit()
-        self.db.refresh(db_maquina)
+        await self.db.commit()
+        self.cache.invalidar()
+        await self.db.refresh(db_maquina)
         return self._to_entity(db_maquina)
     
     async def obtener_por_id(self, maquina_id: int) -> Optional[MaquinaEntity]:
-        db_maquina = self.db.query(MaquinaORM).filter(MaquinaORM.id == maquina_id).first()
-        return self._to_entity(db_maquina) if db_maquina else None
+        return await self.cache.obtener_por_id(maquina_id, self._cargar_catalogo)
     
     async def listar(self, skip: int = 0, limit: int = 100) -> List[MaquinaEntity]:
-        db_maquinas = self.db.query(MaquinaORM).offset(skip).limit(limit).all()
-        return [self._to_entity(m) for m in db_maquinas]
-    
-    async def contar_maquinas_en_uso(self, fecha: Date, bloque_id: int) -> int:
-        """Cuenta cuántas máquinas están en uso en un bloque específico"""
-        count = self.db.query(ReservaORM).filter(
-            ReservaORM.fecha == fecha,
-            ReservaORM.bloque_id == bloque_id,
-            ReservaORM.maquina_id.isnot(None)
-        ).count()
-        return count
-    
-    async def obtener_maquina_disponible(self, fecha: Date, bloque_id: int) -> Optional[int]:
-        """Obtiene el ID de una máquina disponible, si existe"""
-        maquinas_en_uso = self.db.query(ReservaORM.maquina_id).filter(
-            ReservaORM.fecha == fecha,
-            ReservaORM.bloque_id == bloque_id,
-            ReservaORM.maquina_id.isnot(None)
-        ).all()
-        
-        ids_en_uso = {m.maquina_id for m in maquinas_en_uso}
-        
-        maquina_libre = self.db.query(MaquinaORM).filter(
-            ~MaquinaORM.id.in_(ids_en_uso)
-        ).first()
-        
-        return maquina_libre.id if maquina_libre else None
+        maquinas = await self.cache.obtener(self._cargar_catalogo)
+        return maquinas[skip:skip + limit]
+    
+    async def _cargar_catalogo(self) -> List[MaquinaEntity]:
+        result = await self.db.execute(select(MaquinaORM).order_by(MaquinaORM.id))
+        return [self._to_entity(m) for m in result.scalars().all()]
     
     @staticmethod
     def _to_entity(orm: MaquinaORM) -> Optional[MaquinaEntity]:
@@ -406,10 +725,11 @@ class MaquinaRepositoryImpl(MaquinaRepository):
 
 
 class ReservaRepositoryImpl(ReservaRepository):
-    """Implementación de ReservaRepository con PostgreSQL"""
+    """Implementación de ReservaRepository con PostgreSQL (asyncpg)"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, versiones: Optional[VersionesReservas] = None):
         self.db = db
+        self.versiones = versiones if versiones is not None else versiones_reservas
     
     async def crear(self, reserva: ReservaEntity) -> ReservaEntity:
         db_reserva = ReservaORM(
@@ -421,32 +741,331 @@ class ReservaRepositoryImpl(ReservaRepository):
             fecha=reserva.fecha
         )
         self.db.add(db_reserva)
-        self.db.commit()
-        self.db.refresh(db_reserva)
+        await self._escribir([reserva.fecha])
+        filas = await _filas_ocupacion(self.db, [reserva])
+        await _aplicar_disponibilidad(self.db, filas, 1)
+        await self._validar_carga(filas, [reserva.fecha])
+        await self._confirmar([reserva.fecha])
+        self.versiones.incrementar([reserva.fecha])
+        await self.db.refresh(db_reserva)
         return self._to_entity(db_reserva)
     
+    async def crear_muchas(self, reservas: List[ReservaEntity]) -> List[ReservaEntity]:
+        """
+        Inserta todas las reservas con un único INSERT ... VALUES (...), (...) RETURNING
+        y un solo commit. Si falla, no queda ninguna reserva insertada. Devuelve las
+        reservas creadas en el mismo orden que ``reservas``.
+        
+        Raises:
+            ConflictoReservaError: Si otra reserva ya ocupa alguno de los espacios o máquinas,
+                o el fisioterapeuta quedaría por encima de su capacidad
+        """
+        if not reservas:
+            return []
+        
+        valores = [
+            {
+                "paciente_id": r.paciente_id,
+                "fisioterapeuta_id": r.fisioterapeuta_id,
+                "espacio_id": r.espacio_id,
+                "bloque_id": r.bloque_id,
+                "maquina_id": r.maquina_id,
+                "fecha": r.fecha
+            }
+            for r in reservas
+        ]
+        fechas = [r.fecha for r in reservas]
+        try:
+            filas_ocupacion = await _filas_ocupacion(self.db, reservas)
+            result = await self.db.execute(
+                insert(ReservaORM).values(valores).returning(
+                    ReservaORM.id,
+                    ReservaORM.paciente_id,
+                    ReservaORM.fisioterapeuta_id,
+                    ReservaORM.espacio_id,
+                    ReservaORM.bloque_id,
+                    ReservaORM.maquina_id,
+                    ReservaORM.fecha
+                )
+            )
+            filas = result.all()
+            await _aplicar_disponibilidad(self.db, filas_ocupacion, 1)
+            await self._validar_carga(filas_ocupacion, fechas)
+        except ConflictoReservaError:
+            raise
+        except IntegrityError as error:
+            await self._descartar_conflicto(error, fechas)
+            raise
+        except Exception:
+            await self.db.rollback()
+            raise
+        await self._confirmar(fechas)
+        self.versiones.incrementar(fechas)
+        
+        # RETURNING no garantiza el orden de VALUES: (fecha, bloque, espacio) es única
+        # en la tabla, así que identifica la fila de cada reserva de entrada
+        por_clave = {(fila.fecha, fila.bloque_id, fila.espacio_id): fila for fila in filas}
+        return [
+            self._to_entity(por_clave[(r.fecha, r.bloque_id, r.espacio_id)])
+            for r in reservas
+        ]
+    
     async def obtener_por_id(self, reserva_id: int) -> Optional[ReservaEntity]:
-        db_reserva = self.db.query(ReservaORM).filter(ReservaORM.id == reserva_id).first()
+        db_reserva = await self._obtener_orm(reserva_id)
         return self._to_entity(db_reserva) if db_reserva else None
     
     async def listar(self, skip: int = 0, limit: int = 100) -> List[ReservaEntity]:
-        db_reservas = self.db.query(ReservaORM).offset(skip).limit(limit).all()
-        return [self._to_entity(r) for r in db_reservas]
+        result = await self.db.execute(select(ReservaORM).offset(skip).limit(limit))
+        return [self._to_entity(r) for r in result.scalars().all()]
+    
+    # Columnas de la clave de paginación por cada orden admitido
+    ORDENES_CURSOR = {
+        "id": (ReservaORM.id,),
+        "fecha": (ReservaORM.fecha, ReservaORM.id)
+    }
+    
+    async def listar_por_cursor(
+        self, cursor: Optional[str] = None, limit: int = 10, orden: str = "id"
+    ) -> Pagina:
+        """Paginación keyset: coste constante sin importar la profundidad de la página"""
+        if orden not in self.ORDENES_CURSOR:
+            raise ValueError(f"Orden no soportado: {orden}")
+        filas, siguiente = await listar_por_cursor(
+            self.db, select(ReservaORM), orden, self.ORDENES_CURSOR[orden], cursor, limit
+        )
+        return Pagina(items=[self._to_entity(r) for r in filas], siguiente_cursor=siguiente)
+    
+    async def exportar(self, tamano_lote: int = EXPORTACION_TAMANO_LOTE) -> AsyncIterator[ReservaEntity]:
+        """Cursor del lado del servidor: solo ``tamano_lote`` filas en memoria a la vez"""
+        result = await self.db.stream(
+            select(ReservaORM).order_by(ReservaORM.id).execution_options(yield_per=tamano_lote)
+        )
+        async for db_reserva in result.scalars():
+            yield self._to_entity(db_reserva)
     
     async def listar_por_paciente(self, paciente_id: int) -> List[ReservaEntity]:
         """Lista todas las reservas de un paciente"""
-        db_reservas = self.db.query(ReservaORM).filter(
-            ReservaORM.paciente_id == paciente_id
-        ).order_by(ReservaORM.fecha).all()
-        return [self._to_entity(r) for r in db_reservas]
+        result = await self.db.execute(
+            select(ReservaORM).where(
+                ReservaORM.paciente_id == paciente_id
+            ).order_by(ReservaORM.fecha)
+        )
+        return [self._to_entity(r) for r in result.scalars().all()]
+    
+    async def listar_por_fisioterapeuta(self, fisioterapeuta_id: int) -> List[ReservaEntity]:
+        """Lista todas las reservas de un fisioterapeuta"""
+        result = await self.db.execute(
+            select(ReservaORM).where(
+                ReservaORM.fisioterapeuta_id == fisioterapeuta_id
+            ).order_by(ReservaORM.fecha)
+        )
+        return [self._to_entity(r) for r in result.scalars().all()]
+    
+    async def actualizar(self, reserva_id: int, datos: dict) -> Optional[ReservaEntity]:
+        # Bloqueada hasta el commit: la ocupación que se descuenta es la vigente
+        db_reserva = await self._obtener_orm(reserva_id, bloquear=True)
+        if not db_reserva:
+            return None
+        anterior = self._to_entity(db_reserva)
+        for key, value in datos.items():
+            if hasattr(db_reserva, key) and value is not None:
+                setattr(db_reserva, key, value)
+        if not self.db.is_modified(db_reserva):
+            return anterior
+        fechas = [anterior.fecha, db_reserva.fecha]
+        await self._escribir(fechas)
+        filas_anteriores = await _filas_ocupacion(self.db, [anterior])
+        filas_nuevas = await _filas_ocupacion(self.db, [self._to_entity(db_reserva)])
+        await _aplicar_disponibilidad(self.db, filas_anteriores, -1)
+        await _aplicar_disponibilidad(self.db, filas_nuevas, 1)
+        await self._validar_carga(filas_nuevas, fechas)
+        await self._confirmar(fechas)
+        self.versiones.incrementar(fechas)
+        await self.db.refresh(db_reserva)
+        return self._to_entity(db_reserva)
+    
+    async def eliminar(self, reserva_id: int) -> bool:
+        # RETURNING: se descuenta la reserva tal como se borró, y una sola vez
+        # aunque otra petición la elimine a la vez
+        result = await self.db.execute(
+            delete(ReservaORM).where(ReservaORM.id == reserva_id).returning(
+                ReservaORM.id,
+                ReservaORM.paciente_id,
+                ReservaORM.fisioterapeuta_id,
+                ReservaORM.espacio_id,
+                ReservaORM.bloque_id,
+                ReservaORM.maquina_id,
+                ReservaORM.fecha
+            )
+        )
+        fila = result.first()
+        if fila is None:
+            await self.db.rollback()
+            return False
+        filas = await _filas_ocupacion(self.db, [self._to_entity(fila)])
+        await _aplicar_disponibilidad(self.db, filas, -1)
+        await self.db.commit()
+        self.versiones.incrementar([fila.fecha])
+        return True
+    
+    async def listar_por_rango(
+        self, fecha_inicio: Date, fecha_fin: Date, bloque_id: Optional[int] = None
+    ) -> List[ReservaEntity]:
+        stmt = select(ReservaORM).where(
+            ReservaORM.fecha >= fecha_inicio,
+            ReservaORM.fecha <= fecha_fin
+        ).order_by(ReservaORM.fecha, ReservaORM.bloque_id, ReservaORM.id)
+        if bloque_id is not None:
+            stmt = stmt.where(ReservaORM.bloque_id == bloque_id)
+        result = await self.db.execute(stmt)
+        return [self._to_entity(r) for r in result.scalars().all()]
     
     async def listar_por_fecha_bloque(self, fecha: Date, bloque_id: int) -> List[ReservaEntity]:
         """Lista reservas de una fecha y bloque específicos"""
-        db_reservas = self.db.query(ReservaORM).filter(
-            ReservaORM.fecha == fecha,
-            ReservaORM.bloque_id == bloque_id
-        ).all()
-        return [self._to_entity(r) for r in db_reservas]
+        result = await self.db.execute(
+            select(ReservaORM).where(
+                ReservaORM.fecha == fecha,
+                ReservaORM.bloque_id == bloque_id
+            )
+        )
+        return [self._to_entity(r) for r in result.scalars().all()]
+    
+    async def obtener_ocupacion_rango(
+        self, fecha_inicio: Date, fecha_fin: Date, bloque_id: Optional[int] = None
+    ) -> List[OcupacionBloque]:
+        """
+        Ocupación de todos los bloques con reservas en [fecha_inicio, fecha_fin]
+        (o solo de ``bloque_id``).
+        
+        Una sola consulta agrupada por (fecha, bloque, fisioterapeuta) reemplaza
+        las consultas por bloque de espacios, máquinas y carga del fisioterapeuta.
+        """
+        stmt = (
+            select(
+                ReservaORM.fecha,
+                ReservaORM.bloque_id,
+                ReservaORM.fisioterapeuta_id,
+                func.count(ReservaORM.id).label("reservas"),
+                func.count(ReservaORM.maquina_id).label("maquinas"),
+                func.count(case((PacienteORM.requiere_tratamiento_especial == True, 1))).label("trato_especial")
+            ).outerjoin(
+                PacienteORM, ReservaORM.paciente_id == PacienteORM.id
+            ).where(
+                ReservaORM.fecha >= fecha_inicio,
+                ReservaORM.fecha <= fecha_fin
+            ).group_by(
+                ReservaORM.fecha,
+                ReservaORM.bloque_id,
+                ReservaORM.fisioterapeuta_id
+            )
+        )
+        if bloque_id is not None:
+            stmt = stmt.where(ReservaORM.bloque_id == bloque_id)
+        result = await self.db.execute(stmt)
+        
+        ocupacion = {}
+        for fila in result.all():
+            clave = (fila.fecha, fila.bloque_id)
+            bloque = ocupacion.get(clave)
+            if bloque is None:
+                bloque = ocupacion[clave] = OcupacionBloque(fecha=fila.fecha, bloque_id=fila.bloque_id)
+            bloque.espacios_ocupados += fila.reservas
+            bloque.maquinas_en_uso += fila.maquinas
+            bloque.pacientes_por_fisio[fila.fisioterapeuta_id] = fila.reservas
+            if fila.trato_especial:
+                bloque.fisios_con_trato_especial.add(fila.fisioterapeuta_id)
+        return list(ocupacion.values())
+    
+    async def obtener_ocupacion_materializada(self, fecha_inicio: Date, fecha_fin: Date) -> List[OcupacionBloque]:
+        """
+        Igual que obtener_ocupacion_rango, pero leída de disponibilidad_diaria:
+        un recorrido por rango de su clave primaria en lugar de agrupar reservas.
+        """
+        result = await self.db.execute(
+            select(
+                DisponibilidadDiariaORM.fecha,
+                DisponibilidadDiariaORM.bloque_id,
+                DisponibilidadDiariaORM.espacios_ocupados,
+                DisponibilidadDiariaORM.maquinas_en_uso,
+                CargaFisioterapeutaORM.fisioterapeuta_id,
+                CargaFisioterapeutaORM.pacientes,
+                CargaFisioterapeutaORM.pacientes_trato_especial
+            ).outerjoin(
+                CargaFisioterapeutaORM,
+                and_(
+                    CargaFisioterapeutaORM.fecha == DisponibilidadDiariaORM.fecha,
+                    CargaFisioterapeutaORM.bloque_id == DisponibilidadDiariaORM.bloque_id,
+                    CargaFisioterapeutaORM.pacientes > 0
+                )
+            ).where(
+                DisponibilidadDiariaORM.fecha >= fecha_inicio,
+                DisponibilidadDiariaORM.fecha <= fecha_fin,
+                DisponibilidadDiariaORM.espacios_ocupados > 0
+            )
+        )
+        
+        ocupacion = {}
+        for fila in result.all():
+            clave = (fila.fecha, fila.bloque_id)
+            bloque = ocupacion.get(clave)
+            if bloque is None:
+                bloque = ocupacion[clave] = OcupacionBloque(
+                    fecha=fila.fecha,
+                    bloque_id=fila.bloque_id,
+                    espacios_ocupados=fila.espacios_ocupados,
+                    maquinas_en_uso=fila.maquinas_en_uso
+                )
+            if fila.fisioterapeuta_id is None:
+                continue
+            bloque.pacientes_por_fisio[fila.fisioterapeuta_id] = fila.pacientes
+            if fila.pacientes_trato_especial:
+                bloque.fisios_con_trato_especial.add(fila.fisioterapeuta_id)
+        return list(ocupacion.values())
+    
+    async def _escribir(self, fechas: List[Date]) -> None:
+        """
+        Envía los cambios de reservas pendientes antes de tocar la disponibilidad
+        materializada: todas las escrituras bloquean las tablas en el mismo orden
+        (reservas primero), también frente a reconstruir_disponibilidad.
+        """
+        try:
+            await self.db.flush()
+        except IntegrityError as error:
+            await self._descartar_conflicto(error, fechas)
+            raise
+    
+    async def _confirmar(self, fechas: List[Date]) -> None:
+        """Commit que traduce la violación de las restricciones únicas a ConflictoReservaError"""
+        try:
+            await self.db.commit()
+        except IntegrityError as error:
+            await self._descartar_conflicto(error, fechas)
+            raise
+    
+    async def _validar_carga(self, filas: List[FilaOcupacion], fechas: List[Date]) -> None:
+        """Deshace la transacción si deja a algún fisioterapeuta por encima de su capacidad"""
+        motivo = await _carga_excedida(self.db, filas)
+        if motivo:
+            await self.db.rollback()
+            registrar_conflicto()
+            raise ConflictoReservaError(fechas, motivo)
+    
+    async def _descartar_conflicto(self, error: IntegrityError, fechas: List[Date]) -> None:
+        """
+        Deshace la transacción fallida y, si fue un conflicto de espacio o máquina,
+        lo traduce a ConflictoReservaError para que el caso de uso vuelva a planificar.
+        """
+        await self.db.rollback()
+        if _es_conflicto_reserva(error):
+            registrar_conflicto()
+            raise ConflictoReservaError(fechas) from error
+    
+    async def _obtener_orm(self, reserva_id: int, bloquear: bool = False) -> Optional[ReservaORM]:
+        stmt = select(ReservaORM).where(ReservaORM.id == reserva_id)
+        if bloquear:
+            stmt = stmt.with_for_update()
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
     
     @staticmethod
     def _to_entity(orm: ReservaORM) -> Optional[ReservaEntity]:
@@ -461,4 +1080,181 @@ class ReservaRepositoryImpl(ReservaRepository):
             maquina_id=orm.maquina_id,
             fecha=orm.fecha
         )
-      
+
+
+class DiagnosticoRepositoryImpl(DiagnosticoRepository):
+    """Implementación de DiagnosticoRepository con PostgreSQL (asyncpg)"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def crear(self, diagnostico: DiagnosticoEntity) -> DiagnosticoEntity:
+        db_diagnostico = DiagnosticoORM(
+            paciente_id=diagnostico.paciente_id,
+            sessions=diagnostico.sessions,
+            treatment=diagnostico.treatment
+        )
+        self.db.add(db_diagnostico)
+        await self.db.commit()
+        await self.db.refresh(db_diagnostico)
+        return self._to_entity(db_diagnostico)
+    
+    async def obtener_por_id(self, diagnostico_id: int) -> Optional[DiagnosticoEntity]:
+        result = await self.db.execute(select(DiagnosticoORM).where(DiagnosticoORM.id == diagnostico_id))
+        db_diagnostico = result.scalars().first()
+        return self._to_entity(db_diagnostico) if db_diagnostico else None
+    
+    async def listar_por_paciente(self, paciente_id: int) -> List[DiagnosticoEntity]:
+        """Lista todos los diagnósticos de un paciente"""
+        result = await self.db.execute(
+            select(DiagnosticoORM).where(
+                DiagnosticoORM.paciente_id == paciente_id
+            ).order_by(DiagnosticoORM.id)
+        )
+        return [self._to_entity(d) for d in result.scalars().all()]
+    
+    @staticmethod
+    def _to_entity(orm: DiagnosticoORM) -> Optional[DiagnosticoEntity]:
+        if not orm:
+            return None
+        return DiagnosticoEntity(
+            id=orm.id,
+            paciente_id=orm.paciente_id,
+            sessions=orm.sessions,
+            treatment=orm.treatment
+        )
+
+
+class CitaRepositoryImpl(CitaRepository):
+    """Implementación de CitaRepository con PostgreSQL (asyncpg)"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def crear(self, cita: CitaEntity) -> CitaEntity:
+        db_cita = CitaORM(
+            titulo=cita.titulo,
+            descripcion=cita.descripcion,
+            inicio=cita.inicio,
+            fin=cita.fin,
+            email=cita.email,
+            google_event_id=cita.google_event_id
+        )
+        self.db.add(db_cita)
+        await self.db.commit()
+        await self.db.refresh(db_cita)
+        return self._to_entity(db_cita)
+    
+    async def obtener_por_id(self, cita_id: int) -> Optional[CitaEntity]:
+        result = await self.db.execute(select(CitaORM).where(CitaORM.id == cita_id))
+        db_cita = result.scalars().first()
+        return self._to_entity(db_cita) if db_cita else None
+    
+    async def listar(self, skip: int = 0, limit: int = 100) -> List[CitaEntity]:
+        result = await self.db.execute(
+            select(CitaORM).order_by(CitaORM.inicio).offset(skip).limit(limit)
+        )
+        return [self._to_entity(c) for c in result.scalars().all()]
+    
+    async def crear_con_evento_pendiente(
+        self, citas: List[CitaEntity], eventos: List[Dict[str, Any]]
+    ) -> List[CitaEntity]:
+        """Inserta las citas y sus filas de outbox con un solo commit"""
+        db_citas = [
+            CitaORM(
+                titulo=cita.titulo,
+                descripcion=cita.descripcion,
+                inicio=cita.inicio,
+                fin=cita.fin,
+                email=cita.email
+            )
+            for cita in citas
+        ]
+        try:
+            self.db.add_all(db_citas)
+            await self.db.flush()
+            self.db.add_all(
+                OutboxCalendarioORM(cita_id=db_cita.id, payload=evento)
+                for db_cita, evento in zip(db_citas, eventos)
+            )
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return [self._to_entity(c) for c in db_citas]
+    
+    @staticmethod
+    def _to_entity(orm: CitaORM) -> Optional[CitaEntity]:
+        if not orm:
+            return None
+        return CitaEntity(
+            id=orm.id,
+            titulo=orm.titulo,
+            descripcion=orm.descripcion,
+            inicio=orm.inicio,
+            fin=orm.fin,
+            email=orm.email,
+            google_event_id=orm.google_event_id,
+            fecha_creacion=orm.fecha_creacion
+        )
+
+
+class OutboxCalendarioRepositoryImpl:
+    """Acceso al outbox de Google Calendar (uso interno del SincronizadorCalendario)"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def reclamar_pendientes(
+        self, limite: int, ahora: datetime, plazo: timedelta
+    ) -> List[OutboxCalendarioORM]:
+        """
+        Reclama hasta ``limite`` eventos pendientes cuyo reintento ya venció: les
+        aplaza ``proximo_intento`` en ``plazo`` y confirma. El envío a Google se
+        hace después, sin transacción ni bloqueos abiertos; si el worker cae, los
+        eventos vuelven a reclamarse al vencer el plazo.
+        SKIP LOCKED permite varios workers sin reclamar dos veces el mismo evento.
+        """
+        result = await self.db.execute(
+            select(OutboxCalendarioORM).where(
+                OutboxCalendarioORM.estado == "pendiente",
+                OutboxCalendarioORM.proximo_intento <= ahora
+            ).order_by(OutboxCalendarioORM.id).limit(limite).with_for_update(skip_locked=True)
+        )
+        eventos = list(result.scalars().all())
+        for evento in eventos:
+            evento.proximo_intento = ahora + plazo
+        await self.db.commit()
+        return eventos
+    
+    async def marcar_enviado(self, evento: OutboxCalendarioORM, google_event_id: str) -> None:
+        evento.estado = "enviado"
+        evento.intentos += 1
+        evento.ultimo_error = None
+        await self.db.execute(
+            update(CitaORM).where(CitaORM.id == evento.cita_id).values(google_event_id=google_event_id)
+        )
+    
+    async def reprogramar(
+        self,
+        evento: OutboxCalendarioORM,
+        error: Exception,
+        proximo_intento: Optional[datetime]
+    ) -> None:
+        """Registra el fallo; sin ``proximo_intento`` el evento queda como fallido"""
+        evento.intentos += 1
+        evento.ultimo_error = str(error)[:1000]
+        if proximo_intento is None:
+            evento.estado = "fallido"
+        else:
+            evento.proximo_intento = proximo_intento
+    
+    async def confirmar(self) -> None:
+        await self.db.commit()
+    
+    async def contar_por_estado(self) -> Dict[str, int]:
+        result = await self.db.execute(
+            select(OutboxCalendarioORM.estado, func.count(OutboxCalendarioORM.id))
+            .group_by(OutboxCalendarioORM.estado)
+        )
+        return {estado: total for estado, total in result.all()}
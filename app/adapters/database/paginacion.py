@@ -0,0 +1,75 @@
+"""
+Paginación por cursor (keyset)
+
+En vez de OFFSET, cada página continúa desde la clave de la última fila de la
+anterior: WHERE (col1, col2) > (:v1, :v2) ORDER BY col1, col2 LIMIT n. Con un
+índice sobre esas columnas el coste de una página no depende de su profundidad.
+
+El cursor es opaco para el cliente: JSON en base64 url-safe con el orden usado
+y los valores de la clave.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def codificar_cursor(orden: str, valores: Sequence[Any]) -> str:
+    datos = {
+        "o": orden,
+        "v": [v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores]
+    }
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, orden: str, columnas: Sequence[Any]) -> Tuple[Any, ...]:
+    """Valores de la clave guardados en el cursor, con el tipo Python de cada columna"""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if datos["o"] != orden or len(datos["v"]) != len(columnas):
+            raise ValueError
+        valores = []
+        for columna, valor in zip(columnas, datos["v"]):
+            tipo = columna.type.python_type
+            if tipo is datetime:
+                valor = datetime.fromisoformat(valor)
+            elif tipo is date:
+                valor = date.fromisoformat(valor)
+            elif not isinstance(valor, tipo):
+                raise ValueError
+            valores.append(valor)
+        return tuple(valores)
+    except (ValueError, KeyError, TypeError, binascii.Error, json.JSONDecodeError):
+        raise ValueError("Cursor de paginación inválido")
+
+
+async def listar_por_cursor(
+    db: AsyncSession,
+    consulta: Select,
+    orden: str,
+    columnas: Sequence[Any],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Ejecuta una página de ``consulta`` ordenada por ``columnas`` (la última debe
+    ser única, normalmente el id). Devuelve las filas ORM y el cursor de la
+    página siguiente, o None si no hay más.
+    """
+    if cursor:
+        consulta = consulta.where(tuple_(*columnas) > tuple_(*decodificar_cursor(cursor, orden, columnas)))
+    # Se pide una fila de más para saber si existe una página siguiente
+    result = await db.execute(consulta.order_by(*columnas).limit(limit + 1))
+    filas = list(result.scalars().all())
+    
+    if len(filas) <= limit:
+        return filas, None
+    filas = filas[:limit]
+    ultima = filas[-1]
+    return filas, codificar_cursor(orden, [getattr(ultima, c.key) for c in columnas])
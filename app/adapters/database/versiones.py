@@ -0,0 +1,63 @@
+"""
+Versiones de las reservas por fecha
+
+Cada escritura confirmada de reservas asigna a sus fechas un número de un
+contador monótono; la versión de un rango es el mayor número de sus fechas, así
+que cambia en cuanto se escribe cualquier fecha del rango. Los cambios que
+afectan a todas las fechas (p. ej. el trato especial de un paciente) elevan la
+versión global.
+
+Las fechas se guardan ordenadas y como mucho ``maximo_fechas``: al pasarse, las
+más antiguas se descartan y su número pasa a la versión global, que es el mínimo
+de cualquier rango (invalida de más, nunca de menos).
+
+Sirve para validar cachés de respuestas sin consultar la base de datos. Es local
+al proceso: las cachés que dependan de ella deben tener también un TTL.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+
+class VersionesReservas:
+    """Contador de versiones de reservas por fecha"""
+    
+    def __init__(self, maximo_fechas: int = 1024):
+        self.maximo_fechas = maximo_fechas
+        self._contador = 0
+        self._global = 0
+        self._por_fecha: Dict[date, int] = {}
+        self._fechas: List[date] = []
+    
+    def incrementar(self, fechas: Optional[Iterable[date]] = None) -> None:
+        """Marca como modificadas las fechas indicadas (o todas)"""
+        self._contador += 1
+        if fechas is None:
+            self._global = self._contador
+            self._por_fecha.clear()
+            self._fechas.clear()
+            return
+        for fecha in fechas:
+            if fecha not in self._por_fecha:
+                insort(self._fechas, fecha)
+            self._por_fecha[fecha] = self._contador
+        
+        sobrantes = len(self._fechas) - self.maximo_fechas
+        if sobrantes > 0:
+            for fecha in self._fechas[:sobrantes]:
+                self._global = max(self._global, self._por_fecha.pop(fecha))
+            del self._fechas[:sobrantes]
+    
+    def version(self, fecha_inicio: date, fecha_fin: date) -> int:
+        """Versión del rango [fecha_inicio, fecha_fin]"""
+        desde = bisect_left(self._fechas, fecha_inicio)
+        hasta = bisect_right(self._fechas, fecha_fin)
+        return max(
+            (self._por_fecha[f] for f in self._fechas[desde:hasta]),
+            default=self._global
+        )
+
+
+# Instancia compartida por los repositorios del proceso
+versiones_reservas = VersionesReservas()
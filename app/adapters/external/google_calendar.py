@@ -3,21 +3,158 @@ Adaptador Externo - Google Calendar
 """
 
 import os
+import json
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+import httplib2
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 
+from app.db.config import GOOGLE_DISCOVERY_CACHE
+from app.domain.ports import ServicioCalendario
+
 load_dotenv()
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 GOOGLE_CREDENTIALS = os.getenv("GOOGLE_CREDENTIALS", "credentials.json")
 CALENDAR_ID = os.getenv("CALENDAR_ID")
 
-try:
-    credentials = service_account.Credentials.from_service_account_file(
-        GOOGLE_CREDENTIALS, scopes=SCOPES
-    )
-    calendar_service = build("calendar", "v3", credentials=credentials)
-except Exception as e:
-    print(f"⚠️ Google Calendar no inicializado: {e}")
-    calendar_service = None
+# Límite recomendado por Google Calendar para una petición batch
+MAX_EVENTOS_POR_LOTE = 50
+
+
+class CalendarioGoogle(ServicioCalendario):
+    """
+    Crea eventos en Google Calendar agrupando las inserciones en peticiones
+    batch (new_batch_http_request): N eventos cuestan ~N/50 viajes HTTPS.
+    
+    El cliente de Google es síncrono, así que cada operación corre en un hilo
+    (asyncio.to_thread) con su propio transporte HTTP, ya que httplib2.Http no
+    es seguro entre hilos. ``http_factory`` permite inyectar un transporte falso
+    (p. ej. googleapiclient.http.HttpMockSequence).
+    
+    Si en lugar de ``service`` se pasa ``fabrica_servicio``, el cliente se
+    construye en el primer uso (dentro del hilo de trabajo), no al arrancar.
+    
+    Los eventos que traen su propio "id" son idempotentes: si Google responde
+    409 (ya existe, p. ej. al reintentar un envío que sí llegó), se da por creado.
+    """
+    
+    def __init__(
+        self,
+        service: Any = None,
+        calendar_id: str = "primary",
+        credentials: Any = None,
+        http_factory: Optional[Callable[[], Any]] = None,
+        tamano_lote: int = MAX_EVENTOS_POR_LOTE,
+        fabrica_servicio: Optional[Callable[[], Any]] = None
+    ):
+        self._service = service
+        self._fabrica_servicio = fabrica_servicio
+        self._lock_servicio = threading.Lock()
+        self.calendar_id = calendar_id
+        self.credentials = credentials
+        self.http_factory = http_factory or self._http_autorizado
+        self.tamano_lote = tamano_lote
+    
+    @property
+    def service(self) -> Any:
+        if self._service is None:
+            with self._lock_servicio:
+                if self._service is None:
+                    self._service = self._fabrica_servicio()
+        return self._service
+    
+    def _http_autorizado(self) -> AuthorizedHttp:
+        return AuthorizedHttp(self.credentials, http=httplib2.Http())
+    
+    async def crear_eventos(self, eventos: List[Dict[str, Any]]) -> List[Union[str, Exception]]:
+        """
+        Inserta los eventos y devuelve, en el mismo orden, el ID creado o el
+        HttpError de cada uno (un fallo no impide crear los demás).
+        """
+        if not eventos:
+            return []
+        return await asyncio.to_thread(self._crear_eventos_sync, eventos)
+    
+    def _crear_eventos_sync(self, eventos: List[Dict[str, Any]]) -> List[Union[str, Exception]]:
+        http = self.http_factory()
+        resultados: List[Union[str, Exception]] = [None] * len(eventos)
+        
+        def al_responder(request_id: str, respuesta: Dict[str, Any], error: Optional[HttpError]):
+            posicion = int(request_id)
+            if error is None:
+                resultados[posicion] = respuesta["id"]
+            elif error.resp.status == 409 and "id" in eventos[posicion]:
+                resultados[posicion] = eventos[posicion]["id"]
+            else:
+                resultados[posicion] = error
+        
+        for inicio in range(0, len(eventos), self.tamano_lote):
+            lote = self.service.new_batch_http_request(callback=al_responder)
+            for posicion, evento in enumerate(eventos[inicio:inicio + self.tamano_lote], start=inicio):
+                lote.add(
+                    self.service.events().insert(
+                        calendarId=self.calendar_id,
+                        body=evento,
+                        sendUpdates="all"
+                    ),
+                    request_id=str(posicion)
+                )
+            lote.execute(http=http)
+        
+        return resultados
+
+
+def construir_servicio(credentials: Any, ruta_cache: str = GOOGLE_DISCOVERY_CACHE) -> Any:
+    """
+    Cliente de Calendar v3 a partir del documento de descubrimiento guardado en
+    disco. Si no existe, lo descarga (build) y lo guarda para los siguientes
+    arranques y workers.
+    """
+    try:
+        with open(ruta_cache, encoding="utf-8") as archivo:
+            return build_from_document(archivo.read(), credentials=credentials)
+    except (OSError, ValueError):
+        pass
+    
+    service = build("calendar", "v3", credentials=credentials, cache_discovery=False)
+    try:
+        os.makedirs(os.path.dirname(ruta_cache) or ".", exist_ok=True)
+        temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(service._rootDesc, archivo)
+        os.replace(temporal, ruta_cache)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar el documento de descubrimiento de Google: {e}")
+    return service
+
+
+_calendario: Optional[CalendarioGoogle] = None
+
+
+def obtener_calendario() -> Optional[CalendarioGoogle]:
+    """
+    Calendario de Google del proceso, o None si no hay credenciales.
+    
+    Solo lee las credenciales: el cliente se construye en el primer envío.
+    """
+    global _calendario
+    if _calendario is None:
+        try:
+            credentials = service_account.Credentials.from_service_account_file(
+                GOOGLE_CREDENTIALS, scopes=SCOPES
+            )
+        except Exception as e:
+            print(f"⚠️ Google Calendar no inicializado: {e}")
+            return None
+        _calendario = CalendarioGoogle(
+            calendar_id=CALENDAR_ID or "primary",
+            credentials=credentials,
+            fabrica_servicio=lambda: construir_servicio(credentials)
+        )
+    return _calendario
@@ -0,0 +1,150 @@
+"""
+Worker en segundo plano: vacía el outbox de Google Calendar
+
+Las rutas solo escriben la cita y su evento pendiente (misma transacción); este
+worker los envía por lotes, reintenta con backoff exponencial y completa
+CitaORM.google_event_id. La latencia y los fallos de Google quedan fuera de la
+petición HTTP.
+
+Cada lote se reclama en una transacción corta (SKIP LOCKED y un plazo en
+proximo_intento) y los resultados se escriben en otra: ninguna fila queda
+bloqueada mientras dura la llamada a Google.
+
+La entrega es al menos una vez (un envío que llegó puede reintentarse), así que
+cada evento lleva un id derivado del outbox: Google rechaza el duplicado con 409.
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.adapters.database.models import OutboxCalendarioRepositoryImpl
+from app.domain.ports import ServicioCalendario
+from app.db.config import (
+    OUTBOX_TAMANO_LOTE,
+    OUTBOX_INTERVALO_SEGUNDOS,
+    OUTBOX_MAX_INTENTOS,
+    OUTBOX_BACKOFF_BASE_SEGUNDOS,
+    OUTBOX_BACKOFF_MAX_SEGUNDOS,
+    OUTBOX_PLAZO_ENVIO_SEGUNDOS
+)
+
+# Google exige ids de 5 a 1024 caracteres en base32hex (a-v y 0-9)
+PREFIJO_EVENTO = "fisio"
+
+
+def id_evento(outbox_id: int) -> str:
+    """ID determinista del evento de Google para una fila del outbox"""
+    return f"{PREFIJO_EVENTO}{outbox_id:06d}"
+
+
+class SincronizadorCalendario:
+    """Procesa el outbox_calendario en lotes dentro de una tarea asyncio"""
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        calendario: ServicioCalendario,
+        tamano_lote: int = OUTBOX_TAMANO_LOTE,
+        intervalo: float = OUTBOX_INTERVALO_SEGUNDOS,
+        max_intentos: int = OUTBOX_MAX_INTENTOS,
+        backoff_base: float = OUTBOX_BACKOFF_BASE_SEGUNDOS,
+        backoff_max: float = OUTBOX_BACKOFF_MAX_SEGUNDOS,
+        plazo_envio: float = OUTBOX_PLAZO_ENVIO_SEGUNDOS
+    ):
+        self.session_factory = session_factory
+        self.calendario = calendario
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.max_intentos = max_intentos
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.plazo_envio = plazo_envio
+        self.enviados = 0
+        self.fallidos = 0
+        self.ultimo_error: Optional[str] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._despertar = asyncio.Event()
+    
+    @property
+    def activo(self) -> bool:
+        return self._tarea is not None and not self._tarea.done()
+    
+    def iniciar(self) -> None:
+        if not self.activo:
+            self._tarea = asyncio.create_task(self._ejecutar(), name="sincronizador-calendario")
+    
+    async def detener(self) -> None:
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        try:
+            await self._tarea
+        except asyncio.CancelledError:
+            pass
+        self._tarea = None
+    
+    def notificar(self) -> None:
+        """Despierta al worker sin esperar al siguiente intervalo (tras encolar eventos)"""
+        self._despertar.set()
+    
+    async def _ejecutar(self) -> None:
+        while True:
+            try:
+                procesados = await self.procesar_lote()
+            except Exception as e:
+                # Fallo de base de datos: se reintenta en el siguiente ciclo
+                self.ultimo_error = str(e)
+                print(f"⚠️ Error en el outbox de calendario: {e}")
+                procesados = 0
+            
+            # Lote completo: probablemente quedan más, se sigue sin esperar
+            if procesados < self.tamano_lote:
+                try:
+                    await asyncio.wait_for(self._despertar.wait(), timeout=self.intervalo)
+                except asyncio.TimeoutError:
+                    pass
+                self._despertar.clear()
+    
+    async def procesar_lote(self) -> int:
+        """Envía un lote de eventos pendientes; devuelve cuántos se procesaron"""
+        async with self.session_factory() as db:
+            outbox = OutboxCalendarioRepositoryImpl(db)
+            pendientes = await outbox.reclamar_pendientes(
+                self.tamano_lote, datetime.utcnow(), timedelta(seconds=self.plazo_envio)
+            )
+            if not pendientes:
+                return 0
+            
+            # Reclamo ya confirmado: la llamada a Google no retiene la transacción
+            try:
+                resultados = await self.calendario.crear_eventos(
+                    [{**p.payload, "id": id_evento(p.id)} for p in pendientes]
+                )
+            except Exception as e:
+                # Fallo del lote completo (red, credenciales): todos se reintentan
+                resultados = [e] * len(pendientes)
+            
+            ahora = datetime.utcnow()
+            for evento, resultado in zip(pendientes, resultados):
+                if isinstance(resultado, str):
+                    await outbox.marcar_enviado(evento, resultado)
+                    self.enviados += 1
+                else:
+                    proximo_intento = self._proximo_intento(evento.intentos, ahora)
+                    await outbox.reprogramar(evento, resultado, proximo_intento)
+                    self.ultimo_error = str(resultado)
+                    if proximo_intento is None:
+                        self.fallidos += 1
+            await outbox.confirmar()
+            return len(pendientes)
+    
+    def _proximo_intento(self, intentos_previos: int, ahora: datetime) -> Optional[datetime]:
+        """Backoff exponencial con jitter; None si se agotaron los intentos"""
+        if intentos_previos + 1 >= self.max_intentos:
+            return None
+        espera = min(self.backoff_base * 2 ** intentos_previos, self.backoff_max)
+        return ahora + timedelta(seconds=espera * random.uniform(0.5, 1.0))
@@ -22,3 +22,42 @@ DATABASE_URL_ASYNC = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{D
 SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "False").lower() == "true"
 SQLALCHEMY_POOL_SIZE = int(os.getenv("SQLALCHEMY_POOL_SIZE", "20"))
 SQLALCHEMY_MAX_OVERFLOW = int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", "40"))
+
+# Caché de catálogos (espacios, bloques, máquinas, fisioterapeutas)
+CATALOGO_TTL_SEGUNDOS = float(os.getenv("CATALOGO_TTL_SEGUNDOS", "300"))
+
+# Outbox de Google Calendar (worker en segundo plano)
+OUTBOX_TAMANO_LOTE = int(os.getenv("OUTBOX_TAMANO_LOTE", "50"))
+OUTBOX_INTERVALO_SEGUNDOS = float(os.getenv("OUTBOX_INTERVALO_SEGUNDOS", "2"))
+OUTBOX_MAX_INTENTOS = int(os.getenv("OUTBOX_MAX_INTENTOS", "8"))
+OUTBOX_BACKOFF_BASE_SEGUNDOS = float(os.getenv("OUTBOX_BACKOFF_BASE_SEGUNDOS", "2"))
+OUTBOX_BACKOFF_MAX_SEGUNDOS = float(os.getenv("OUTBOX_BACKOFF_MAX_SEGUNDOS", "600"))
+# Plazo de un lote reclamado: si el worker cae durante el envío, se reclama de nuevo al vencer
+OUTBOX_PLAZO_ENVIO_SEGUNDOS = float(os.getenv("OUTBOX_PLAZO_ENVIO_SEGUNDOS", "300"))
+
+# Exportación en streaming (filas por lote del cursor del servidor)
+EXPORTACION_TAMANO_LOTE = int(os.getenv("EXPORTACION_TAMANO_LOTE", "1000"))
+
+# Disponibilidad: leer la ocupación de la tabla materializada disponibilidad_diaria
+DISPONIBILIDAD_MATERIALIZADA = os.getenv("DISPONIBILIDAD_MATERIALIZADA", "False").lower() == "true"
+
+# Caché de respuestas de /api/citas/disponibles (ETag / If-None-Match)
+RESPUESTAS_CACHE_MAX_BYTES = int(os.getenv("RESPUESTAS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPUESTAS_CACHE_TTL_SEGUNDOS = float(os.getenv("RESPUESTAS_CACHE_TTL_SEGUNDOS", "60"))
+
+# Esquema al arrancar: "crear" (create_all en una base de datos vacía, migraciones pendientes si ya
+# tiene revisión de Alembic), "verificar" (solo comprobar la revisión, arranque rápido) u "omitir"
+ESQUEMA_AL_INICIAR = os.getenv("ESQUEMA_AL_INICIAR", "crear").lower()
+
+# Documento de descubrimiento de Google Calendar en disco (evita descargarlo al construir el cliente)
+GOOGLE_DISCOVERY_CACHE = os.getenv("GOOGLE_DISCOVERY_CACHE", ".cache/google_calendar_v3.json")
+
+# Readiness (/health/ready): tiempo máximo para el ping a la base de datos
+SALUD_TIMEOUT_SEGUNDOS = float(os.getenv("SALUD_TIMEOUT_SEGUNDOS", "2"))
+
+# Métricas por petición: cabecera Server-Timing (desactivar si no debe exponerse)
+METRICAS_SERVER_TIMING = os.getenv("METRICAS_SERVER_TIMING", "True").lower() == "true"
+
+# Detector de consultas N+1 (desarrollo): avisa de sentencias repetidas por petición
+DETECTOR_CONSULTAS = os.getenv("DETECTOR_CONSULTAS", "False").lower() == "true"
+DETECTOR_UMBRAL_REPETICIONES = int(os.getenv("DETECTOR_UMBRAL_REPETICIONES", "5"))
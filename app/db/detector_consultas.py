@@ -0,0 +1,104 @@
+"""
+Detector de consultas N+1 (modo desarrollo y tests)
+
+Agrupa las sentencias de una petición por su forma, sin valores: dos
+``SELECT ... WHERE id = $1`` con distinto id son la misma sentencia, y una lista
+``IN ($1, $2, $3)`` cuenta igual que ``IN ($1)``. Una sentencia que se repite más
+de un umbral en la misma petición suele ser una consulta dentro de un bucle.
+
+Para cada sentencia repetida guarda los puntos del código de app/ que la
+lanzaron. Los eventos del engine asíncrono corren en un greenlet hijo, así que
+la pila de las corrutinas se lee del greenlet padre.
+"""
+
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+try:
+    import greenlet
+except ImportError:  # pragma: no cover - depende del entorno
+    greenlet = None
+
+RAIZ_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAIZ_PROYECTO = os.path.dirname(RAIZ_APP)
+
+# Los marcos de la propia instrumentación no son sitios de llamada
+_EXCLUIDOS = (os.path.join(RAIZ_APP, "db", ""),)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|:\w+\b|\?")
+_CADENA = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_FILAS = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_sentencia(sentencia: str) -> str:
+    """Forma de la sentencia sin valores ni longitud de listas"""
+    texto = _CADENA.sub("?", sentencia)
+    texto = _PLACEHOLDER.sub("?", texto)
+    texto = _NUMERO.sub("?", texto)
+    texto = _LISTA.sub("(?)", texto)
+    texto = _FILAS.sub(r"\1", texto)
+    return _ESPACIOS.sub(" ", texto).strip()
+
+
+def sitio_llamada(profundidad: int = 3) -> Tuple[str, ...]:
+    """Los ``profundidad`` marcos más internos de app/ que llevaron a la consulta"""
+    marco = sys._getframe(1)
+    if greenlet is not None:
+        padre = greenlet.getcurrent().parent
+        if padre is not None and padre.gr_frame is not None:
+            marco = padre.gr_frame
+    sitios = []
+    while marco is not None and len(sitios) < profundidad:
+        archivo = marco.f_code.co_filename
+        if archivo.startswith(RAIZ_APP) and not archivo.startswith(_EXCLUIDOS):
+            sitios.append(
+                f"{os.path.relpath(archivo, RAIZ_PROYECTO)}:{marco.f_lineno} {marco.f_code.co_name}"
+            )
+        marco = marco.f_back
+    return tuple(sitios)
+
+
+@dataclass
+class ConsultaRepetida:
+    """Sentencia que se repitió en una petición, con los sitios que la lanzaron"""
+    sentencia: str
+    veces: int
+    sitios: List[Tuple[Tuple[str, ...], int]] = field(default_factory=list)
+
+
+class DetectorConsultas:
+    """Cuenta las sentencias de una medición por forma y sitio de llamada"""
+    
+    def __init__(self):
+        self._sitios: Dict[str, Counter] = {}
+    
+    def registrar(self, sentencia: str) -> None:
+        forma = normalizar_sentencia(sentencia)
+        self._sitios.setdefault(forma, Counter())[sitio_llamada()] += 1
+    
+    def repetidas(self, umbral: int) -> List[ConsultaRepetida]:
+        """Sentencias ejecutadas más de ``umbral`` veces, de más a menos repetida"""
+        repetidas = [
+            ConsultaRepetida(forma, sum(sitios.values()), sitios.most_common())
+            for forma, sitios in self._sitios.items()
+            if sum(sitios.values()) > umbral
+        ]
+        return sorted(repetidas, key=lambda r: -r.veces)
+    
+    def informe(self, umbral: int, max_sentencia: int = 200) -> str:
+        lineas = []
+        for repetida in self.repetidas(umbral):
+            sentencia = repetida.sentencia
+            if len(sentencia) > max_sentencia:
+                sentencia = sentencia[:max_sentencia] + "..."
+            lineas.append(f"{repetida.veces}× {sentencia}")
+            for sitio, veces in repetida.sitios:
+                lineas.append(f"    {veces}× desde {' ← '.join(sitio) or '(fuera de app/)'}")
+        return "\n".join(lineas)
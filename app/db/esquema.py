@@ -0,0 +1,128 @@
+"""
+Esquema de la base de datos al arrancar
+
+En lugar de reflejar las tablas y ejecutar ``Base.metadata.create_all`` en cada
+worker, el modo rápido lee la revisión de Alembic de la tabla ``alembic_version``
+(una consulta) y la compara con la última revisión de ``alembic/versions``. Las
+tablas se crean y actualizan aparte, con ``alembic upgrade head``.
+
+La revisión 0001 es el esquema que creaba create_all antes de las migraciones:
+una base de datos de entonces se marca con ella y se actualiza desde ahí.
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Esquema anterior a las migraciones (alembic/versions/0001_esquema_base.py)
+REVISION_BASE = "0001"
+
+INSTRUCCIONES_SIN_REVISION = (
+    "en una base de datos vacía, ejecuta 'alembic upgrade head'; si las tablas ya existen "
+    f"(creadas antes de las migraciones), márcalas con 'alembic stamp {REVISION_BASE}' "
+    "y después ejecuta 'alembic upgrade head'"
+)
+
+
+class EsquemaDesactualizadoError(RuntimeError):
+    """La base de datos no está en la última revisión de Alembic"""
+
+
+def configuracion_alembic(url: Optional[str] = None):
+    """Config de Alembic del proyecto (alembic.ini en la raíz), sobre ``url`` si se indica"""
+    from alembic.config import Config
+    
+    config = Config(os.path.join(RAIZ_PROYECTO, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(RAIZ_PROYECTO, "alembic"))
+    if url is not None:
+        config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return config
+
+
+@lru_cache(maxsize=1)
+def revisiones_esperadas() -> Set[str]:
+    """Revisiones head de alembic/versions (se leen una vez por proceso)"""
+    from alembic.script import ScriptDirectory
+    
+    return set(ScriptDirectory.from_config(configuracion_alembic()).get_heads())
+
+
+async def revision_actual(engine: AsyncEngine) -> Optional[str]:
+    """Revisión registrada en la base de datos, o None si nunca se marcó"""
+    async with engine.connect() as conn:
+        existe = await conn.run_sync(lambda c: c.dialect.has_table(c, "alembic_version"))
+        if not existe:
+            return None
+        return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+
+
+async def verificar_esquema(engine: AsyncEngine) -> str:
+    """
+    Comprueba que la base de datos está en la última revisión.
+    
+    Raises:
+        EsquemaDesactualizadoError: Si no tiene revisión o no es la última
+    """
+    actual = await revision_actual(engine)
+    esperadas = revisiones_esperadas()
+    if actual is None:
+        raise EsquemaDesactualizadoError(
+            f"La base de datos no tiene revisión de Alembic: {INSTRUCCIONES_SIN_REVISION}"
+        )
+    if actual not in esperadas:
+        raise EsquemaDesactualizadoError(
+            f"La base de datos está en la revisión {actual} y se esperaba "
+            f"{', '.join(sorted(esperadas))}: ejecuta 'alembic upgrade head'"
+        )
+    return actual
+
+
+def marcar_esquema(revision: str = "head", url: Optional[str] = None) -> None:
+    """
+    Registra la revisión sin ejecutar migraciones (alembic stamp): "head" tras
+    crear las tablas con create_all, "base" tras eliminarlas.
+    """
+    from alembic import command
+    
+    command.stamp(configuracion_alembic(url), revision)
+
+
+def preparar_esquema(engine: Engine) -> str:
+    """
+    Deja la base de datos en la última revisión: en una vacía crea las tablas
+    (create_all) y marca head; en una con revisión aplica las migraciones
+    pendientes. Devuelve la revisión final.
+    
+    Raises:
+        EsquemaDesactualizadoError: Si tiene tablas pero ninguna revisión de
+            Alembic (create_all no añadiría las restricciones ni los cambios de
+            columnas posteriores)
+    """
+    from alembic import command
+    from app.db.base import Base
+    
+    url = engine.url.render_as_string(hide_password=False)
+    with engine.connect() as conn:
+        tablas = set(inspect(conn).get_table_names())
+        actual = None
+        if "alembic_version" in tablas:
+            actual = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    
+    if actual is None:
+        existentes = tablas & set(Base.metadata.tables)
+        if existentes:
+            raise EsquemaDesactualizadoError(
+                f"La base de datos tiene tablas ({', '.join(sorted(existentes))}) pero no "
+                f"tiene revisión de Alembic: {INSTRUCCIONES_SIN_REVISION}"
+            )
+        Base.metadata.create_all(bind=engine)
+        marcar_esquema(url=url)
+    elif actual not in revisiones_esperadas():
+        command.upgrade(configuracion_alembic(url), "head")
+    return next(iter(revisiones_esperadas()))
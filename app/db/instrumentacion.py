@@ -0,0 +1,124 @@
+"""
+Instrumentación de consultas SQL por petición
+
+Los eventos before_cursor_execute / after_cursor_execute del engine suman, en la
+medición de la petición en curso (una ContextVar que abre el middleware de
+métricas), el número de consultas, su tiempo y las filas que informa el driver
+(asyncpg informa las filas de cada SELECT; los cursores del servidor no).
+
+SQLAlchemy ejecuta los eventos del engine asíncrono en un greenlet que hereda
+el contexto de la tarea, así que cada petición ve solo sus consultas. Fuera de
+una petición (workers, scripts) no se mide nada, salvo dentro de medir_proceso,
+que cuenta todas las consultas del proceso (tests).
+
+Con un DetectorConsultas en la medición se agrupan además las sentencias
+repetidas y sus sitios de llamada (app/db/detector_consultas.py). Los
+repositorios anotan con registrar_conflicto cada reserva rechazada por la base
+de datos, para medir los reintentos de la reserva optimista.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db.detector_consultas import DetectorConsultas
+
+
+@dataclass
+class MedicionPeticion:
+    """Tiempos de una petición: consultas SQL y fases marcadas en el código"""
+    inicio: float = field(default_factory=time.perf_counter)
+    consultas: int = 0
+    tiempo_db: float = 0.0
+    filas: int = 0
+    fases: Dict[str, float] = field(default_factory=dict)
+    detector: Optional[DetectorConsultas] = None
+    conflictos: int = 0
+    
+    def transcurrido(self) -> float:
+        return time.perf_counter() - self.inicio
+
+
+medicion_actual: ContextVar[Optional[MedicionPeticion]] = ContextVar("medicion_actual", default=None)
+
+# Mediciones de medir_proceso: reciben las consultas de cualquier tarea o hilo
+_mediciones_proceso: List[MedicionPeticion] = []
+
+
+@contextmanager
+def medir_proceso(detectar: bool = True) -> Iterator[MedicionPeticion]:
+    """Cuenta todas las consultas del proceso mientras dure el bloque"""
+    medicion = MedicionPeticion(detector=DetectorConsultas() if detectar else None)
+    _mediciones_proceso.append(medicion)
+    try:
+        yield medicion
+    finally:
+        _mediciones_proceso.remove(medicion)
+
+
+def _mediciones() -> List[MedicionPeticion]:
+    medicion = medicion_actual.get()
+    if medicion is None:
+        return _mediciones_proceso
+    return [medicion, *_mediciones_proceso]
+
+
+@contextmanager
+def fase(nombre: str) -> Iterator[None]:
+    """Mide un tramo de la petición en curso (p. ej. "serializacion")"""
+    medicion = medicion_actual.get()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.fases[nombre] = medicion.fases.get(nombre, 0.0) + time.perf_counter() - inicio
+
+
+def registrar_conflicto() -> None:
+    """Un conflicto de reserva optimista (el caso de uso reintentará o devolverá 409)"""
+    for medicion in _mediciones():
+        medicion.conflictos += 1
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _mediciones():
+        conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    mediciones = _mediciones()
+    inicios = conn.info.get("inicio_consultas")
+    if not mediciones or not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    filas = max(getattr(cursor, "rowcount", -1), 0)
+    for medicion in mediciones:
+        medicion.consultas += 1
+        medicion.tiempo_db += duracion
+        medicion.filas += filas
+        if medicion.detector is not None:
+            medicion.detector.registrar(statement)
+
+
+def _consulta_fallida(contexto_excepcion):
+    # La consulta no llegó a after_cursor_execute: se descarta su inicio
+    conn = contexto_excepcion.connection
+    if conn is not None and conn.info.get("inicio_consultas"):
+        conn.info["inicio_consultas"].pop()
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Registra los eventos en un engine síncrono (o en AsyncEngine.sync_engine)"""
+    if event.contains(engine, "before_cursor_execute", _antes_de_ejecutar):
+        return
+    event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+    event.listen(engine, "handle_error", _consulta_fallida)
@@ -1,8 +1,16 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from app.db.config import DATABASE_URL, SQLALCHEMY_ECHO, SQLALCHEMY_POOL_SIZE, SQLALCHEMY_MAX_OVERFLOW
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.db.config import (
+    DATABASE_URL,
+    DATABASE_URL_ASYNC,
+    SQLALCHEMY_ECHO,
+    SQLALCHEMY_POOL_SIZE,
+    SQLALCHEMY_MAX_OVERFLOW
+)
+from app.db.instrumentacion import instrumentar_engine
 
-# PostgreSQL Engine
+# PostgreSQL Engine (síncrono: creación de tablas y scripts de mantenimiento)
 engine = create_engine(
     DATABASE_URL,
     echo=SQLALCHEMY_ECHO,
@@ -18,6 +26,25 @@ SessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+# PostgreSQL Engine asíncrono (asyncpg): usado por los repositorios y las rutas
+async_engine = create_async_engine(
+    DATABASE_URL_ASYNC,
+    echo=SQLALCHEMY_ECHO,
+    pool_size=SQLALCHEMY_POOL_SIZE,
+    max_overflow=SQLALCHEMY_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+
+# Consultas, tiempo y filas por petición (middleware de métricas)
+instrumentar_engine(engine)
+instrumentar_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 def get_db() -> Session:
     """Obtener una sesión de base de datos"""
     db = SessionLocal()
@@ -25,3 +52,9 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncSession:
+    """Obtener una sesión asíncrona de base de datos"""
+    async with AsyncSessionLocal() as db:
+        yield db
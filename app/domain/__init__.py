@@ -16,6 +16,11 @@ __all__ = [
     "Reserva",
     "Diagnostico",
     "Cita",
+    "OcupacionBloque",
+    "ConflictoReservaError",
+    "Pagina",
+    "PropuestaTratamiento",
+    "ResultadoTratamientoLote",
     # Ports
     "PacienteRepository",
     "FisioterapeutaRepository",
@@ -25,13 +30,19 @@ __all__ = [
     "ReservaRepository",
     "DiagnosticoRepository",
     "CitaRepository",
+    "ServicioCalendario",
     # Use Cases
     "CrearPaciente",
     "ObtenerPaciente",
     "ListarPacientes",
+    "ListarPacientesPorCursor",
+    "ImportarPacientes",
+    "ExportarPacientes",
     "ActualizarPaciente",
     "EliminarPaciente",
     "CrearReserva",
+    "ListarReservasPorCursor",
+    "ExportarReservas",
     "ObtenerReserva",
     "ListarReservasPaciente",
     "ListarReservasFisioterapeuta",
@@ -0,0 +1,115 @@
+"""
+Núcleo vectorizado de disponibilidad
+
+Representa el rango fechas × bloques como arreglos NumPy de ocupación (y una
+capa por fisioterapeuta) y aplica las reglas de capacidad como máscaras:
+
+- Espacios: el bloque necesita al menos un espacio libre (de 9).
+- Fisioterapeuta: como máximo 2 pacientes por bloque, y ninguno más si ya
+  atiende a un paciente con trato especial.
+- Máquinas: si el paciente usa magneto, al menos una libre (de 3).
+
+Lo usa ConsultarMatrizDisponibilidad, que evalúa todos los fisioterapeutas a
+la vez (benchmarks/bench_disponibilidad.py lo contrasta con un bucle de
+referencia). En la consulta de un solo fisioterapeuta el coste está en construir
+la lista de resultados y el bucle es más rápido, así que ConsultarDisponibilidad
+no lo usa.
+"""
+
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.entities import BloqueHorario, OcupacionBloque
+
+MAX_PACIENTES_POR_FISIO = 2
+TOTAL_MAQUINAS = 3
+
+
+class ArreglosOcupacion:
+    """Ocupación del rango como arreglos (días, bloques) y (fisioterapeutas, días, bloques)"""
+    
+    def __init__(
+        self,
+        ocupacion: Dict[Tuple[date, int], OcupacionBloque],
+        bloques: Sequence[BloqueHorario],
+        fecha_inicio: date,
+        fecha_fin: date,
+        fisio_ids: Sequence[int]
+    ):
+        dias = (fecha_fin - fecha_inicio).days + 1
+        forma = (dias, len(bloques))
+        self.espacios_ocupados = np.zeros(forma, dtype=np.int32)
+        self.maquinas_en_uso = np.zeros(forma, dtype=np.int32)
+        self.pacientes = np.zeros((len(fisio_ids),) + forma, dtype=np.int32)
+        self.trato_especial = np.zeros((len(fisio_ids),) + forma, dtype=bool)
+        
+        pos_bloque = {b.id: i for i, b in enumerate(bloques)}
+        pos_fisio = {f: i for i, f in enumerate(fisio_ids)}
+        # Solo se recorren los bloques con reservas; los índices se acumulan en
+        # listas y se asignan de una vez (asignar celda a celda es mucho más lento)
+        celdas_d, celdas_b, espacios, maquinas = [], [], [], []
+        fisio_f, fisio_d, fisio_b, pacientes = [], [], [], []
+        especial_f, especial_d, especial_b = [], [], []
+        for (fecha, bloque_id), slot in ocupacion.items():
+            d = (fecha - fecha_inicio).days
+            b = pos_bloque.get(bloque_id)
+            if b is None or not 0 <= d < dias:
+                continue
+            celdas_d.append(d)
+            celdas_b.append(b)
+            espacios.append(slot.espacios_ocupados)
+            maquinas.append(slot.maquinas_en_uso)
+            for fisio_id, n in slot.pacientes_por_fisio.items():
+                f = pos_fisio.get(fisio_id)
+                if f is not None:
+                    fisio_f.append(f)
+                    fisio_d.append(d)
+                    fisio_b.append(b)
+                    pacientes.append(n)
+            for fisio_id in slot.fisios_con_trato_especial:
+                f = pos_fisio.get(fisio_id)
+                if f is not None:
+                    especial_f.append(f)
+                    especial_d.append(d)
+                    especial_b.append(b)
+        
+        self.espacios_ocupados[celdas_d, celdas_b] = espacios
+        self.maquinas_en_uso[celdas_d, celdas_b] = maquinas
+        self.pacientes[fisio_f, fisio_d, fisio_b] = pacientes
+        self.trato_especial[especial_f, especial_d, especial_b] = True
+    
+    def espacios_libres(self, total_espacios: int):
+        return total_espacios - self.espacios_ocupados
+    
+    def maquinas_libres(self):
+        return TOTAL_MAQUINAS - self.maquinas_en_uso
+    
+    def cupos(self, total_espacios: int, requiere_maquina: bool):
+        """Pacientes que cada fisioterapeuta aún puede recibir: (fisioterapeutas, días, bloques)"""
+        espacios_libres = self.espacios_libres(total_espacios)
+        hay_lugar = espacios_libres > 0
+        if requiere_maquina:
+            hay_lugar &= self.maquinas_libres() > 0
+        libres = np.clip(np.minimum(MAX_PACIENTES_POR_FISIO - self.pacientes, espacios_libres), 0, None)
+        return np.where(self.trato_especial | ~hay_lugar, 0, libres)
+
+
+def calcular_matriz(
+    ocupacion: Dict[Tuple[date, int], OcupacionBloque],
+    bloques: List[BloqueHorario],
+    total_espacios: int,
+    fecha_inicio: date,
+    fecha_fin: date,
+    fisio_ids: List[int],
+    requiere_maquina: bool
+) -> Tuple[List[int], List[int], List[List[int]]]:
+    """Columnas aplanadas (fecha, bloque) de espacios libres, máquinas libres y cupos por fisioterapeuta"""
+    arreglos = ArreglosOcupacion(ocupacion, bloques, fecha_inicio, fecha_fin, fisio_ids)
+    cupos = arreglos.cupos(total_espacios, requiere_maquina)
+    return (
+        arreglos.espacios_libres(total_espacios).ravel().tolist(),
+        arreglos.maquinas_libres().ravel().tolist(),
+        [fila.ravel().tolist() for fila in cupos]
+    )
@@ -4,7 +4,7 @@ Entidades de Dominio - Lógica de negocio pura sin dependencias externas
 
 from dataclasses import dataclass, field
 from datetime import datetime, date, time
-from typing import Optional, List
+from typing import Any, Optional, List, Dict, Set
 
 
 @dataclass
@@ -103,5 +103,79 @@ class Cita:
     inicio: datetime = field(default_factory=datetime.utcnow)
     fin: datetime = field(default_factory=datetime.utcnow)
     email: Optional[str] = None
-    google_event_id: str = ""
+    google_event_id: Optional[str] = None  # None mientras el evento espera en el outbox
     fecha_creacion: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class OcupacionBloque:
+    """Entidad de dominio: Ocupación agregada de un bloque horario en una fecha"""
+    fecha: date = field(default_factory=date.today)
+    bloque_id: int = 0
+    espacios_ocupados: int = 0
+    maquinas_en_uso: int = 0
+    
+    # Carga por fisioterapeuta: {fisioterapeuta_id: número de pacientes}
+    pacientes_por_fisio: Dict[int, int] = field(default_factory=dict)
+    fisios_con_trato_especial: Set[int] = field(default_factory=set)
+
+
+@dataclass
+class Pagina:
+    """Página de resultados paginada por cursor"""
+    items: List[Any] = field(default_factory=list)
+    siguiente_cursor: Optional[str] = None  # None si no hay más páginas
+
+
+@dataclass
+class PropuestaTratamiento:
+    """Entidad de dominio: Horario posible para un tratamiento recurrente (sin confirmar)"""
+    bloque_id: int = 0
+    fecha_inicio: date = field(default_factory=date.today)
+    reservas: List[Reserva] = field(default_factory=list)
+    
+    # Veces que el paciente cambia de espacio o de máquina entre sesiones consecutivas
+    cambios_espacio: int = 0
+    cambios_maquina: int = 0
+    
+    # Distancia al horario pedido: días desplazados y posiciones de bloque
+    desviacion_dias: int = 0
+    desviacion_bloques: int = 0
+    
+    @property
+    def fragmentacion(self) -> int:
+        return self.cambios_espacio + self.cambios_maquina
+    
+    @property
+    def desviacion(self) -> int:
+        return self.desviacion_dias + self.desviacion_bloques
+
+
+@dataclass
+class ResultadoTratamientoLote:
+    """Entidad de dominio: Resultado de un tratamiento dentro de un lote"""
+    indice: int = 0
+    paciente_id: int = 0
+    fisioterapeuta_id: int = 0
+    reservas: List[Reserva] = field(default_factory=list)
+    error: Optional[str] = None
+    
+    @property
+    def exito(self) -> bool:
+        return self.error is None
+
+
+class ConflictoReservaError(ValueError):
+    """
+    Error de dominio: otra reserva confirmó antes el mismo espacio o la misma
+    máquina, o completó la capacidad del fisioterapeuta, en una de las fechas y
+    bloques solicitados.
+    """
+    
+    def __init__(self, fechas: List[date], motivo: str = "el espacio o la máquina ya fue reservado"):
+        self.fechas = fechas
+        self.motivo = motivo
+        super().__init__(
+            f"Conflicto de reserva: {motivo} "
+            f"para {', '.join(str(f) for f in sorted(set(fechas)))}"
+        )
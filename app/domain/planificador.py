@@ -0,0 +1,179 @@
+"""
+Planificador de tratamientos recurrentes
+
+Busca, sobre una instantánea en memoria de la ocupación del rango, todos los
+horarios posibles de un tratamiento (cada bloque horario × cada día de inicio de
+la primera semana) y asigna espacio y máquina a cada sesión minimizando la
+fragmentación: el número de veces que el paciente cambia de espacio o de máquina
+entre sesiones. Evaluar un candidato no hace ninguna consulta.
+
+Para cada recurso, elegir en cada sesión el que sigue libre durante más sesiones
+consecutivas (el de menor ID en caso de empate) da el mínimo de cambios.
+"""
+
+from collections import defaultdict
+from dataclasses import replace
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.domain.entities import OcupacionBloque, Paciente, PropuestaTratamiento, Reserva
+from app.domain.disponibilidad import MAX_PACIENTES_POR_FISIO
+
+
+class InstantaneaOcupacion:
+    """Ocupación de un rango de fechas: recursos usados y carga de cada fisioterapeuta"""
+    
+    def __init__(self, ocupacion: Iterable[OcupacionBloque], reservas: Iterable[Reserva]):
+        self._ocupacion: Dict[Tuple[date, int], OcupacionBloque] = {
+            (o.fecha, o.bloque_id): o for o in ocupacion
+        }
+        self._espacios: Dict[Tuple[date, int], Set[int]] = defaultdict(set)
+        self._maquinas: Dict[Tuple[date, int], Set[int]] = defaultdict(set)
+        for reserva in reservas:
+            clave = (reserva.fecha, reserva.bloque_id)
+            self._espacios[clave].add(reserva.espacio_id)
+            if reserva.maquina_id is not None:
+                self._maquinas[clave].add(reserva.maquina_id)
+    
+    def espacios_libres(self, fecha: date, bloque_id: int, espacio_ids: Sequence[int]) -> Set[int]:
+        return set(espacio_ids) - self._espacios.get((fecha, bloque_id), set())
+    
+    def maquinas_libres(self, fecha: date, bloque_id: int, maquina_ids: Sequence[int]) -> Set[int]:
+        return set(maquina_ids) - self._maquinas.get((fecha, bloque_id), set())
+    
+    def pacientes_de_fisio(self, fisioterapeuta_id: int, fecha: date, bloque_id: int) -> int:
+        slot = self._ocupacion.get((fecha, bloque_id))
+        return slot.pacientes_por_fisio.get(fisioterapeuta_id, 0) if slot else 0
+    
+    def fisio_con_trato_especial(self, fisioterapeuta_id: int, fecha: date, bloque_id: int) -> bool:
+        slot = self._ocupacion.get((fecha, bloque_id))
+        return slot is not None and fisioterapeuta_id in slot.fisios_con_trato_especial
+    
+    def motivo_fisio_ocupado(
+        self,
+        fisioterapeuta_id: int,
+        fecha: date,
+        bloque_id: int,
+        trato_especial: bool
+    ) -> Optional[str]:
+        """Por qué el fisioterapeuta no puede recibir al paciente en el bloque, o None"""
+        slot = self._ocupacion.get((fecha, bloque_id))
+        if slot is None:
+            return None
+        pacientes = slot.pacientes_por_fisio.get(fisioterapeuta_id, 0)
+        if trato_especial and pacientes > 0:
+            return "el fisioterapeuta ya tiene pacientes y el paciente requiere trato especial"
+        if fisioterapeuta_id in slot.fisios_con_trato_especial:
+            return "el fisioterapeuta tiene un paciente con trato especial"
+        if pacientes >= MAX_PACIENTES_POR_FISIO:
+            return f"el fisioterapeuta ya tiene {MAX_PACIENTES_POR_FISIO} pacientes"
+        return None
+    
+    def registrar(self, reservas: Iterable[Reserva], trato_especial: bool) -> None:
+        """Suma a la instantánea reservas aún no escritas (p. ej. las ya planificadas de un lote)"""
+        for reserva in reservas:
+            clave = (reserva.fecha, reserva.bloque_id)
+            anterior = self._ocupacion.get(clave) or OcupacionBloque(fecha=reserva.fecha, bloque_id=reserva.bloque_id)
+            # Copia: no se modifica la ocupación que devolvió el repositorio
+            slot = replace(
+                anterior,
+                pacientes_por_fisio=dict(anterior.pacientes_por_fisio),
+                fisios_con_trato_especial=set(anterior.fisios_con_trato_especial)
+            )
+            slot.espacios_ocupados += 1
+            slot.pacientes_por_fisio[reserva.fisioterapeuta_id] = (
+                slot.pacientes_por_fisio.get(reserva.fisioterapeuta_id, 0) + 1
+            )
+            if trato_especial:
+                slot.fisios_con_trato_especial.add(reserva.fisioterapeuta_id)
+            self._espacios[clave].add(reserva.espacio_id)
+            if reserva.maquina_id is not None:
+                slot.maquinas_en_uso += 1
+                self._maquinas[clave].add(reserva.maquina_id)
+            self._ocupacion[clave] = slot
+
+
+def asignar_con_menos_cambios(libres_por_sesion: List[Set[int]]) -> Tuple[List[int], int]:
+    """
+    Un recurso por sesión, elegido entre sus libres, con el mínimo de cambios entre
+    sesiones consecutivas. Requiere al menos un recurso libre en cada sesión.
+    """
+    asignacion: List[int] = []
+    cambios = 0
+    i = 0
+    while i < len(libres_por_sesion):
+        mejor, mejor_fin = None, i
+        for recurso in sorted(libres_por_sesion[i]):
+            fin = i
+            while fin < len(libres_por_sesion) and recurso in libres_por_sesion[fin]:
+                fin += 1
+            if fin > mejor_fin:
+                mejor, mejor_fin = recurso, fin
+        asignacion.extend([mejor] * (mejor_fin - i))
+        if i > 0:
+            cambios += 1
+        i = mejor_fin
+    return asignacion, cambios
+
+
+def evaluar_candidato(
+    instantanea: InstantaneaOcupacion,
+    paciente: Paciente,
+    fisioterapeuta_id: int,
+    bloque_id: int,
+    fechas: List[date],
+    espacio_ids: Sequence[int],
+    maquina_ids: Sequence[int],
+    requiere_maquina: bool
+) -> Tuple[Optional[PropuestaTratamiento], Optional[str]]:
+    """Propuesta para un bloque y unas fechas, o el motivo por el que no es posible"""
+    espacios_libres, maquinas_libres = [], []
+    for fecha in fechas:
+        motivo = instantanea.motivo_fisio_ocupado(
+            fisioterapeuta_id, fecha, bloque_id, paciente.requiere_tratamiento_especial
+        )
+        if motivo:
+            return None, f"{fecha} bloque {bloque_id}: {motivo}"
+        
+        libres = instantanea.espacios_libres(fecha, bloque_id, espacio_ids)
+        if not libres:
+            return None, f"{fecha} bloque {bloque_id}: no hay espacios disponibles"
+        espacios_libres.append(libres)
+        
+        if requiere_maquina:
+            libres = instantanea.maquinas_libres(fecha, bloque_id, maquina_ids)
+            if not libres:
+                return None, f"{fecha} bloque {bloque_id}: no hay máquinas disponibles"
+            maquinas_libres.append(libres)
+    
+    espacios, cambios_espacio = asignar_con_menos_cambios(espacios_libres)
+    maquinas, cambios_maquina = (
+        asignar_con_menos_cambios(maquinas_libres) if requiere_maquina else ([None] * len(fechas), 0)
+    )
+    reservas = [
+        Reserva(
+            paciente_id=paciente.id,
+            fisioterapeuta_id=fisioterapeuta_id,
+            espacio_id=espacio_id,
+            bloque_id=bloque_id,
+            maquina_id=maquina_id,
+            fecha=fecha
+        )
+        for fecha, espacio_id, maquina_id in zip(fechas, espacios, maquinas)
+    ]
+    propuesta = PropuestaTratamiento(
+        bloque_id=bloque_id,
+        fecha_inicio=fechas[0],
+        reservas=reservas,
+        cambios_espacio=cambios_espacio,
+        cambios_maquina=cambios_maquina
+    )
+    return propuesta, None
+
+
+def ordenar_propuestas(propuestas: List[PropuestaTratamiento]) -> List[PropuestaTratamiento]:
+    """Primero lo más parecido a lo pedido; a igual desviación, la menos fragmentada"""
+    return sorted(
+        propuestas,
+        key=lambda p: (p.desviacion, p.fragmentacion, p.fecha_inicio, p.bloque_id)
+    )
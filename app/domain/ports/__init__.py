@@ -3,10 +3,11 @@ Puertos (Interfaces) - Contratos para los adaptadores
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 from app.domain.entities import (
     Paciente, Fisioterapeuta, Maquina, Espacio, 
-    BloqueHorario, Reserva, Diagnostico, Cita
+    BloqueHorario, Reserva, Diagnostico, Cita, OcupacionBloque, Pagina
 )
 
 
@@ -21,10 +22,32 @@ class PacienteRepository(ABC):
     async def obtener_por_id(self, paciente_id: int) -> Optional[Paciente]:
         pass
     
+    @abstractmethod
+    async def obtener_por_ids(self, paciente_ids: List[int]) -> Dict[int, Paciente]:
+        """Los pacientes existentes de ``paciente_ids``, por ID, con una sola consulta"""
+        pass
+    
     @abstractmethod
     async def listar(self, skip: int = 0, limit: int = 10) -> List[Paciente]:
         pass
     
+    @abstractmethod
+    async def listar_por_cursor(
+        self, cursor: Optional[str] = None, limit: int = 10, orden: str = "id"
+    ) -> Pagina:
+        """Página de pacientes ordenada por ``orden`` ("id" o "created_at")"""
+        pass
+    
+    @abstractmethod
+    async def crear_muchos(self, pacientes: List[Paciente]) -> int:
+        """Inserta un lote de pacientes con una sola operación y un commit; devuelve cuántos"""
+        pass
+    
+    @abstractmethod
+    def exportar(self) -> AsyncIterator[Paciente]:
+        """Recorre todos los pacientes por id sin cargarlos todos en memoria"""
+        pass
+    
     @abstractmethod
     async def actualizar(self, paciente_id: int, datos: dict) -> Paciente:
         pass
@@ -41,6 +64,15 @@ class ReservaRepository(ABC):
     async def crear(self, reserva: Reserva) -> Reserva:
         pass
     
+    @abstractmethod
+    async def crear_muchas(self, reservas: List[Reserva]) -> List[Reserva]:
+        """
+        Inserta todas las reservas en una única transacción (todas o ninguna) y las
+        devuelve creadas en el mismo orden.
+        Lanza ConflictoReservaError si un espacio o máquina ya está reservado en el bloque.
+        """
+        pass
+    
     @abstractmethod
     async def obtener_por_id(self, reserva_id: int) -> Optional[Reserva]:
         pass
@@ -49,6 +81,18 @@ class ReservaRepository(ABC):
     async def listar(self, skip: int = 0, limit: int = 10) -> List[Reserva]:
         pass
     
+    @abstractmethod
+    async def listar_por_cursor(
+        self, cursor: Optional[str] = None, limit: int = 10, orden: str = "id"
+    ) -> Pagina:
+        """Página de reservas ordenada por ``orden`` ("id" o "fecha")"""
+        pass
+    
+    @abstractmethod
+    def exportar(self) -> AsyncIterator[Reserva]:
+        """Recorre todas las reservas por id sin cargarlas todas en memoria"""
+        pass
+    
     @abstractmethod
     async def listar_por_paciente(self, paciente_id: int) -> List[Reserva]:
         pass
@@ -57,6 +101,13 @@ class ReservaRepository(ABC):
     async def listar_por_fisioterapeuta(self, fisioterapeuta_id: int) -> List[Reserva]:
         pass
     
+    @abstractmethod
+    async def listar_por_rango(
+        self, fecha_inicio: date, fecha_fin: date, bloque_id: Optional[int] = None
+    ) -> List[Reserva]:
+        """Reservas con fecha en [fecha_inicio, fecha_fin], solo de ``bloque_id`` si se indica"""
+        pass
+    
     @abstractmethod
     async def actualizar(self, reserva_id: int, datos: dict) -> Reserva:
         pass
@@ -64,6 +115,18 @@ class ReservaRepository(ABC):
     @abstractmethod
     async def eliminar(self, reserva_id: int) -> bool:
         pass
+    
+    @abstractmethod
+    async def obtener_ocupacion_rango(
+        self, fecha_inicio: date, fecha_fin: date, bloque_id: Optional[int] = None
+    ) -> List[OcupacionBloque]:
+        """Ocupación agregada por (fecha, bloque) de las reservas del rango, solo de ``bloque_id`` si se indica"""
+        pass
+    
+    @abstractmethod
+    async def obtener_ocupacion_materializada(self, fecha_inicio: date, fecha_fin: date) -> List[OcupacionBloque]:
+        """Misma ocupación que obtener_ocupacion_rango, leída de la tabla precalculada"""
+        pass
 
 
 class DiagnosticoRepository(ABC):
@@ -160,3 +223,25 @@ class CitaRepository(ABC):
     @abstractmethod
     async def listar(self) -> List[Cita]:
         pass
+    
+    @abstractmethod
+    async def crear_con_evento_pendiente(
+        self, citas: List[Cita], eventos: List[Dict[str, Any]]
+    ) -> List[Cita]:
+        """
+        Guarda las citas y, en la misma transacción, un evento pendiente de
+        sincronizar con el calendario externo por cada una (outbox)
+        """
+        pass
+
+
+class ServicioCalendario(ABC):
+    """Puerto: Calendario externo (Google Calendar)"""
+    
+    @abstractmethod
+    async def crear_eventos(self, eventos: List[Dict[str, Any]]) -> List[Union[str, Exception]]:
+        """
+        Crea los eventos; devuelve, en el mismo orden, el ID creado o el error de
+        cada uno. Un evento con "id" que ya existe cuenta como creado.
+        """
+        pass
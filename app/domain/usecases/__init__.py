@@ -2,9 +2,14 @@
 Casos de Uso - Lógica de aplicación
 """
 
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import date, timedelta
-from app.domain.entities import Paciente, Reserva, Diagnostico
+from app.domain.entities import (
+    Paciente, Reserva, Diagnostico, Espacio, BloqueHorario, OcupacionBloque,
+    ConflictoReservaError, Pagina, PropuestaTratamiento, ResultadoTratamientoLote
+)
+from app.domain import disponibilidad
+from app.domain.planificador import InstantaneaOcupacion, evaluar_candidato, ordenar_propuestas
 from app.domain.ports import (
     PacienteRepository,
     ReservaRepository,
@@ -14,7 +19,6 @@ from app.domain.ports import (
     BloqueHorarioRepository,
     MaquinaRepository
 )
-from sqlalchemy.orm import Session
 
 
 class CrearPaciente:
@@ -48,6 +52,36 @@ class ListarPacientes:
         return await self.paciente_repo.listar(skip, limit)
 
 
+class ListarPacientesPorCursor:
+    """Caso de uso: Listar pacientes paginando por cursor"""
+    
+    def __init__(self, paciente_repo: PacienteRepository):
+        self.paciente_repo = paciente_repo
+    
+    async def ejecutar(self, cursor: Optional[str] = None, limit: int = 10, orden: str = "id") -> Pagina:
+        return await self.paciente_repo.listar_por_cursor(cursor, limit, orden)
+
+
+class ImportarPacientes:
+    """Caso de uso: Importar un lote de pacientes ya validados"""
+    
+    def __init__(self, paciente_repo: PacienteRepository):
+        self.paciente_repo = paciente_repo
+    
+    async def ejecutar(self, pacientes: List[Paciente]) -> int:
+        return await self.paciente_repo.crear_muchos(pacientes)
+
+
+class ExportarPacientes:
+    """Caso de uso: Exportar todos los pacientes (en streaming)"""
+    
+    def __init__(self, paciente_repo: PacienteRepository):
+        self.paciente_repo = paciente_repo
+    
+    def ejecutar(self) -> AsyncIterator[Paciente]:
+        return self.paciente_repo.exportar()
+
+
 class ActualizarPaciente:
     """Caso de uso: Actualizar un paciente"""
     
@@ -79,6 +113,26 @@ class CrearReserva:
         return await self.reserva_repo.crear(reserva)
 
 
+class ListarReservasPorCursor:
+    """Caso de uso: Listar reservas paginando por cursor"""
+    
+    def __init__(self, reserva_repo: ReservaRepository):
+        self.reserva_repo = reserva_repo
+    
+    async def ejecutar(self, cursor: Optional[str] = None, limit: int = 10, orden: str = "id") -> Pagina:
+        return await self.reserva_repo.listar_por_cursor(cursor, limit, orden)
+
+
+class ExportarReservas:
+    """Caso de uso: Exportar todas las reservas (en streaming)"""
+    
+    def __init__(self, reserva_repo: ReservaRepository):
+        self.reserva_repo = reserva_repo
+    
+    def ejecutar(self) -> AsyncIterator[Reserva]:
+        return self.reserva_repo.exportar()
+
+
 class ObtenerReserva:
     """Caso de uso: Obtener una reserva"""
     
@@ -137,15 +191,15 @@ class ConsultarDisponibilidad:
         self,
         espacio_repo: EspacioRepository,
         bloque_repo: BloqueHorarioRepository,
-        fisio_repo: FisioterapeutaRepository,
-        maquina_repo: MaquinaRepository,
-        paciente_repo: PacienteRepository
+        paciente_repo: PacienteRepository,
+        reserva_repo: ReservaRepository,
+        materializada: bool = False
     ):
         self.espacio_repo = espacio_repo
         self.bloque_repo = bloque_repo
-        self.fisio_repo = fisio_repo
-        self.maquina_repo = maquina_repo
         self.paciente_repo = paciente_repo
+        self.reserva_repo = reserva_repo
+        self.materializada = materializada
     
     async def ejecutar(
         self,
@@ -157,6 +211,11 @@ class ConsultarDisponibilidad:
         """
         Retorna bloques disponibles para un rango de fechas.
         
+        La ocupación de todo el rango se carga con una sola consulta agrupada y las
+        reglas se evalúan en memoria. Con ``materializada`` se lee de la tabla
+        precalculada por (fecha, bloque) en vez de agrupar las reservas; ambos
+        caminos producen el mismo resultado.
+        
         Args:
             fecha_inicio: Fecha inicial del rango
             fecha_fin: Fecha final del rango
@@ -179,47 +238,47 @@ class ConsultarDisponibilidad:
             if paciente:
                 requiere_maquina = paciente.usa_magneto
         
+        if self.materializada:
+            filas = await self.reserva_repo.obtener_ocupacion_materializada(fecha_inicio, fecha_fin)
+        else:
+            filas = await self.reserva_repo.obtener_ocupacion_rango(fecha_inicio, fecha_fin)
+        ocupacion = {(o.fecha, o.bloque_id): o for o in filas}
+        return self._calcular_disponibilidad(
+            ocupacion, bloques, len(espacios), fecha_inicio, fecha_fin,
+            fisioterapeuta_id, requiere_maquina
+        )
+    
+    @staticmethod
+    def _calcular_disponibilidad(
+        ocupacion: Dict[Tuple[date, int], OcupacionBloque],
+        bloques: List[BloqueHorario],
+        total_espacios: int,
+        fecha_inicio: date,
+        fecha_fin: date,
+        fisioterapeuta_id: Optional[int],
+        requiere_maquina: bool
+    ) -> List[Dict[str, Any]]:
+        """Aplica las reglas de capacidad sobre la ocupación precargada del rango"""
+        vacio = OcupacionBloque()
         disponibilidad = []
         
-        # Iterar por cada fecha en el rango
         fecha_actual = fecha_inicio
         while fecha_actual <= fecha_fin:
             for bloque in bloques:
-                # Contar espacios ocupados
-                espacios_ocupados = await self.espacio_repo.obtener_espacios_ocupados(
-                    fecha_actual, bloque.id
-                )
-                espacios_libres = len(espacios) - len(espacios_ocupados)
+                slot = ocupacion.get((fecha_actual, bloque.id), vacio)
+                espacios_libres = total_espacios - slot.espacios_ocupados
                 
-                # Si se especificó un fisioterapeuta, validar su disponibilidad
                 fisio_disponible = True
                 if fisioterapeuta_id:
-                    # Contar pacientes actuales del fisio en este bloque
-                    pacientes_fisio = await self.fisio_repo.contar_pacientes_en_bloque(
-                        fisioterapeuta_id, fecha_actual, bloque.id
-                    )
-                    
-                    # Verificar si tiene paciente con trato especial
-                    tiene_trato_especial = await self.fisio_repo.tiene_paciente_con_trato_especial(
-                        fisioterapeuta_id, fecha_actual, bloque.id
-                    )
-                    
-                    # Si ya tiene trato especial, no puede atender más pacientes
-                    if tiene_trato_especial:
+                    if fisioterapeuta_id in slot.fisios_con_trato_especial:
                         fisio_disponible = False
-                    # Si ya tiene 2 pacientes, no puede atender más
-                    elif pacientes_fisio >= 2:
+                    elif slot.pacientes_por_fisio.get(fisioterapeuta_id, 0) >= 2:
                         fisio_disponible = False
                 
-                # Validar disponibilidad de máquinas si se requiere
                 maquinas_disponibles = 3  # Total de máquinas
                 if requiere_maquina:
-                    maquinas_en_uso = await self.maquina_repo.contar_maquinas_en_uso(
-                        fecha_actual, bloque.id
-                    )
-                    maquinas_disponibles = 3 - maquinas_en_uso
+                    maquinas_disponibles = 3 - slot.maquinas_en_uso
                 
-                # Solo agregar si hay disponibilidad
                 if (espacios_libres > 0 and fisio_disponible and 
                     (not requiere_maquina or maquinas_disponibles > 0)):
                     disponibilidad.append({
@@ -236,12 +295,91 @@ class ConsultarDisponibilidad:
         return disponibilidad
 
 
+class ConsultarMatrizDisponibilidad:
+    """Caso de uso: Disponibilidad de todos los fisioterapeutas por fecha y bloque"""
+    
+    MAX_DIAS = 366
+    
+    def __init__(
+        self,
+        espacio_repo: EspacioRepository,
+        bloque_repo: BloqueHorarioRepository,
+        fisio_repo: FisioterapeutaRepository,
+        paciente_repo: PacienteRepository,
+        reserva_repo: ReservaRepository,
+        materializada: bool = False
+    ):
+        self.espacio_repo = espacio_repo
+        self.bloque_repo = bloque_repo
+        self.fisio_repo = fisio_repo
+        self.paciente_repo = paciente_repo
+        self.reserva_repo = reserva_repo
+        self.materializada = materializada
+    
+    async def ejecutar(
+        self,
+        fecha_inicio: date,
+        fecha_fin: date,
+        paciente_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Matriz fisioterapeuta × fecha × bloque calculada con una sola lectura de la
+        ocupación del rango, en formato columnar: las celdas de cada columna siguen
+        el orden (fecha, bloque), es decir, índice = i_fecha * len(bloques) + i_bloque.
+        
+        ``cupos[i][celda]`` es el número de pacientes que el fisioterapeuta
+        ``fisioterapeuta_ids[i]`` aún puede recibir en esa celda (0 si no hay
+        espacio libre, o máquina cuando el paciente la requiere).
+        """
+        dias = (fecha_fin - fecha_inicio).days + 1
+        if dias > self.MAX_DIAS:
+            raise ValueError(f"El rango no puede superar {self.MAX_DIAS} días")
+        
+        bloques = await self.bloque_repo.listar(limit=100)
+        espacios = await self.espacio_repo.listar(limit=9)
+        fisios = await self.fisio_repo.listar(limit=1000)
+        
+        requiere_maquina = False
+        if paciente_id:
+            paciente = await self.paciente_repo.obtener_por_id(paciente_id)
+            if paciente:
+                requiere_maquina = paciente.usa_magneto
+        
+        if self.materializada:
+            filas = await self.reserva_repo.obtener_ocupacion_materializada(fecha_inicio, fecha_fin)
+        else:
+            filas = await self.reserva_repo.obtener_ocupacion_rango(fecha_inicio, fecha_fin)
+        ocupacion = {(o.fecha, o.bloque_id): o for o in filas}
+        
+        fechas = [fecha_inicio + timedelta(days=d) for d in range(dias)]
+        fisio_ids = [f.id for f in fisios]
+        espacios_disponibles, maquinas_disponibles, cupos = disponibilidad.calcular_matriz(
+            ocupacion, bloques, len(espacios), fecha_inicio, fecha_fin, fisio_ids, requiere_maquina
+        )
+        
+        return {
+            "fecha_inicio": fecha_inicio,
+            "fecha_fin": fecha_fin,
+            "fechas": fechas,
+            "bloque_ids": [b.id for b in bloques],
+            "horas_inicio": [b.hora_inicio for b in bloques],
+            "horas_fin": [b.hora_fin for b in bloques],
+            "fisioterapeuta_ids": fisio_ids,
+            "requiere_maquina": requiere_maquina,
+            "espacios_disponibles": espacios_disponibles,
+            "maquinas_disponibles": maquinas_disponibles,
+            "cupos": cupos
+        }
+
+
 class AgendarTratamientoRecurrente:
     """Caso de uso: Agendar tratamiento recurrente semanal"""
     
+    # Intentos de reserva optimista ante conflictos con peticiones concurrentes
+    MAX_INTENTOS = 3
+    
     def __init__(
         self,
-        db: Session,
         paciente_repo: PacienteRepository,
         fisio_repo: FisioterapeutaRepository,
         espacio_repo: EspacioRepository,
@@ -249,7 +387,6 @@ class AgendarTratamientoRecurrente:
         maquina_repo: MaquinaRepository,
         reserva_repo: ReservaRepository
     ):
-        self.db = db
         self.paciente_repo = paciente_repo
         self.fisio_repo = fisio_repo
         self.espacio_repo = espacio_repo
@@ -264,7 +401,9 @@ class AgendarTratamientoRecurrente:
         bloque_id: int,
         fecha_inicio: date,
         total_sesiones: int,
-        requiere_maquina: bool = False
+        requiere_maquina: bool = False,
+        optimizar: bool = False,
+        dias_semana: Optional[List[int]] = None
     ) -> List[Reserva]:
         """
         Agenda un tratamiento recurrente semanal.
@@ -272,8 +411,14 @@ class AgendarTratamientoRecurrente:
         Reglas:
         - Máximo 3 sesiones por semana
         - Mismo día de la semana y mismo bloque horario
-        - Validación completa de todas las reglas de negocio
-        - Uso de transacciones para atomicidad
+        - Validación completa de todas las reglas de negocio antes de escribir
+        - Todas las sesiones se insertan en una sola transacción (todas o ninguna)
+        - Reserva optimista: si otra petición confirma antes el mismo espacio o
+          máquina, la base de datos rechaza la inserción y se vuelve a planificar
+          con el siguiente recurso libre (hasta MAX_INTENTOS veces)
+        
+        Con ``optimizar`` se agenda la mejor propuesta de ``proponer``: puede usar
+        otro bloque u otro día de inicio si el pedido no es posible.
         
         Args:
             paciente_id: ID del paciente
@@ -282,14 +427,273 @@ class AgendarTratamientoRecurrente:
             fecha_inicio: Fecha de inicio del tratamiento
             total_sesiones: Número total de sesiones a agendar
             requiere_maquina: Si el paciente requiere máquina
+            optimizar: Usar el planificador en lugar de la asignación directa
+            dias_semana: Días de inicio admitidos por el planificador (0 = lunes)
         
         Returns:
             Lista de reservas creadas
         
         Raises:
             ValueError: Si alguna validación falla
+            ConflictoReservaError: Si los conflictos persisten tras MAX_INTENTOS
+        """
+        if optimizar:
+            return await self._agendar_optimo(
+                paciente_id, fisioterapeuta_id, bloque_id, fecha_inicio,
+                total_sesiones, requiere_maquina, dias_semana
+            )
+        
+        paciente = await self._validar(paciente_id, fisioterapeuta_id, bloque_id)
+        
+        # Calcular fechas semanales (máximo 3 sesiones por semana)
+        fechas_sesiones = self._calcular_fechas_semanales(fecha_inicio, total_sesiones)
+        
+        # Los espacios son los mismos para todas las sesiones
+        espacios = await self.espacio_repo.listar(limit=9)
+        
+        for intento in range(1, self.MAX_INTENTOS + 1):
+            reservas_nuevas = await self._planificar_sesiones(
+                paciente, fisioterapeuta_id, bloque_id, fechas_sesiones, espacios, requiere_maquina
+            )
+            try:
+                # Insertar todas las sesiones en una sola transacción
+                return await self.reserva_repo.crear_muchas(reservas_nuevas)
+            except ConflictoReservaError:
+                # La siguiente planificación vuelve a leer la ocupación de la base de datos
+                if intento == self.MAX_INTENTOS:
+                    raise
+    
+    async def proponer(
+        self,
+        paciente_id: int,
+        fisioterapeuta_id: int,
+        bloque_id: int,
+        fecha_inicio: date,
+        total_sesiones: int,
+        requiere_maquina: bool = False,
+        max_alternativas: int = 5,
+        dias_semana: Optional[List[int]] = None
+    ) -> List[PropuestaTratamiento]:
         """
-        # Validar que paciente y fisioterapeuta existen
+        Modo planificador: horarios posibles del tratamiento, de mejor a peor, sin
+        escribir nada.
+        
+        Explora cada bloque horario con cada día de inicio de la primera semana
+        (solo los de ``dias_semana`` si se indican, 0 = lunes) sobre una única
+        lectura de la ocupación del rango. Ordena por cercanía a lo pedido y luego
+        por fragmentación (cambios de espacio o máquina entre sesiones).
+        
+        Raises:
+            ValueError: Si alguna validación falla o no hay ningún horario posible
+        """
+        paciente = await self._validar(paciente_id, fisioterapeuta_id, bloque_id)
+        bloques = await self.bloque_repo.listar(limit=100)
+        espacio_ids = [e.id for e in await self.espacio_repo.listar(limit=9)]
+        maquina_ids = [m.id for m in await self.maquina_repo.listar()] if requiere_maquina else []
+        
+        candidatos = self._candidatos(bloques, bloque_id, fecha_inicio, total_sesiones, True, dias_semana)
+        
+        # Una sola lectura para todos los candidatos
+        fecha_fin = max(fechas[-1] for _, _, fechas in candidatos)
+        instantanea = InstantaneaOcupacion(
+            await self.reserva_repo.obtener_ocupacion_rango(fecha_inicio, fecha_fin),
+            await self.reserva_repo.listar_por_rango(fecha_inicio, fecha_fin)
+        )
+        
+        propuestas = self._evaluar(
+            instantanea, paciente, fisioterapeuta_id, bloque_id, bloques,
+            candidatos, espacio_ids, maquina_ids, requiere_maquina
+        )
+        return propuestas[:max_alternativas]
+    
+    async def ejecutar_lote(self, tratamientos: List[Dict[str, Any]]) -> List[ResultadoTratamientoLote]:
+        """
+        Agenda varios tratamientos con una sola lectura de la ocupación y una sola
+        escritura.
+        
+        Cada tratamiento tiene las mismas claves que los argumentos de ``ejecutar``.
+        Se planifican sobre una instantánea de la unión de sus fechas, en un orden
+        que no depende del de la petición: primero los más restringidos (trato
+        especial, máquina, más sesiones) y luego por fecha, bloque y paciente. Lo
+        que reserva cada uno cuenta para los siguientes.
+        
+        Un tratamiento que no puede agendarse queda con su ``error`` y no impide los
+        demás; los agendados se insertan juntos en una transacción. Ante un
+        conflicto concurrente se vuelve a planificar el lote (hasta MAX_INTENTOS).
+        
+        Returns:
+            Un resultado por tratamiento, en el orden de la petición
+        
+        Raises:
+            ConflictoReservaError: Si los conflictos persisten tras MAX_INTENTOS
+        """
+        bloques = await self.bloque_repo.listar(limit=100)
+        espacio_ids = [e.id for e in await self.espacio_repo.listar(limit=9)]
+        maquina_ids = [m.id for m in await self.maquina_repo.listar()]
+        
+        # Validación: los pacientes se leen juntos; cada fisioterapeuta, una sola vez
+        pacientes = await self.paciente_repo.obtener_por_ids([t["paciente_id"] for t in tratamientos])
+        fisios: Dict[int, bool] = {}
+        resultados = []
+        pendientes = []
+        for indice, t in enumerate(tratamientos):
+            resultado = ResultadoTratamientoLote(
+                indice=indice, paciente_id=t["paciente_id"], fisioterapeuta_id=t["fisioterapeuta_id"]
+            )
+            resultados.append(resultado)
+            if t["fisioterapeuta_id"] not in fisios:
+                fisios[t["fisioterapeuta_id"]] = (
+                    await self.fisio_repo.obtener_por_id(t["fisioterapeuta_id"]) is not None
+                )
+            paciente = pacientes.get(t["paciente_id"])
+            if paciente is None:
+                resultado.error = f"Paciente {t['paciente_id']} no encontrado"
+            elif not fisios[t["fisioterapeuta_id"]]:
+                resultado.error = f"Fisioterapeuta {t['fisioterapeuta_id']} no encontrado"
+            elif not any(b.id == t["bloque_id"] for b in bloques):
+                resultado.error = f"Bloque horario {t['bloque_id']} no encontrado"
+            else:
+                try:
+                    candidatos = self._candidatos(
+                        bloques, t["bloque_id"], t["fecha_inicio"], t["total_sesiones"],
+                        t.get("optimizar", False), t.get("dias_semana")
+                    )
+                except ValueError as e:
+                    resultado.error = str(e)
+                    continue
+                pendientes.append((resultado, t, paciente, candidatos))
+        
+        pendientes.sort(key=lambda p: (
+            not p[2].requiere_tratamiento_especial,
+            not p[1].get("requiere_maquina", False),
+            -p[1]["total_sesiones"],
+            p[1]["fecha_inicio"],
+            p[1]["bloque_id"],
+            p[1]["paciente_id"],
+            p[0].indice
+        ))
+        if not pendientes:
+            return resultados
+        fecha_inicio = min(t["fecha_inicio"] for _, t, _, _ in pendientes)
+        fecha_fin = max(fechas[-1] for _, _, _, candidatos in pendientes for _, _, fechas in candidatos)
+        
+        for intento in range(1, self.MAX_INTENTOS + 1):
+            instantanea = InstantaneaOcupacion(
+                await self.reserva_repo.obtener_ocupacion_rango(fecha_inicio, fecha_fin),
+                await self.reserva_repo.listar_por_rango(fecha_inicio, fecha_fin)
+            )
+            agendados = []
+            for resultado, t, paciente, candidatos in pendientes:
+                resultado.reservas, resultado.error = [], None
+                try:
+                    mejor = self._evaluar(
+                        instantanea, paciente, t["fisioterapeuta_id"], t["bloque_id"], bloques,
+                        candidatos, espacio_ids, maquina_ids, t.get("requiere_maquina", False)
+                    )[0]
+                except ValueError as e:
+                    resultado.error = str(e)
+                    continue
+                instantanea.registrar(mejor.reservas, paciente.requiere_tratamiento_especial)
+                agendados.append((resultado, mejor.reservas))
+            
+            try:
+                # Todas las reservas del lote en un único INSERT y una transacción
+                creadas = iter(await self.reserva_repo.crear_muchas(
+                    [r for _, reservas in agendados for r in reservas]
+                ))
+            except ConflictoReservaError:
+                if intento == self.MAX_INTENTOS:
+                    raise
+                continue
+            for resultado, reservas in agendados:
+                resultado.reservas = [next(creadas) for _ in reservas]
+            return resultados
+    
+    def _candidatos(
+        self,
+        bloques: List[BloqueHorario],
+        bloque_id: int,
+        fecha_inicio: date,
+        total_sesiones: int,
+        explorar: bool,
+        dias_semana: Optional[List[int]]
+    ) -> List[Tuple[int, int, List[date]]]:
+        """(días desplazados, bloque, fechas) a evaluar: solo lo pedido, o todo si ``explorar``"""
+        if not explorar:
+            return [(0, bloque_id, self._calcular_fechas_semanales(fecha_inicio, total_sesiones))]
+        candidatos = []
+        for desplazamiento in range(7):
+            inicio = fecha_inicio + timedelta(days=desplazamiento)
+            if dias_semana is not None and inicio.weekday() not in dias_semana:
+                continue
+            fechas = self._calcular_fechas_semanales(inicio, total_sesiones)
+            candidatos.extend((desplazamiento, bloque.id, fechas) for bloque in bloques)
+        if not candidatos:
+            raise ValueError("Ningún día de la semana admitido para iniciar el tratamiento")
+        return candidatos
+    
+    def _evaluar(
+        self,
+        instantanea: InstantaneaOcupacion,
+        paciente: Paciente,
+        fisioterapeuta_id: int,
+        bloque_id: int,
+        bloques: List[BloqueHorario],
+        candidatos: List[Tuple[int, int, List[date]]],
+        espacio_ids: List[int],
+        maquina_ids: List[int],
+        requiere_maquina: bool
+    ) -> List[PropuestaTratamiento]:
+        """Propuestas posibles ordenadas; ValueError con el motivo si no hay ninguna"""
+        posicion = {b.id: i for i, b in enumerate(bloques)}
+        propuestas = []
+        motivo_pedido = None
+        for desplazamiento, candidato_bloque_id, fechas in candidatos:
+            propuesta, motivo = evaluar_candidato(
+                instantanea, paciente, fisioterapeuta_id, candidato_bloque_id,
+                fechas, espacio_ids, maquina_ids, requiere_maquina
+            )
+            if propuesta is None:
+                if desplazamiento == 0 and candidato_bloque_id == bloque_id:
+                    motivo_pedido = motivo
+                continue
+            propuesta.desviacion_dias = desplazamiento
+            propuesta.desviacion_bloques = abs(
+                posicion[candidato_bloque_id] - posicion.get(bloque_id, posicion[candidato_bloque_id])
+            )
+            propuestas.append(propuesta)
+        
+        if not propuestas:
+            raise ValueError(
+                "No hay ningún horario posible para el tratamiento"
+                + (f" ({motivo_pedido})" if motivo_pedido else "")
+            )
+        return ordenar_propuestas(propuestas)
+    
+    async def _agendar_optimo(
+        self,
+        paciente_id: int,
+        fisioterapeuta_id: int,
+        bloque_id: int,
+        fecha_inicio: date,
+        total_sesiones: int,
+        requiere_maquina: bool,
+        dias_semana: Optional[List[int]]
+    ) -> List[Reserva]:
+        """Inserta la mejor propuesta; ante un conflicto concurrente vuelve a planificar"""
+        for intento in range(1, self.MAX_INTENTOS + 1):
+            mejor = (await self.proponer(
+                paciente_id, fisioterapeuta_id, bloque_id, fecha_inicio, total_sesiones,
+                requiere_maquina, max_alternativas=1, dias_semana=dias_semana
+            ))[0]
+            try:
+                return await self.reserva_repo.crear_muchas(mejor.reservas)
+            except ConflictoReservaError:
+                if intento == self.MAX_INTENTOS:
+                    raise
+    
+    async def _validar(self, paciente_id: int, fisioterapeuta_id: int, bloque_id: int) -> Paciente:
+        """Valida que paciente, fisioterapeuta y bloque existen; devuelve el paciente"""
         paciente = await self.paciente_repo.obtener_por_id(paciente_id)
         if not paciente:
             raise ValueError(f"Paciente {paciente_id} no encontrado")
@@ -301,99 +705,99 @@ class AgendarTratamientoRecurrente:
         bloque = await self.bloque_repo.obtener_por_id(bloque_id)
         if not bloque:
             raise ValueError(f"Bloque horario {bloque_id} no encontrado")
+        return paciente
+    
+    async def _planificar_sesiones(
+        self,
+        paciente: Paciente,
+        fisioterapeuta_id: int,
+        bloque_id: int,
+        fechas_sesiones: List[date],
+        espacios: List[Espacio],
+        requiere_maquina: bool
+    ) -> List[Reserva]:
+        """
+        Valida todas las sesiones y asigna espacio y máquina, sin escribir nada.
         
-        # Calcular fechas semanales (máximo 3 sesiones por semana)
-        fechas_sesiones = self._calcular_fechas_semanales(fecha_inicio, total_sesiones)
+        Lee la ocupación de la base de datos; el repositorio vuelve a comprobar la
+        capacidad del fisioterapeuta dentro de la transacción que escribe.
+        """
+        instantanea = InstantaneaOcupacion(
+            await self.reserva_repo.obtener_ocupacion_rango(
+                fechas_sesiones[0], fechas_sesiones[-1], bloque_id
+            ),
+            await self.reserva_repo.listar_por_rango(
+                fechas_sesiones[0], fechas_sesiones[-1], bloque_id
+            )
+        )
+        maquina_ids = sorted(m.id for m in await self.maquina_repo.listar()) if requiere_maquina else []
         
-        # Iniciar transacción
-        with self.db.begin():
-            reservas_creadas = []
+        reservas_nuevas = []
+        for fecha_sesion in fechas_sesiones:
+            # Encontrar un espacio libre
+            espacios_libres = instantanea.espacios_libres(
+                fecha_sesion, bloque_id, [e.id for e in espacios]
+            )
+            espacio_id = next((e.id for e in espacios if e.id in espacios_libres), None)
             
-            # Validar y crear cada reserva
-            for fecha_sesion in fechas_sesiones:
-                # Validar disponibilidad de espacio
-                espacios_ocupados = await self.espacio_repo.obtener_espacios_ocupados(
-                    fecha_sesion, bloque_id
+            if not espacio_id:
+                raise ValueError(
+                    f"No hay espacios disponibles para {fecha_sesion} en bloque {bloque_id}"
                 )
-                
-                # Obtener todos los espacios y encontrar uno libre
-                espacios = await self.espacio_repo.listar(limit=9)
-                espacio_id = None
-                for espacio in espacios:
-                    if espacio.id not in espacios_ocupados:
-                        espacio_id = espacio.id
-                        break
-                
-                if not espacio_id:
-                    raise ValueError(
-                        f"No hay espacios disponibles para {fecha_sesion} en bloque {bloque_id}"
-                    )
-                
-                # Validar capacidad del fisioterapeuta
-                pacientes_fisio = await self.fisio_repo.contar_pacientes_en_bloque(
-                    fisioterapeuta_id, fecha_sesion, bloque_id
+            
+            # Validar capacidad del fisioterapeuta
+            pacientes_fisio = instantanea.pacientes_de_fisio(
+                fisioterapeuta_id, fecha_sesion, bloque_id
+            )
+            
+            tiene_trato_especial = instantanea.fisio_con_trato_especial(
+                fisioterapeuta_id, fecha_sesion, bloque_id
+            )
+            
+            # Si el paciente requiere trato especial, el fisio no puede tener otros pacientes
+            if paciente.requiere_tratamiento_especial and pacientes_fisio > 0:
+                raise ValueError(
+                    f"Fisioterapeuta {fisioterapeuta_id} ya tiene pacientes en {fecha_sesion} "
+                    f"bloque {bloque_id} y el paciente requiere trato especial"
                 )
-                
-                tiene_trato_especial = await self.fisio_repo.tiene_paciente_con_trato_especial(
-                    fisioterapeuta_id, fecha_sesion, bloque_id
+            
+            # Si el fisio ya tiene un paciente con trato especial, no puede atender más
+            if tiene_trato_especial:
+                raise ValueError(
+                    f"Fisioterapeuta {fisioterapeuta_id} tiene un paciente con trato especial "
+                    f"en {fecha_sesion} bloque {bloque_id}"
                 )
-                
-                # Si el paciente requiere trato especial, el fisio no puede tener otros pacientes
-                if paciente.requiere_tratamiento_especial and pacientes_fisio > 0:
-                    raise ValueError(
-                        f"Fisioterapeuta {fisioterapeuta_id} ya tiene pacientes en {fecha_sesion} "
-                        f"bloque {bloque_id} y el paciente requiere trato especial"
-                    )
-                
-                # Si el fisio ya tiene un paciente con trato especial, no puede atender más
-                if tiene_trato_especial:
-                    raise ValueError(
-                        f"Fisioterapeuta {fisioterapeuta_id} tiene un paciente con trato especial "
-                        f"en {fecha_sesion} bloque {bloque_id}"
-                    )
-                
-                # Si ya tiene 2 pacientes, no puede atender más
-                if pacientes_fisio >= 2:
+            
+            # Si ya tiene 2 pacientes, no puede atender más
+            if pacientes_fisio >= disponibilidad.MAX_PACIENTES_POR_FISIO:
+                raise ValueError(
+                    f"Fisioterapeuta {fisioterapeuta_id} ya tiene 2 pacientes en {fecha_sesion} "
+                    f"bloque {bloque_id}"
+                )
+            
+            # Validar disponibilidad de máquinas si se requiere
+            maquina_id = None
+            if requiere_maquina:
+                maquinas_libres = instantanea.maquinas_libres(fecha_sesion, bloque_id, maquina_ids)
+                if not maquinas_libres:
                     raise ValueError(
-                        f"Fisioterapeuta {fisioterapeuta_id} ya tiene 2 pacientes en {fecha_sesion} "
-                        f"bloque {bloque_id}"
-                    )
-                
-                # Validar disponibilidad de máquinas si se requiere
-                maquina_id = None
-                if requiere_maquina:
-                    maquinas_en_uso = await self.maquina_repo.contar_maquinas_en_uso(
-                        fecha_sesion, bloque_id
-                    )
-                    
-                    if maquinas_en_uso >= 3:
-                        raise ValueError(
-                            f"No hay máquinas disponibles para {fecha_sesion} en bloque {bloque_id}"
-                        )
-                    
-                    maquina_id = await self.maquina_repo.obtener_maquina_disponible(
-                        fecha_sesion, bloque_id
+                        f"No hay máquinas disponibles para {fecha_sesion} en bloque {bloque_id}"
                     )
-                    
-                    if not maquina_id:
-                        raise ValueError(
-                            f"Error al asignar máquina para {fecha_sesion} en bloque {bloque_id}"
-                        )
-                
-                # Crear la reserva
-                reserva = Reserva(
-                    paciente_id=paciente_id,
-                    fisioterapeuta_id=fisioterapeuta_id,
-                    espacio_id=espacio_id,
-                    bloque_id=bloque_id,
-                    maquina_id=maquina_id,
-                    fecha=fecha_sesion
-                )
-                
-                reserva_creada = await self.reserva_repo.crear(reserva)
-                reservas_creadas.append(reserva_creada)
+                maquina_id = min(maquinas_libres)
             
-            return reservas_creadas
+            # Preparar la reserva (se inserta al final junto con las demás)
+            reserva = Reserva(
+                paciente_id=paciente.id,
+                fisioterapeuta_id=fisioterapeuta_id,
+                espacio_id=espacio_id,
+                bloque_id=bloque_id,
+                maquina_id=maquina_id,
+                fecha=fecha_sesion
+            )
+            
+            reservas_nuevas.append(reserva)
+        
+        return reservas_nuevas
     
     def _calcular_fechas_semanales(self, fecha_inicio: date, total_sesiones: int) -> List[date]:
         """
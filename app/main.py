@@ -5,10 +5,16 @@ import sys
 # Rutas (Adaptadores API - Hexagonal)
 from app.adapters.api.routes.pacientes import router as pacientes_router
 from app.adapters.api.routes.citas import router as citas_router
+from app.adapters.api.routes.reservas import router as reservas_router
+from app.adapters.api.routes.salud import router as salud_router
+from app.adapters.api.routes.metricas import router as metricas_router
+from app.adapters.api.metricas import MiddlewareMetricas
 
 # Base de Datos (Session y Configuración)
 from app.db.base import Base
-from app.db.session import engine, get_db, SessionLocal
+from app.db.session import engine, async_engine, AsyncSessionLocal
+from app.db.config import ESQUEMA_AL_INICIAR
+from app.db.esquema import preparar_esquema, verificar_esquema
 
 # Importar modelos ORM para registrar las tablas
 from app.adapters.database.models import (
@@ -19,6 +25,9 @@ from app.adapters.database.models import (
 # Contenedor de DI
 from app.shared.container import init_container
 
+# Sincronización con Google Calendar en segundo plano
+from app.adapters.external.sincronizador_calendario import SincronizadorCalendario
+
 
 # ==================== STARTUP/SHUTDOWN ====================
 
@@ -31,14 +40,25 @@ async def lifespan(app: FastAPI):
     print("🚀 Iniciando aplicación...")
     
     try:
-        # Crear tablas en la base de datos
-        Base.metadata.create_all(bind=engine)
-        print("✅ Base de datos PostgreSQL inicializada")
+        # Esquema: crear o migrar en cada arranque, o solo comprobar la revisión de Alembic
+        if ESQUEMA_AL_INICIAR == "crear":
+            revision = preparar_esquema(engine)
+            print(f"✅ Base de datos PostgreSQL inicializada (revisión {revision})")
+        elif ESQUEMA_AL_INICIAR == "verificar":
+            revision = await verificar_esquema(async_engine)
+            print(f"✅ Esquema de la base de datos en la revisión {revision}")
         
-        # Inicializar contenedor de DI
-        db = SessionLocal()
-        init_container(db)
+        # Inicializar contenedor de DI (servicios singleton; las sesiones son por petición)
+        container = init_container()
         print("✅ Contenedor de inyección de dependencias inicializado")
+        
+        # Worker del outbox de Google Calendar (el cliente se construye en el primer envío)
+        from app.adapters.external.google_calendar import obtener_calendario
+        calendario = obtener_calendario()
+        if calendario is not None:
+            container.sincronizador_calendario = SincronizadorCalendario(AsyncSessionLocal, calendario)
+            container.sincronizador_calendario.iniciar()
+            print("✅ Sincronización con Google Calendar iniciada")
     except Exception as e:
         print(f"❌ Error al iniciar la aplicación: {e}")
         sys.exit(1)
@@ -47,7 +67,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Cerrando aplicación...")
-    db.close()
+    if container.sincronizador_calendario is not None:
+        await container.sincronizador_calendario.detener()
+    await async_engine.dispose()
     print("✅ Aplicación cerrada")
 
 
@@ -69,6 +91,18 @@ app.include_router(pacientes_router)
 # Rutas de Citas
 app.include_router(citas_router)
 
+# Rutas de Reservas
+app.include_router(reservas_router)
+
+# Liveness y readiness (/health, /health/live, /health/ready)
+app.include_router(salud_router)
+
+# Métricas en formato Prometheus (/metrics)
+app.include_router(metricas_router)
+
+# Latencia, consultas SQL y filas por ruta; cabecera Server-Timing
+app.add_middleware(MiddlewareMetricas)
+
 
 # ==================== HEALTH CHECK ====================
 
@@ -80,15 +114,3 @@ def health_check():
         "architecture": "hexagonal"
     }
 
-
-@app.get("/health")
-def detailed_health():
-    return {
-        "status": "healthy",
-        "version": "2.0.0",
-        "components": {
-            "database": "initialized",
-            "di_container": "initialized",
-            "api": "running"
-        }
-    }
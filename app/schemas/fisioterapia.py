@@ -3,7 +3,7 @@ Esquemas Pydantic para Fisioterapia
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from datetime import datetime, date, time
 
 
@@ -160,7 +160,7 @@ class CitaBase(BaseModel):
     titulo: str = Field(..., min_length=1, max_length=200)
     descripcion: Optional[str] = None
     email: Optional[str] = None
-    google_event_id: str
+    google_event_id: Optional[str] = None
 
 
 class CitaCreate(CitaBase):
@@ -220,6 +220,26 @@ class DisponibilidadResponse(BaseModel):
     fecha_fin: date
 
 
+class MatrizDisponibilidadResponse(BaseModel):
+    """
+    Disponibilidad fisioterapeuta × fecha × bloque en formato columnar.
+    Las celdas siguen el orden (fecha, bloque): índice = i_fecha * len(bloque_ids) + i_bloque.
+    """
+    fecha_inicio: date
+    fecha_fin: date
+    fechas: List[date]
+    bloque_ids: List[int]
+    horas_inicio: List[time]
+    horas_fin: List[time]
+    fisioterapeuta_ids: List[int]
+    requiere_maquina: bool
+    espacios_disponibles: List[int] = Field(..., description="Espacios libres por celda")
+    maquinas_disponibles: List[int] = Field(..., description="Máquinas libres por celda")
+    cupos: List[List[int]] = Field(
+        ..., description="Por fisioterapeuta (mismo orden que fisioterapeuta_ids): pacientes que aún puede recibir en cada celda"
+    )
+
+
 # ==================== TRATAMIENTO RECURRENTE ====================
 
 class TratamientoCreate(BaseModel):
@@ -230,6 +250,14 @@ class TratamientoCreate(BaseModel):
     fecha_inicio: date = Field(..., description="Fecha de inicio del tratamiento")
     total_sesiones: int = Field(..., gt=0, le=50, description="Total de sesiones a agendar (máx. 50)")
     requiere_maquina: bool = Field(default=False, description="Si el paciente requiere máquina")
+    optimizar: bool = Field(
+        default=False,
+        description="Agendar la mejor propuesta del planificador (puede cambiar bloque o día de inicio)"
+    )
+    dias_semana: Optional[List[Annotated[int, Field(ge=0, le=6)]]] = Field(
+        default=None,
+        description="Días de inicio que puede explorar el planificador (0 = lunes)"
+    )
 
     class Config:
         json_schema_extra = {
@@ -288,3 +316,54 @@ class TratamientoResponse(BaseModel):
                 "mensaje": "Tratamiento agendado exitosamente"
             }
         }
+
+
+class SesionPropuesta(BaseModel):
+    """Sesión de una propuesta (todavía sin reservar)"""
+    fecha: date
+    espacio_id: int
+    maquina_id: Optional[int] = None
+
+
+class PropuestaTratamientoSchema(BaseModel):
+    """Horario posible para un tratamiento recurrente"""
+    bloque_id: int
+    fecha_inicio: date
+    hora_inicio: Optional[time] = None
+    hora_fin: Optional[time] = None
+    desviacion_dias: int = Field(..., description="Días de retraso respecto a la fecha pedida")
+    desviacion_bloques: int = Field(..., description="Bloques de distancia respecto al bloque pedido")
+    cambios_espacio: int = Field(..., description="Cambios de espacio entre sesiones consecutivas")
+    cambios_maquina: int = Field(..., description="Cambios de máquina entre sesiones consecutivas")
+    sesiones: List[SesionPropuesta]
+
+
+class PropuestasTratamientoResponse(BaseModel):
+    """Propuestas del planificador, de mejor a peor"""
+    paciente_id: int
+    fisioterapeuta_id: int
+    total_propuestas: int
+    propuestas: List[PropuestaTratamientoSchema]
+
+
+class LoteTratamientosCreate(BaseModel):
+    """Request body para agendar varios tratamientos a la vez"""
+    tratamientos: List[TratamientoCreate] = Field(..., min_length=1, max_length=100)
+
+
+class ResultadoTratamientoLoteSchema(BaseModel):
+    """Resultado de un tratamiento del lote: sus sesiones o el motivo del fallo"""
+    indice: int = Field(..., description="Posición del tratamiento en la petición")
+    paciente_id: int
+    fisioterapeuta_id: int
+    exito: bool
+    sesiones: List[SesionAgendada] = Field(default_factory=list)
+    error: Optional[str] = None
+
+
+class LoteTratamientosResponse(BaseModel):
+    """Respuesta después de agendar un lote de tratamientos"""
+    total_tratamientos: int
+    total_agendados: int
+    total_sesiones_agendadas: int
+    resultados: List[ResultadoTratamientoLoteSchema]
@@ -2,10 +2,12 @@
 Capa Compartida - Esquemas, utilidades y configuración común
 """
 
-from .container import Container, init_container, get_container
+from .container import Container, RequestScope, init_container, get_container, get_scope
 
 __all__ = [
     "Container",
+    "RequestScope",
     "init_container",
-    "get_container"
+    "get_container",
+    "get_scope"
 ]
@@ -1,45 +1,115 @@
 """
 Contenedor de Inyección de Dependencias (DI)
+
+- Container: servicios compartidos por todo el proceso (fábrica de sesiones,
+  versiones de reservas y cachés). Se construye una vez al iniciar.
+- RequestScope: repositorios y casos de uso de una petición, sobre una sesión
+  propia tomada del pool. Se construye por petición con la dependencia get_scope.
 """
 
-from typing import Callable, Dict, Any
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.domain.ports import (
-    PacienteRepository,
-    ReservaRepository,
-    DiagnosticoRepository,
-    FisioterapeutaRepository,
-    MaquinaRepository,
-    EspacioRepository,
-    BloqueHorarioRepository,
-    CitaRepository
-)
+from app.db.session import AsyncSessionLocal, get_async_db
+from app.db.config import DISPONIBILIDAD_MATERIALIZADA
 from app.domain.usecases import (
     CrearPaciente,
     ObtenerPaciente,
     ListarPacientes,
+    ListarPacientesPorCursor,
+    ImportarPacientes,
+    ExportarPacientes,
     ActualizarPaciente,
     EliminarPaciente,
     CrearReserva,
+    ListarReservasPorCursor,
+    ExportarReservas,
     ObtenerReserva,
     ListarReservasPaciente,
     ListarReservasFisioterapeuta,
     CrearDiagnostico,
-    ObtenerDiagnosticoPaciente
+    ObtenerDiagnosticoPaciente,
+    ConsultarDisponibilidad,
+    ConsultarMatrizDisponibilidad,
+    AgendarTratamientoRecurrente
 )
 from app.adapters.database.models import (
-    PacienteRepositoryImpl
+    PacienteRepositoryImpl,
+    FisioterapeutaRepositoryImpl,
+    EspacioRepositoryImpl,
+    BloqueHorarioRepositoryImpl,
+    MaquinaRepositoryImpl,
+    ReservaRepositoryImpl,
+    DiagnosticoRepositoryImpl,
+    CitaRepositoryImpl
+)
+from app.adapters.database.versiones import VersionesReservas, versiones_reservas
+from app.adapters.api.cache_respuestas import CacheRespuestas, cache_disponibilidad
+from app.adapters.database.catalogos import (
+    CacheCatalogo,
+    cache_espacios,
+    cache_bloques,
+    cache_maquinas,
+    cache_fisioterapeutas
 )
 
 
 class Container:
     """
     Contenedor de Inyección de Dependencias (DI)
-    Administra la creación y distribución de dependencias
+    Administra los servicios singleton y crea un scope por petición
+    """
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        caches: Optional[Dict[str, CacheCatalogo]] = None,
+        disponibilidad_materializada: bool = DISPONIBILIDAD_MATERIALIZADA,
+        versiones: VersionesReservas = versiones_reservas,
+        cache_respuestas: CacheRespuestas = cache_disponibilidad
+    ):
+        self.session_factory = session_factory
+        self.versiones = versiones
+        self.cache_disponibilidad = cache_respuestas
+        self.disponibilidad_materializada = disponibilidad_materializada
+        self.caches: Dict[str, CacheCatalogo] = caches or {
+            'espacio': cache_espacios,
+            'bloque_horario': cache_bloques,
+            'maquina': cache_maquinas,
+            'fisioterapeuta': cache_fisioterapeutas
+        }
+        # Worker del outbox de Google Calendar (lo arranca main.lifespan si hay credenciales)
+        self.sincronizador_calendario = None
+    
+    def version_disponibilidad(self, fecha_inicio: date, fecha_fin: date) -> Tuple[Any, ...]:
+        """Versión de los datos de los que depende la disponibilidad del rango"""
+        return (
+            self.versiones.version(fecha_inicio, fecha_fin),
+            tuple(cache.version for cache in self.caches.values())
+        )
+    
+    def create_scope(self, db: AsyncSession) -> "RequestScope":
+        """Crear los repositorios y casos de uso de una petición sobre la sesión dada"""
+        return RequestScope(self, db)
+    
+    @asynccontextmanager
+    async def scope(self) -> AsyncIterator["RequestScope"]:
+        """Scope con sesión propia, para trabajo fuera de una petición HTTP"""
+        async with self.session_factory() as db:
+            yield self.create_scope(db)
+
+
+class RequestScope:
+    """
+    Dependencias de una petición: comparten una sesión (y su conexión del pool)
+    y los servicios singleton del Container
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, container: Container, db: AsyncSession):
+        self.container = container
         self.db = db
         self._repositories: Dict[str, Any] = {}
         self._use_cases: Dict[str, Any] = {}
@@ -48,38 +118,71 @@ class Container:
     
     def _initialize_repositories(self):
         """Inicializar todos los repositorios"""
-        self._repositories['paciente'] = PacienteRepositoryImpl(self.db)
-        # Aquí irán los demás repositorios cuando se implementen
-        # self._repositories['reserva'] = ReservaRepositoryImpl(self.db)
-        # self._repositories['diagnostico'] = DiagnosticoRepositoryImpl(self.db)
-        # self._repositories['fisioterapeuta'] = FisioterapeutaRepositoryImpl(self.db)
-        # self._repositories['maquina'] = MaquinaRepositoryImpl(self.db)
-        # self._repositories['espacio'] = EspacioRepositoryImpl(self.db)
-        # self._repositories['bloque_horario'] = BloqueHorarioRepositoryImpl(self.db)
-        # self._repositories['cita'] = CitaRepositoryImpl(self.db)
+        caches = self.container.caches
+        
+        versiones = self.container.versiones
+        
+        self._repositories['paciente'] = PacienteRepositoryImpl(self.db, versiones)
+        self._repositories['fisioterapeuta'] = FisioterapeutaRepositoryImpl(
+            self.db, caches['fisioterapeuta']
+        )
+        self._repositories['espacio'] = EspacioRepositoryImpl(self.db, caches['espacio'])
+        self._repositories['bloque_horario'] = BloqueHorarioRepositoryImpl(
+            self.db, caches['bloque_horario']
+        )
+        self._repositories['maquina'] = MaquinaRepositoryImpl(self.db, caches['maquina'])
+        self._repositories['reserva'] = ReservaRepositoryImpl(self.db, versiones)
+        self._repositories['diagnostico'] = DiagnosticoRepositoryImpl(self.db)
+        self._repositories['cita'] = CitaRepositoryImpl(self.db)
     
     def _initialize_use_cases(self):
         """Inicializar todos los casos de uso"""
         paciente_repo = self._repositories['paciente']
+        reserva_repo = self._repositories['reserva']
+        diagnostico_repo = self._repositories['diagnostico']
         
         self._use_cases['crear_paciente'] = CrearPaciente(paciente_repo)
         self._use_cases['obtener_paciente'] = ObtenerPaciente(paciente_repo)
         self._use_cases['listar_pacientes'] = ListarPacientes(paciente_repo)
+        self._use_cases['listar_pacientes_por_cursor'] = ListarPacientesPorCursor(paciente_repo)
+        self._use_cases['importar_pacientes'] = ImportarPacientes(paciente_repo)
+        self._use_cases['exportar_pacientes'] = ExportarPacientes(paciente_repo)
         self._use_cases['actualizar_paciente'] = ActualizarPaciente(paciente_repo)
         self._use_cases['eliminar_paciente'] = EliminarPaciente(paciente_repo)
         
-        # Aquí irán los demás casos de uso cuando se implementen los repositorios
-        # reserva_repo = self._repositories.get('reserva')
-        # if reserva_repo:
-        #     self._use_cases['crear_reserva'] = CrearReserva(reserva_repo)
-        #     self._use_cases['obtener_reserva'] = ObtenerReserva(reserva_repo)
-        #     self._use_cases['listar_reservas_paciente'] = ListarReservasPaciente(reserva_repo)
-        #     self._use_cases['listar_reservas_fisioterapeuta'] = ListarReservasFisioterapeuta(reserva_repo)
+        self._use_cases['crear_reserva'] = CrearReserva(reserva_repo)
+        self._use_cases['listar_reservas_por_cursor'] = ListarReservasPorCursor(reserva_repo)
+        self._use_cases['exportar_reservas'] = ExportarReservas(reserva_repo)
+        self._use_cases['obtener_reserva'] = ObtenerReserva(reserva_repo)
+        self._use_cases['listar_reservas_paciente'] = ListarReservasPaciente(reserva_repo)
+        self._use_cases['listar_reservas_fisioterapeuta'] = ListarReservasFisioterapeuta(reserva_repo)
+        
+        self._use_cases['crear_diagnostico'] = CrearDiagnostico(diagnostico_repo)
+        self._use_cases['obtener_diagnostico_paciente'] = ObtenerDiagnosticoPaciente(diagnostico_repo)
         
-        # diagnostico_repo = self._repositories.get('diagnostico')
-        # if diagnostico_repo:
-        #     self._use_cases['crear_diagnostico'] = CrearDiagnostico(diagnostico_repo)
-        #     self._use_cases['obtener_diagnostico_paciente'] = ObtenerDiagnosticoPaciente(diagnostico_repo)
+        self._use_cases['consultar_disponibilidad'] = ConsultarDisponibilidad(
+            espacio_repo=self._repositories['espacio'],
+            bloque_repo=self._repositories['bloque_horario'],
+            paciente_repo=paciente_repo,
+            reserva_repo=reserva_repo,
+            materializada=self.container.disponibilidad_materializada
+        )
+        self._use_cases['consultar_matriz_disponibilidad'] = ConsultarMatrizDisponibilidad(
+            espacio_repo=self._repositories['espacio'],
+            bloque_repo=self._repositories['bloque_horario'],
+            fisio_repo=self._repositories['fisioterapeuta'],
+            paciente_repo=paciente_repo,
+            reserva_repo=reserva_repo,
+            materializada=self.container.disponibilidad_materializada
+        )
+        self._use_cases['agendar_tratamiento'] = AgendarTratamientoRecurrente(
+            paciente_repo=paciente_repo,
+            fisio_repo=self._repositories['fisioterapeuta'],
+            espacio_repo=self._repositories['espacio'],
+            bloque_repo=self._repositories['bloque_horario'],
+            maquina_repo=self._repositories['maquina'],
+            reserva_repo=reserva_repo
+        )
     
     def get_repository(self, repo_type: str) -> Any:
         """Obtener un repositorio por tipo"""
@@ -98,14 +201,14 @@ class Container:
         return self._use_cases
 
 
-# Instancia global del contenedor
+# Instancia global del contenedor (solo servicios singleton, nunca una sesión)
 _container: Container = None
 
 
-def init_container(db: Session) -> Container:
+def init_container(**kwargs) -> Container:
     """Inicializar el contenedor de DI"""
     global _container
-    _container = Container(db)
+    _container = Container(**kwargs)
     return _container
 
 
@@ -114,3 +217,12 @@ def get_container() -> Container:
     if _container is None:
         raise RuntimeError("Contenedor no inicializado. Llamar a init_container() primero.")
     return _container
+
+
+def get_scope(db: AsyncSession = Depends(get_async_db)) -> RequestScope:
+    """
+    Dependencia de FastAPI: scope de la petición actual.
+    FastAPI la resuelve una sola vez por petición, así que todas las rutas y
+    dependencias de la petición comparten la misma sesión, que vuelve al pool al terminar.
+    """
+    return get_container().create_scope(db)
@@ -0,0 +1,55 @@
+"""
+Plugin de pytest: presupuesto de consultas SQL por operación
+
+Se activa en el conftest.py del proyecto que lo use:
+
+    pytest_plugins = ["app.shared.pytest_consultas"]
+
+y el fixture ``presupuesto_consultas`` falla el test si lo ejecutado dentro del
+bloque supera el número de consultas o repite una sentencia más de lo permitido
+(un N+1), con los sitios de llamada en el mensaje:
+
+    async def test_disponibilidad(cliente, presupuesto_consultas):
+        with presupuesto_consultas(maximo=4, repeticiones=1):
+            await cliente.get("/api/citas/disponibles", params=...)
+
+Cuenta todas las consultas del proceso mientras dura el bloque, así que sirve
+tanto con httpx.AsyncClient como con TestClient (que atiende en otro hilo).
+"""
+
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator, Optional
+
+import pytest
+
+from app.db.config import DETECTOR_UMBRAL_REPETICIONES
+from app.db.instrumentacion import MedicionPeticion, medir_proceso
+
+
+@contextmanager
+def _presupuesto(
+    maximo: Optional[int] = None,
+    repeticiones: Optional[int] = DETECTOR_UMBRAL_REPETICIONES
+) -> Iterator[MedicionPeticion]:
+    with medir_proceso(detectar=repeticiones is not None) as medicion:
+        yield medicion
+    
+    errores = []
+    if maximo is not None and medicion.consultas > maximo:
+        errores.append(f"Se ejecutaron {medicion.consultas} consultas SQL (presupuesto: {maximo})")
+    if repeticiones is not None:
+        informe = medicion.detector.informe(repeticiones)
+        if informe:
+            errores.append(f"Sentencias repetidas más de {repeticiones} veces:\n{informe}")
+    if errores:
+        pytest.fail("\n".join(errores), pytrace=False)
+
+
+@pytest.fixture
+def presupuesto_consultas() -> Callable[..., ContextManager[MedicionPeticion]]:
+    """
+    ``presupuesto_consultas(maximo=None, repeticiones=DETECTOR_UMBRAL_REPETICIONES)``:
+    bloque con límite de consultas totales y de repeticiones de una misma sentencia
+    (None desactiva cada comprobación). La medición queda disponible con ``as``.
+    """
+    return _presupuesto
@@ -101,6 +101,23 @@ class PacienteResponse(PacienteBase):
         from_attributes = True
 
 
+class PacientePagina(BaseModel):
+    items: List[PacienteResponse]
+    next_cursor: Optional[str] = None
+
+
+class ErrorFilaImportacion(BaseModel):
+    fila: int  # Número de fila de datos (1 = primera fila tras la cabecera)
+    errores: List[str]
+
+
+class ResultadoImportacion(BaseModel):
+    total_filas: int
+    importados: int
+    errores: List[ErrorFilaImportacion] = []
+    errores_omitidos: int = 0  # Errores no listados por superar el máximo del reporte
+
+
 # ==================== DIAGNÓSTICO ====================
 
 class DiagnosticoBase(BaseModel):
@@ -146,6 +163,11 @@ class ReservaResponse(ReservaBase):
         from_attributes = True
 
 
+class ReservaPagina(BaseModel):
+    items: List[ReservaResponse]
+    next_cursor: Optional[str] = None
+
+
 class ReservaConDetalles(ReservaResponse):
     paciente: Optional[PacienteResponse] = None
     fisioterapeuta: Optional[FisioterapeutaResponse] = None
@@ -160,7 +182,7 @@ class CitaBase(BaseModel):
     titulo: str = Field(..., min_length=1, max_length=200)
     descripcion: Optional[str] = None
     email: Optional[str] = None
-    google_event_id: str
+    google_event_id: Optional[str] = None
 
 
 class CitaCreate(CitaBase):
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Benchmark: tiempo de arranque en frío de un worker
+
+Cada medición corre en un proceso nuevo (como un worker de uvicorn recién
+lanzado) y mide una fase:
+
+- importar: ``import app.main`` (rutas, modelos, contenedor)
+- arranque-crear / arranque-verificar: el lifespan con ESQUEMA_AL_INICIAR
+  igual a "crear" (create_all) o "verificar" (revisión de Alembic); necesitan
+  la base de datos configurada en DB_*
+- google-descarga / google-cache: construir el cliente de Calendar
+  descargando el documento de descubrimiento o leyéndolo de disco
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_arranque.py
+    python benchmarks/bench_arranque.py --repeticiones 10 --fases importar google-cache
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+FASES = ["importar", "arranque-crear", "arranque-verificar", "google-descarga", "google-cache"]
+
+
+def medir_fase(fase: str, ruta_cache: str) -> float:
+    """Ejecuta la fase en este proceso y devuelve los segundos"""
+    if fase == "importar":
+        inicio = time.perf_counter()
+        import app.main  # noqa: F401
+        return time.perf_counter() - inicio
+    
+    if fase.startswith("arranque-"):
+        os.environ["ESQUEMA_AL_INICIAR"] = fase.split("-", 1)[1]
+        from app.main import app
+        
+        async def arrancar() -> float:
+            inicio = time.perf_counter()
+            async with app.router.lifespan_context(app):
+                return time.perf_counter() - inicio
+        return asyncio.run(arrancar())
+    
+    from app.adapters.external.google_calendar import construir_servicio
+    if fase == "google-descarga":
+        ruta_cache = os.path.join(tempfile.mkdtemp(), "descubrimiento.json")
+    inicio = time.perf_counter()
+    construir_servicio(None, ruta_cache)
+    return time.perf_counter() - inicio
+
+
+def medir_en_proceso_nuevo(fase: str, ruta_cache: str) -> float:
+    salida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--hijo", fase, "--cache", ruta_cache],
+        cwd=RAIZ, capture_output=True, text=True
+    )
+    if salida.returncode != 0:
+        raise RuntimeError((salida.stderr or salida.stdout).strip().splitlines()[-1])
+    return json.loads(salida.stdout.strip().splitlines()[-1])["segundos"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fases", nargs="+", choices=FASES, default=FASES)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--hijo", choices=FASES, help=argparse.SUPPRESS)
+    parser.add_argument("--cache", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.hijo:
+        print(json.dumps({"segundos": medir_fase(args.hijo, args.cache)}))
+        return
+    
+    ruta_cache = os.path.join(tempfile.mkdtemp(), "google_calendar_v3.json")
+    print(f"\n📊 Arranque en frío: {args.repeticiones} procesos por fase\n")
+    print(f"{'fase':<22} {'mín ms':>10} {'mediana ms':>12}")
+    for fase in args.fases:
+        if fase == "google-cache" and not os.path.exists(ruta_cache):
+            # El primer proceso descarga y guarda el documento; no se cuenta
+            try:
+                medir_en_proceso_nuevo(fase, ruta_cache)
+            except RuntimeError:
+                pass
+        try:
+            tiempos = [medir_en_proceso_nuevo(fase, ruta_cache) * 1000 for _ in range(args.repeticiones)]
+        except RuntimeError as e:
+            print(f"{fase:<22} ❌ {e}")
+            continue
+        print(f"{fase:<22} {min(tiempos):>10.1f} {statistics.median(tiempos):>12.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
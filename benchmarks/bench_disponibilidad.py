@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Benchmark: matriz de disponibilidad con NumPy frente al bucle de referencia
+
+Genera una ocupación sintética (sin base de datos), comprueba que ambos caminos
+producen el mismo resultado y mide cada uno.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_disponibilidad.py
+    python benchmarks/bench_disponibilidad.py --dias 180 --fisios 40 --repeticiones 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, time as hora, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.domain import disponibilidad
+from app.domain.entities import BloqueHorario, OcupacionBloque
+
+TOTAL_ESPACIOS = 9
+
+
+def generar_ocupacion(fecha_inicio: date, dias: int, bloques, fisios: int, llenado: float, semilla: int):
+    """Ocupación aleatoria que respeta las reglas de capacidad"""
+    rnd = random.Random(semilla)
+    ocupacion = {}
+    for d in range(dias):
+        fecha = fecha_inicio + timedelta(days=d)
+        for bloque in bloques:
+            slot = OcupacionBloque(fecha=fecha, bloque_id=bloque.id)
+            for _ in range(rnd.randint(0, int(TOTAL_ESPACIOS * llenado))):
+                fisio = rnd.randint(1, fisios)
+                if fisio in slot.fisios_con_trato_especial or slot.pacientes_por_fisio.get(fisio, 0) >= 2:
+                    continue
+                slot.espacios_ocupados += 1
+                slot.pacientes_por_fisio[fisio] = slot.pacientes_por_fisio.get(fisio, 0) + 1
+                if slot.maquinas_en_uso < disponibilidad.TOTAL_MAQUINAS and rnd.random() < 0.3:
+                    slot.maquinas_en_uso += 1
+                if slot.pacientes_por_fisio[fisio] == 1 and rnd.random() < 0.1:
+                    slot.fisios_con_trato_especial.add(fisio)
+            if slot.espacios_ocupados:
+                ocupacion[(fecha, bloque.id)] = slot
+    return ocupacion
+
+
+def calcular_matriz_bucle(ocupacion, bloques, total_espacios, fechas, fisio_ids, requiere_maquina):
+    """Implementación de referencia (sin NumPy) de las columnas de la matriz"""
+    espacios_disponibles = []
+    maquinas_disponibles = []
+    cupos = [[] for _ in fisio_ids]
+    vacio = OcupacionBloque()
+    
+    for fecha in fechas:
+        for bloque in bloques:
+            slot = ocupacion.get((fecha, bloque.id), vacio)
+            espacios_libres = total_espacios - slot.espacios_ocupados
+            maquinas_libres = disponibilidad.TOTAL_MAQUINAS - slot.maquinas_en_uso
+            espacios_disponibles.append(espacios_libres)
+            maquinas_disponibles.append(maquinas_libres)
+            
+            hay_lugar = espacios_libres > 0 and (not requiere_maquina or maquinas_libres > 0)
+            for columna, fisio_id in zip(cupos, fisio_ids):
+                if not hay_lugar or fisio_id in slot.fisios_con_trato_especial:
+                    columna.append(0)
+                    continue
+                libres = disponibilidad.MAX_PACIENTES_POR_FISIO - slot.pacientes_por_fisio.get(fisio_id, 0)
+                columna.append(max(0, min(libres, espacios_libres)))
+    
+    return espacios_disponibles, maquinas_disponibles, cupos
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Mejor tiempo en milisegundos"""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dias", type=int, default=90)
+    parser.add_argument("--bloques", type=int, default=8)
+    parser.add_argument("--fisios", type=int, default=20)
+    parser.add_argument("--llenado", type=float, default=0.7, help="Fracción máxima de espacios ocupados")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+    
+    fecha_inicio = date(2026, 1, 5)
+    fecha_fin = fecha_inicio + timedelta(days=args.dias - 1)
+    bloques = [
+        BloqueHorario(id=i, hora_inicio=hora(7 + i), hora_fin=hora(7 + i, 45))
+        for i in range(1, args.bloques + 1)
+    ]
+    fisio_ids = list(range(1, args.fisios + 1))
+    ocupacion = generar_ocupacion(fecha_inicio, args.dias, bloques, args.fisios, args.llenado, args.semilla)
+    fechas = [fecha_inicio + timedelta(days=d) for d in range(args.dias)]
+    
+    casos = []
+    for fisios in sorted({1, args.fisios}):
+        for requiere_maquina in (False, True):
+            parametros = (ocupacion, bloques, TOTAL_ESPACIOS, fecha_inicio, fecha_fin, fisio_ids[:fisios], requiere_maquina)
+            casos.append((
+                f"matriz {fisios} fisios maquina={requiere_maquina}",
+                lambda p=parametros: calcular_matriz_bucle(p[0], p[1], p[2], fechas, p[5], p[6]),
+                lambda p=parametros: disponibilidad.calcular_matriz(*p)
+            ))
+    
+    print(f"\n📊 {args.dias} días × {args.bloques} bloques, {args.fisios} fisioterapeutas, "
+          f"{len(ocupacion)} bloques con reservas\n")
+    print(f"{'caso':<45} {'bucle ms':>10} {'numpy ms':>10} {'x':>6}")
+    for nombre, referencia, vectorizado in casos:
+        if referencia() != vectorizado():
+            print(f"❌ {nombre}: los resultados no coinciden")
+            sys.exit(1)
+        t_ref = medir(referencia, args.repeticiones)
+        t_np = medir(vectorizado, args.repeticiones)
+        print(f"{nombre:<45} {t_ref:>10.2f} {t_np:>10.2f} {t_ref / t_np:>6.1f}")
+    print("\n✅ Ambas implementaciones producen el mismo resultado\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python
+"""
+Prueba de carga HTTP: tráfico mixto de disponibilidad, pacientes y reservas
+
+Reproduce la mezcla de tráfico de la recepción sobre la API:
+
+- 80 % consultas de disponibilidad de una semana (GET /api/citas/disponibles,
+  sobre las próximas --semanas, como el sondeo de la vista semanal)
+- 15 % lecturas de pacientes (GET /api/pacientes/{id})
+- 5 % reservas de tratamientos (POST /api/citas/agendar); un 409 se reintenta
+  desde el cliente hasta --reintentos veces
+
+Sin --url, la aplicación corre en este proceso (transporte ASGI de httpx, un
+solo worker) sobre una clínica sintética recién sembrada, con el pool indicado
+en --pool-size/--max-overflow. Con --url ataca a un uvicorn local, cuya base de
+datos debe tener una clínica sembrada con los mismos parámetros de escala.
+
+Por defecto cada usuario virtual lanza una petición tras otra (--usuarios en
+bucle cerrado); con --tasa las peticiones llegan a ese ritmo (Poisson) y la
+latencia se mide desde el instante previsto, incluida la espera en el cliente.
+
+Informa del throughput, los percentiles de latencia por tipo, las reservas
+rechazadas y en conflicto (409, reintentos del cliente y conflictos que el
+servidor reintentó, leídos de Server-Timing) y la saturación del pool: en
+proceso, muestreando el pool; con --url, a través de /health/ready (pool de un
+worker cualquiera en cada muestra).
+
+Uso (desde la raíz del repositorio, con app/requirements-dev.txt instalado):
+    python benchmarks/carga_http.py --duracion 30 --usuarios 50 --pool-size 5 --max-overflow 5
+    python benchmarks/carga_http.py --tasa 200 --duracion 60 --salida carga.json
+    python benchmarks/carga_http.py --url http://localhost:8000 --usuarios 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_casos_uso import FECHA_INICIO, commit_actual, percentil, sembrar_clinica
+from app.db.config import SQLALCHEMY_MAX_OVERFLOW, SQLALCHEMY_POOL_SIZE
+
+MEZCLA = (("disponibilidad", 0.80), ("paciente", 0.15), ("agendar", 0.05))
+
+
+@dataclass
+class Resultado:
+    """Una operación del tráfico, con sus reintentos de cliente incluidos"""
+    tipo: str
+    estado: int  # 0 si no hubo respuesta (timeout o error de conexión)
+    segundos: float
+    conflictos_servidor: int = 0
+    reintentos: int = 0
+
+
+def conflictos_server_timing(respuesta: httpx.Response) -> int:
+    """Conflictos de reserva que el servidor reintentó (entrada ``conflictos`` de Server-Timing)"""
+    for parte in respuesta.headers.get("server-timing", "").split(","):
+        nombre, _, resto = parte.strip().partition(";")
+        if nombre == "conflictos":
+            return int(resto.split('desc="', 1)[1].rstrip('"'))
+    return 0
+
+
+class GeneradorTrafico:
+    """Elige y ejecuta operaciones según MEZCLA sobre los ids de la clínica sembrada"""
+    
+    def __init__(self, args, rnd: random.Random):
+        self.args = args
+        self.rnd = rnd
+        self.tipos = [tipo for tipo, _ in MEZCLA]
+        self.pesos = [peso for _, peso in MEZCLA]
+    
+    async def ejecutar(self, cliente: httpx.AsyncClient, programada: Optional[float] = None) -> Resultado:
+        tipo = self.rnd.choices(self.tipos, self.pesos)[0]
+        inicio = programada if programada is not None else time.perf_counter()
+        conflictos = reintentos = 0
+        try:
+            if tipo == "disponibilidad":
+                respuesta = await cliente.get("/api/citas/disponibles", params=self._semana())
+            elif tipo == "paciente":
+                respuesta = await cliente.get(f"/api/pacientes/{self.rnd.randint(1, self.args.pacientes)}")
+            else:
+                cuerpo = self._tratamiento()
+                while True:
+                    respuesta = await cliente.post("/api/citas/agendar", json=cuerpo)
+                    conflictos += conflictos_server_timing(respuesta)
+                    if respuesta.status_code != 409 or reintentos >= self.args.reintentos:
+                        break
+                    reintentos += 1
+                    await asyncio.sleep(self.rnd.uniform(0.05, 0.15))
+            estado = respuesta.status_code
+        except httpx.HTTPError:
+            estado = 0
+        return Resultado(tipo, estado, time.perf_counter() - inicio, conflictos, reintentos)
+    
+    def _semana(self) -> Dict[str, Any]:
+        lunes = FECHA_INICIO + timedelta(weeks=self.rnd.randrange(self.args.semanas))
+        parametros = {"fecha_inicio": lunes.isoformat(), "fecha_fin": (lunes + timedelta(days=6)).isoformat()}
+        if self.rnd.random() < 0.7:
+            parametros["fisioterapeuta_id"] = self.rnd.randint(1, self.args.fisios)
+        if self.rnd.random() < 0.5:
+            parametros["paciente_id"] = self.rnd.randint(1, self.args.pacientes)
+        return parametros
+    
+    def _tratamiento(self) -> Dict[str, Any]:
+        inicio = FECHA_INICIO + timedelta(days=self.rnd.randrange(self.args.semanas * 7))
+        return {
+            "paciente_id": self.rnd.randint(1, self.args.pacientes),
+            "fisioterapeuta_id": self.rnd.randint(1, self.args.fisios),
+            "bloque_id": self.rnd.randint(1, self.args.bloques),
+            "fecha_inicio": inicio.isoformat(),
+            "total_sesiones": self.rnd.randint(4, 12)
+        }
+
+
+# ==================== GENERACIÓN DE CARGA ====================
+
+async def bucle_cerrado(cliente, generador: GeneradorTrafico, args, resultados: List[Resultado]) -> None:
+    fin = time.perf_counter() + args.duracion
+    
+    async def usuario():
+        while time.perf_counter() < fin:
+            resultados.append(await generador.ejecutar(cliente))
+    
+    await asyncio.gather(*(usuario() for _ in range(args.usuarios)))
+
+
+async def bucle_abierto(cliente, generador: GeneradorTrafico, args, resultados: List[Resultado]) -> int:
+    """Llegadas de Poisson a --tasa por segundo; devuelve las descartadas por superar --usuarios en vuelo"""
+    inicio = time.perf_counter()
+    siguiente = inicio
+    en_vuelo = set()
+    descartadas = 0
+    
+    async def lanzar(programada: float):
+        resultados.append(await generador.ejecutar(cliente, programada))
+    
+    while siguiente < inicio + args.duracion:
+        await asyncio.sleep(max(0.0, siguiente - time.perf_counter()))
+        if len(en_vuelo) >= args.usuarios:
+            descartadas += 1
+        else:
+            tarea = asyncio.create_task(lanzar(siguiente))
+            en_vuelo.add(tarea)
+            tarea.add_done_callback(en_vuelo.discard)
+        siguiente += generador.rnd.expovariate(args.tasa)
+    if en_vuelo:
+        await asyncio.gather(*en_vuelo)
+    return descartadas
+
+
+class MuestreoPool(ABC):
+    """Muestras periódicas de las conexiones en uso del pool"""
+    
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self.muestras: List[Dict[str, Any]] = []
+        self._tarea: Optional[asyncio.Task] = None
+    
+    @abstractmethod
+    async def muestra(self) -> Optional[Dict[str, Any]]:
+        """{"en_uso", "capacidad", "saturado"}, o None si no se pudo leer el pool"""
+        pass
+    
+    async def _bucle(self):
+        while True:
+            muestra = await self.muestra()
+            if muestra is not None:
+                self.muestras.append(muestra)
+            await asyncio.sleep(self.intervalo)
+    
+    def iniciar(self):
+        self._tarea = asyncio.create_task(self._bucle())
+    
+    async def detener(self):
+        self._tarea.cancel()
+        try:
+            await self._tarea
+        except asyncio.CancelledError:
+            pass
+    
+    def resumen(self) -> Dict[str, Any]:
+        if not self.muestras:
+            return {"muestras": 0}
+        en_uso = [m["en_uso"] for m in self.muestras]
+        return {
+            "muestras": len(self.muestras),
+            "capacidad": self.muestras[-1]["capacidad"],
+            "en_uso_max": max(en_uso),
+            "en_uso_p50": percentil(en_uso, 50),
+            "en_uso_p95": percentil(en_uso, 95),
+            "saturado_fraccion": round(sum(m["saturado"] for m in self.muestras) / len(self.muestras), 4)
+        }
+
+
+class MuestreoPoolLocal(MuestreoPool):
+    """Lee el QueuePool del engine de este proceso"""
+    
+    def __init__(self, engine, intervalo: float = 0.02):
+        super().__init__(intervalo)
+        self.pool = engine.sync_engine.pool
+    
+    async def muestra(self):
+        capacidad = self.pool.size() + max(getattr(self.pool, "_max_overflow", 0), 0)
+        en_uso = self.pool.checkedout()
+        return {"en_uso": en_uso, "capacidad": capacidad, "saturado": en_uso >= capacidad}
+
+
+class MuestreoPoolRemoto(MuestreoPool):
+    """Consulta /health/ready (el readiness hace ping, así que ocupa una conexión más)"""
+    
+    def __init__(self, cliente: httpx.AsyncClient, intervalo: float = 0.5):
+        super().__init__(intervalo)
+        self.cliente = cliente
+    
+    async def muestra(self):
+        try:
+            pool = (await self.cliente.get("/health/ready")).json()["components"]["database"]["pool"]
+        except (httpx.HTTPError, KeyError, ValueError):
+            return None
+        if "en_uso" not in pool:
+            return None
+        return {
+            "en_uso": pool["en_uso"],
+            "capacidad": pool["tamano"] + max(pool["max_overflow"], 0),
+            "saturado": pool["saturado"]
+        }
+
+
+# ==================== INFORME ====================
+
+def resumir(resultados: List[Resultado], duracion: float, descartadas: int, pool: Dict[str, Any]) -> Dict[str, Any]:
+    por_tipo: Dict[str, List[Resultado]] = defaultdict(list)
+    for r in resultados:
+        por_tipo[r.tipo].append(r)
+    
+    tipos = {}
+    for tipo, lista in sorted(por_tipo.items()):
+        ms = [r.segundos * 1000 for r in lista]
+        estados = Counter(r.estado for r in lista)
+        tipos[tipo] = {
+            "peticiones": len(lista),
+            "por_segundo": round(len(lista) / duracion, 2),
+            "p50_ms": round(percentil(ms, 50), 2),
+            "p95_ms": round(percentil(ms, 95), 2),
+            "p99_ms": round(percentil(ms, 99), 2),
+            "max_ms": round(max(ms), 2),
+            "estados": {str(e): n for e, n in sorted(estados.items())},
+            "errores": sum(n for e, n in estados.items() if e == 0 or e >= 500)
+        }
+    
+    reservas = por_tipo.get("agendar", [])
+    intentos = sum(1 + r.reintentos for r in reservas)
+    conflictos_servidor = sum(r.conflictos_servidor for r in reservas)
+    return {
+        "peticiones": len(resultados),
+        "por_segundo": round(len(resultados) / duracion, 2),
+        "descartadas": descartadas,
+        "tipos": tipos,
+        "reservas": {
+            "operaciones": len(reservas),
+            "peticiones": intentos,
+            "agendadas": sum(r.estado == 200 for r in reservas),
+            "rechazadas": sum(r.estado == 400 for r in reservas),
+            "conflicto_final": sum(r.estado == 409 for r in reservas),
+            "reintentos_cliente": sum(r.reintentos for r in reservas),
+            "conflictos_servidor": conflictos_servidor,
+            "conflictos_por_peticion": round(conflictos_servidor / intentos, 4) if intentos else None
+        },
+        "pool": pool
+    }
+
+
+def imprimir(informe: Dict[str, Any], args) -> None:
+    print(f"\n⚡ {informe['peticiones']} peticiones en {args.duracion:g} s → {informe['por_segundo']} req/s"
+          + (f" ({informe['descartadas']} descartadas por límite de --usuarios)" if informe["descartadas"] else ""))
+    print(f"\n{'tipo':<16} {'n':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errores':>8}")
+    for tipo, t in informe["tipos"].items():
+        print(f"{tipo:<16} {t['peticiones']:>7} {t['por_segundo']:>8} {t['p50_ms']:>9.2f} {t['p95_ms']:>9.2f} "
+              f"{t['p99_ms']:>9.2f} {t['max_ms']:>9.2f} {t['errores']:>8}")
+    r = informe["reservas"]
+    print(f"\n📅 Reservas: {r['operaciones']} tratamientos ({r['peticiones']} peticiones), {r['agendadas']} agendados, "
+          f"{r['rechazadas']} sin hueco (400), {r['conflicto_final']} en conflicto tras reintentar (409)")
+    print(f"   {r['reintentos_cliente']} reintentos del cliente, {r['conflictos_servidor']} conflictos reintentados "
+          f"en el servidor ({r['conflictos_por_peticion'] or 0:.1%} de las peticiones)")
+    p = informe["pool"]
+    if p.get("muestras"):
+        print(f"\n🔌 Pool: máx. {p['en_uso_max']}/{p['capacidad']} conexiones en uso (p95 {p['en_uso_p95']}), "
+              f"saturado en el {p['saturado_fraccion']:.1%} de {p['muestras']} muestras")
+    else:
+        print("\n🔌 Pool: sin muestras")
+
+
+# ==================== EJECUCIÓN ====================
+
+async def aplicacion_en_proceso(args):
+    """Siembra una clínica y devuelve (app, engine) con el contenedor apuntando a ella"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    
+    from app.db.base import Base
+    from app.db.instrumentacion import instrumentar_engine
+    from app.db.session import get_async_db
+    from app.main import app
+    from app.shared.container import init_container
+    
+    url = args.url_bd or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='carga_http_'), 'clinica.db')}"
+    # QueuePool también con SQLite (aiosqlite usa NullPool por defecto) para medir el tamaño del pool
+    engine = create_async_engine(
+        url, poolclass=AsyncAdaptedQueuePool, pool_size=args.pool_size, max_overflow=args.max_overflow
+    )
+    instrumentar_engine(engine.sync_engine)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    
+    print(f"🌱 Sembrando {args.pacientes} pacientes y {args.meses} meses de reservas en {engine.dialect.name}...")
+    escala = await sembrar_clinica(session_factory, args)
+    print(f"   {escala['reservas']} reservas")
+    
+    async def sesion():
+        async with session_factory() as db:
+            yield db
+    app.dependency_overrides[get_async_db] = sesion
+    init_container(session_factory=session_factory)
+    return app, engine
+
+
+async def ejecutar(args) -> Dict[str, Any]:
+    engine = None
+    if args.url:
+        cliente = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        muestreo = MuestreoPoolRemoto(httpx.AsyncClient(base_url=args.url, timeout=args.timeout))
+    else:
+        app, engine = await aplicacion_en_proceso(args)
+        cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://carga", timeout=args.timeout)
+        muestreo = MuestreoPoolLocal(engine)
+    
+    generador = GeneradorTrafico(args, random.Random(args.semilla))
+    resultados: List[Resultado] = []
+    modo = f"{args.tasa:g} req/s" if args.tasa else f"{args.usuarios} usuarios"
+    print(f"🚦 {args.duracion:g} s de tráfico mixto ({modo}) contra {args.url or 'la app en proceso'}...")
+    
+    muestreo.iniciar()
+    inicio = time.perf_counter()
+    try:
+        if args.tasa:
+            descartadas = await bucle_abierto(cliente, generador, args, resultados)
+        else:
+            await bucle_cerrado(cliente, generador, args, resultados)
+            descartadas = 0
+        duracion = time.perf_counter() - inicio
+    finally:
+        await muestreo.detener()
+        await cliente.aclose()
+        if isinstance(muestreo, MuestreoPoolRemoto):
+            await muestreo.cliente.aclose()
+        if engine is not None:
+            await engine.dispose()
+    
+    informe = resumir(resultados, duracion, descartadas, muestreo.resumen())
+    return {
+        "benchmark": "carga_http",
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "destino": args.url or "asgi",
+        "parametros": {
+            "duracion": args.duracion,
+            "usuarios": args.usuarios,
+            "tasa": args.tasa,
+            "pool_size": None if args.url else args.pool_size,
+            "max_overflow": None if args.url else args.max_overflow,
+            "mezcla": dict(MEZCLA),
+            "semilla": args.semilla
+        },
+        **informe
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="URL de un uvicorn local (por defecto, la app en este proceso)")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de carga")
+    parser.add_argument("--usuarios", type=int, default=20, help="Usuarios en bucle cerrado, o máximo en vuelo con --tasa")
+    parser.add_argument("--tasa", type=float, help="Peticiones por segundo (bucle abierto)")
+    parser.add_argument("--reintentos", type=int, default=2, help="Reintentos del cliente ante un 409")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--semanas", type=int, default=4, help="Semanas que se consultan y reservan")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", help="Archivo JSON de resultados")
+    escala = parser.add_argument_group("clínica sintética (en proceso) o la sembrada en el servidor (--url)")
+    escala.add_argument("--fisios", type=int, default=20)
+    escala.add_argument("--bloques", type=int, default=10)
+    escala.add_argument("--pacientes", type=int, default=5000)
+    escala.add_argument("--meses", type=int, default=3)
+    escala.add_argument("--llenado", type=float, default=0.7)
+    en_proceso = parser.add_argument_group("solo en proceso")
+    en_proceso.add_argument("--url-bd", help="URL asíncrona de una base de datos dedicada (se recrean sus tablas)")
+    en_proceso.add_argument("--pool-size", type=int, default=SQLALCHEMY_POOL_SIZE)
+    en_proceso.add_argument("--max-overflow", type=int, default=SQLALCHEMY_MAX_OVERFLOW)
+    args = parser.parse_args()
+    
+    informe = asyncio.run(ejecutar(args))
+    imprimir(informe, args)
+    
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Script para generar datos sintéticos de la clínica
+
+Genera un conjunto determinista (misma semilla, mismos datos) que respeta las
+reglas de agendamiento y lo carga con COPY en PostgreSQL. Las tablas deben
+existir (python init_db.py) y estar vacías, o vaciarse con --vaciar.
+
+Uso:
+    python generar_datos.py                                  # Clínica pequeña de desarrollo
+    python generar_datos.py --pacientes 100000 --fisios 40 --meses 24
+    python generar_datos.py --vaciar --semilla 7             # Reemplazar los datos actuales
+    python generar_datos.py --url sqlite+aiosqlite:///clinica.db --crear-tablas
+    python generar_datos.py --contar --meses 120             # Solo generar y contar, sin base de datos
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.config import DATABASE_URL_ASYNC
+from app.adapters.database.datos_sinteticos import (
+    EscalaDatos,
+    GeneradorDatos,
+    cargar_datos,
+    tablas_con_datos,
+    vaciar_tablas
+)
+
+
+async def generar(args, escala: EscalaDatos) -> None:
+    engine = create_async_engine(args.url)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            if args.crear_tablas:
+                await conn.run_sync(Base.metadata.create_all)
+            existentes = await conn.run_sync(lambda c: set(inspect(c).get_table_names()))
+        faltan = {t.name for t in Base.metadata.sorted_tables} - existentes
+        if faltan:
+            print(f"\n❌ Faltan tablas ({', '.join(sorted(faltan))}): ejecuta python init_db.py o usa --crear-tablas\n")
+            return
+        
+        async with session_factory() as db:
+            ocupadas = await tablas_con_datos(db)
+            if ocupadas and not args.vaciar:
+                print(f"\n❌ Las tablas ya tienen datos ({', '.join(ocupadas)}): usa --vaciar para reemplazarlos\n")
+                return
+            if ocupadas:
+                print("🗑️  Vaciando tablas...")
+                await vaciar_tablas(db)
+            
+            metodo = "COPY" if engine.dialect.driver == "asyncpg" else "INSERT por lotes"
+            print(f"🔄 Generando y cargando con {metodo} en {engine.dialect.name}...")
+            inicio = time.perf_counter()
+            totales = await cargar_datos(db, GeneradorDatos(escala))
+            segundos = time.perf_counter() - inicio
+    finally:
+        await engine.dispose()
+    
+    print("\n✅ Datos cargados:\n")
+    for tabla, filas in totales.items():
+        print(f"   • {tabla}: {filas}")
+    print(f"\n⏱️  {segundos:.1f} s ({totales['reservas'] / segundos:,.0f} reservas/s)\n")
+
+
+def contar(escala: EscalaDatos) -> None:
+    """Genera las filas sin base de datos (tamaño y coste de la generación)"""
+    inicio = time.perf_counter()
+    print("\n📊 Filas generadas:\n")
+    for modelo, _, filas in GeneradorDatos(escala).tablas():
+        print(f"   • {modelo.__tablename__}: {sum(1 for _ in filas)}")
+    print(f"\n⏱️  {time.perf_counter() - inicio:.1f} s\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    por_defecto = EscalaDatos()
+    parser.add_argument("--fisios", type=int, default=por_defecto.fisioterapeutas)
+    parser.add_argument("--pacientes", type=int, default=por_defecto.pacientes)
+    parser.add_argument("--meses", type=int, default=por_defecto.meses, help="Meses de reservas (de 30 días)")
+    parser.add_argument("--bloques", type=int, default=por_defecto.bloques)
+    parser.add_argument("--llenado", type=float, default=por_defecto.llenado, help="Fracción máxima de espacios ocupados")
+    parser.add_argument("--magneto", type=float, default=por_defecto.proporcion_magneto, help="Proporción de pacientes con magneto")
+    parser.add_argument("--trato-especial", type=float, default=por_defecto.proporcion_trato_especial)
+    parser.add_argument("--fecha-inicio", type=date.fromisoformat, default=por_defecto.fecha_inicio)
+    parser.add_argument("--semilla", type=int, default=por_defecto.semilla)
+    parser.add_argument("--url", default=DATABASE_URL_ASYNC, help="URL asíncrona (por defecto, la de DB_*)")
+    parser.add_argument("--vaciar", action="store_true", help="Borrar los datos existentes antes de cargar")
+    parser.add_argument("--crear-tablas", action="store_true", help="Crear las tablas que falten (sin Alembic)")
+    parser.add_argument("--contar", action="store_true", help="Solo generar y contar las filas")
+    args = parser.parse_args()
+    
+    try:
+        escala = EscalaDatos(
+            fisioterapeutas=args.fisios,
+            pacientes=args.pacientes,
+            meses=args.meses,
+            bloques=args.bloques,
+            llenado=args.llenado,
+            proporcion_magneto=args.magneto,
+            proporcion_trato_especial=args.trato_especial,
+            fecha_inicio=args.fecha_inicio,
+            semilla=args.semilla
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.contar:
+        contar(escala)
+    else:
+        asyncio.run(generar(args, escala))
+
+
+if __name__ == "__main__":
+    main()
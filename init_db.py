@@ -2,9 +2,10 @@
 """
 Script para inicializar la base de datos PostgreSQL
 Uso: 
-    python init_db.py         # Crear tablas
+    python init_db.py         # Crear tablas (o aplicar las migraciones pendientes)
     python init_db.py drop    # Eliminar todas las tablas
     python init_db.py reset   # Eliminar y recrear tablas
+    python init_db.py disponibilidad  # Recalcular la disponibilidad materializada
 """
 
 from app.db.session import engine
@@ -17,8 +18,10 @@ from app.adapters.database.models import (
     BloqueHorarioORM,
     ReservaORM,
     DiagnosticoORM,
-    CitaORM
+    CitaORM,
+    reconstruir_disponibilidad
 )
+from app.db.esquema import EsquemaDesactualizadoError, marcar_esquema, preparar_esquema
 
 
 def init_db():
@@ -27,7 +30,11 @@ def init_db():
     print("🔄 Creando tablas en PostgreSQL...")
     print("="*70 + "\n")
     
-    Base.metadata.create_all(bind=engine)
+    try:
+        preparar_esquema(engine)
+    except EsquemaDesactualizadoError as e:
+        print(f"❌ {e}\n")
+        return
     
     # Mostrar tablas creadas
     from sqlalchemy import inspect
@@ -42,7 +49,7 @@ def init_db():
     print("✅ Base de datos inicializada correctamente")
     print("="*70)
     print("\n💡 Para insertar datos de prueba, ejecuta:")
-    print("   psql -U postgres -d fisioterapia_db -f datos_prueba_citas.sql\n")
+    print("   python generar_datos.py\n")
 
 
 def drop_db():
@@ -55,6 +62,7 @@ def drop_db():
     
     if respuesta.lower() in ['s', 'si', 'sí', 'y', 'yes']:
         Base.metadata.drop_all(bind=engine)
+        marcar_esquema("base")
         print("\n✅ Tablas eliminadas exitosamente\n")
     else:
         print("\n❌ Operación cancelada\n")
@@ -75,6 +83,7 @@ def reset_db():
         
         print("🔄 Recreando tablas...")
         Base.metadata.create_all(bind=engine)
+        marcar_esquema()
         
         # Mostrar tablas creadas
         from sqlalchemy import inspect
@@ -89,11 +98,27 @@ def reset_db():
         print("✅ Base de datos reseteada correctamente")
         print("="*70)
         print("\n💡 Para insertar datos de prueba, ejecuta:")
-        print("   psql -U postgres -d fisioterapia_db -f datos_prueba_citas.sql\n")
+        print("   python generar_datos.py\n")
     else:
         print("\n❌ Operación cancelada\n")
 
 
+def reconstruir_disponibilidad_db():
+    """Recalcular disponibilidad_diaria desde las reservas existentes"""
+    import asyncio
+    from app.db.session import AsyncSessionLocal, async_engine
+    
+    async def reconstruir():
+        async with AsyncSessionLocal() as db:
+            bloques = await reconstruir_disponibilidad(db)
+        await async_engine.dispose()
+        return bloques
+    
+    print("\n🔄 Recalculando disponibilidad materializada...")
+    bloques = asyncio.run(reconstruir())
+    print(f"✅ {bloques} bloques con ocupación\n")
+
+
 if __name__ == "__main__":
     import sys
     
@@ -103,11 +128,14 @@ if __name__ == "__main__":
             drop_db()
         elif comando == "reset":
             reset_db()
+        elif comando == "disponibilidad":
+            reconstruir_disponibilidad_db()
         else:
             print(f"\n❌ Comando '{comando}' no reconocido")
             print("\nUso:")
-            print("  python init_db.py         # Crear tablas")
+            print("  python init_db.py         # Crear tablas (o aplicar las migraciones pendientes)")
             print("  python init_db.py drop    # Eliminar todas las tablas")
-            print("  python init_db.py reset   # Eliminar y recrear tablas\n")
+            print("  python init_db.py reset   # Eliminar y recrear tablas")
+            print("  python init_db.py disponibilidad  # Recalcular la disponibilidad materializada\n")
     else:
         init_db()
@@ -5,8 +5,7 @@ Uso: python test_postgresql.py
 """
 
 import asyncio
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal, engine
+from app.db.session import AsyncSessionLocal, engine
 from app.db.base import Base
 from app.adapters.database.models import (
     PacienteRepositoryImpl,
@@ -42,8 +41,8 @@ async def test_postgresql():
     Base.metadata.create_all(bind=engine)
     print("✅ Tablas creadas en PostgreSQL")
     
-    # Obtener sesión
-    db: Session = SessionLocal()
+    # Obtener sesión asíncrona
+    db = AsyncSessionLocal()
     
     try:
         # Test 1: Crear repositorio
@@ -107,7 +106,7 @@ async def test_postgresql():
         import traceback
         traceback.print_exc()
     finally:
-        db.close()
+        await db.close()
 
 
 if __name__ == "__main__":
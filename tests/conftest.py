@@ -0,0 +1,121 @@
+"""
+Fixtures compartidas: una clínica pequeña en SQLite (archivo temporal),
+contenedores con índice, versiones y cachés propios, como procesos distintos, y
+un cliente HTTP contra la aplicación en el mismo proceso.
+"""
+
+from datetime import time
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.adapters.api.cache_respuestas import CacheRespuestas
+from app.adapters.database.catalogos import CacheCatalogo
+from app.adapters.database.models import (
+    BloqueHorarioORM,
+    EspacioORM,
+    FisioterapeutaORM,
+    MaquinaORM,
+    PacienteORM
+)
+from app.adapters.database.versiones import VersionesReservas
+from app.db.base import Base
+from app.db.instrumentacion import instrumentar_engine
+from app.db.session import get_async_db
+from app.main import app
+from app.shared.container import Container, init_container
+
+# Fixture presupuesto_consultas (límite de consultas SQL por operación)
+pytest_plugins = ["app.shared.pytest_consultas"]
+
+FISIOTERAPEUTAS = 3
+ESPACIOS = 9
+MAQUINAS = 3
+BLOQUES = 4
+PACIENTES = 10
+# Los últimos pacientes requieren trato especial
+PACIENTES_TRATO_ESPECIAL = {9, 10}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine_async(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'clinica.db'}")
+    instrumentar_engine(engine.sync_engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine_async):
+    return async_sessionmaker(engine_async, expire_on_commit=False)
+
+
+@pytest.fixture
+async def clinica(session_factory):
+    """Catálogos y pacientes de la clínica, sin reservas"""
+    async with session_factory() as db:
+        db.add_all([FisioterapeutaORM(id=i, nombre=f"Fisio {i}") for i in range(1, FISIOTERAPEUTAS + 1)])
+        db.add_all([EspacioORM(id=i, nombre=f"Espacio {i}") for i in range(1, ESPACIOS + 1)])
+        db.add_all([MaquinaORM(id=i, codigo=f"MAQ-{i}") for i in range(1, MAQUINAS + 1)])
+        db.add_all([
+            BloqueHorarioORM(id=i, hora_inicio=time(7 + i, 0), hora_fin=time(7 + i, 40))
+            for i in range(1, BLOQUES + 1)
+        ])
+        db.add_all([
+            PacienteORM(
+                id=i,
+                nombre=f"Paciente {i}",
+                requiere_tratamiento_especial=i in PACIENTES_TRATO_ESPECIAL
+            )
+            for i in range(1, PACIENTES + 1)
+        ])
+        await db.commit()
+    return session_factory
+
+
+def servicios_propios(session_factory) -> dict:
+    """Argumentos de Container con versiones y cachés propios (como otro proceso de la API)"""
+    return dict(
+        session_factory=session_factory,
+        caches={
+            nombre: CacheCatalogo(nombre)
+            for nombre in ("espacio", "bloque_horario", "maquina", "fisioterapeuta")
+        },
+        disponibilidad_materializada=False,
+        versiones=VersionesReservas(),
+        cache_respuestas=CacheRespuestas()
+    )
+
+
+def nuevo_container(session_factory) -> Container:
+    return Container(**servicios_propios(session_factory))
+
+
+@pytest.fixture
+def container(clinica):
+    return nuevo_container(clinica)
+
+
+@pytest.fixture
+async def cliente(clinica):
+    """Cliente HTTP de la API sobre la clínica de prueba (sin lifespan: ni migraciones ni worker)"""
+    init_container(**servicios_propios(clinica))
+    
+    async def sesion():
+        async with clinica() as db:
+            yield db
+    
+    app.dependency_overrides[get_async_db] = sesion
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://prueba") as cliente:
+            yield cliente
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
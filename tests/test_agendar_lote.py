@@ -0,0 +1,45 @@
+"""
+Agenda por lotes: cada tratamiento recibe sus propias reservas aunque las
+fechas de los tratamientos se intercalen.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.domain.entities import Reserva
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_crear_muchas_devuelve_las_reservas_en_el_orden_de_entrada(container):
+    reservas = [
+        Reserva(paciente_id=1, fisioterapeuta_id=1, espacio_id=1, bloque_id=1, fecha=date(2026, 1, 14)),
+        Reserva(paciente_id=2, fisioterapeuta_id=2, espacio_id=2, bloque_id=1, fecha=date(2026, 1, 5)),
+        Reserva(paciente_id=1, fisioterapeuta_id=1, espacio_id=1, bloque_id=1, fecha=date(2026, 1, 7))
+    ]
+    async with container.scope() as scope:
+        creadas = await scope.get_repository("reserva").crear_muchas(reservas)
+    
+    assert [(r.paciente_id, r.fecha) for r in creadas] == [(r.paciente_id, r.fecha) for r in reservas]
+    assert all(r.id is not None for r in creadas)
+
+
+async def test_lote_con_fechas_intercaladas_asigna_a_cada_tratamiento_sus_reservas(container):
+    tratamientos = [
+        # Se planifica primero (más sesiones), pero empieza después que el segundo
+        {"paciente_id": 1, "fisioterapeuta_id": 1, "bloque_id": 1,
+         "fecha_inicio": date(2026, 1, 7), "total_sesiones": 4},
+        {"paciente_id": 2, "fisioterapeuta_id": 2, "bloque_id": 1,
+         "fecha_inicio": date(2026, 1, 5), "total_sesiones": 1}
+    ]
+    async with container.scope() as scope:
+        primero, segundo = await scope.get_use_case("agendar_tratamiento").ejecutar_lote(tratamientos)
+    
+    assert primero.exito and segundo.exito
+    assert [(r.paciente_id, r.fisioterapeuta_id, r.fecha) for r in primero.reservas] == [
+        (1, 1, fecha) for fecha in [date(2026, 1, 7), date(2026, 1, 8), date(2026, 1, 9), date(2026, 1, 14)]
+    ]
+    assert [(r.paciente_id, r.fisioterapeuta_id, r.fecha) for r in segundo.reservas] == [
+        (2, 2, date(2026, 1, 5))
+    ]
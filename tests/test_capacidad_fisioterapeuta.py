@@ -0,0 +1,90 @@
+"""
+Capacidad del fisioterapeuta (2 pacientes por bloque, o uno solo si requiere
+trato especial): se valida contra la base de datos al escribir, aunque otra
+petición haya reservado después de que esta planificara.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from app.adapters.database.models import CargaFisioterapeutaORM, ReservaORM
+from app.domain.entities import ConflictoReservaError, Reserva
+from tests.conftest import nuevo_container
+
+pytestmark = pytest.mark.anyio
+
+FECHA = date(2026, 1, 5)
+
+
+def reserva(paciente_id, espacio_id, fisioterapeuta_id=1, bloque_id=1, fecha=FECHA):
+    return Reserva(
+        paciente_id=paciente_id,
+        fisioterapeuta_id=fisioterapeuta_id,
+        espacio_id=espacio_id,
+        bloque_id=bloque_id,
+        fecha=fecha
+    )
+
+
+async def contar(session_factory, modelo, columna):
+    async with session_factory() as db:
+        return await db.scalar(select(func.coalesce(func.sum(columna), 0)).select_from(modelo))
+
+
+async def test_reserva_concurrente_no_permite_exceder_capacidad(container, clinica):
+    otro = nuevo_container(clinica)
+    async with container.scope() as scope, otro.scope() as scope_otro:
+        repo = scope.get_repository("reserva")
+        crear_muchas = repo.crear_muchas
+        intentos = []
+        
+        async def crear_tras_la_otra_peticion(reservas):
+            # Entre la planificación y la escritura, otra petición completa al fisioterapeuta
+            # en espacios que no chocan con los elegidos: solo la capacidad impide la reserva
+            if not intentos:
+                await scope_otro.get_repository("reserva").crear_muchas([reserva(1, 8), reserva(2, 9)])
+            intentos.append(reservas)
+            return await crear_muchas(reservas)
+        
+        repo.crear_muchas = crear_tras_la_otra_peticion
+        with pytest.raises(ValueError, match="ya tiene 2 pacientes"):
+            await scope.get_use_case("agendar_tratamiento").ejecutar(
+                paciente_id=3, fisioterapeuta_id=1, bloque_id=1, fecha_inicio=FECHA, total_sesiones=1
+            )
+    
+    # El primer intento se rechazó al escribir; el reintento ya no llegó a escribir
+    assert len(intentos) == 1
+    assert await contar(clinica, ReservaORM, 1) == 2
+
+
+async def test_repositorio_rechaza_tercer_paciente(container, clinica):
+    async with container.scope() as scope:
+        repo = scope.get_repository("reserva")
+        await repo.crear_muchas([reserva(1, 1), reserva(2, 2)])
+        
+        with pytest.raises(ConflictoReservaError, match="ya tiene 2 pacientes"):
+            await repo.crear_muchas([reserva(3, 3), reserva(3, 3, fecha=date(2026, 1, 12))])
+        with pytest.raises(ConflictoReservaError):
+            await repo.crear(reserva(4, 4))
+    
+    assert await contar(clinica, ReservaORM, 1) == 2
+    assert await contar(clinica, CargaFisioterapeutaORM, CargaFisioterapeutaORM.pacientes) == 2
+
+
+async def test_repositorio_respeta_trato_especial(container, clinica):
+    async with container.scope() as scope:
+        repo = scope.get_repository("reserva")
+        await repo.crear(reserva(9, 1))
+        
+        with pytest.raises(ConflictoReservaError, match="trato especial"):
+            await repo.crear(reserva(1, 2))
+        # Otro fisioterapeuta en el mismo bloque no se ve afectado
+        await repo.crear(reserva(1, 2, fisioterapeuta_id=2))
+        
+        otra = await repo.crear(reserva(2, 3, fisioterapeuta_id=3))
+        with pytest.raises(ConflictoReservaError, match="trato especial"):
+            await repo.actualizar(otra.id, {"fisioterapeuta_id": 1})
+    
+    assert await contar(clinica, ReservaORM, 1) == 3
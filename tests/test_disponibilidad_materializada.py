@@ -0,0 +1,99 @@
+"""
+Disponibilidad materializada: reconstrucción desde las reservas
+(``python init_db.py disponibilidad``) y descuento exacto al eliminar.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from app.adapters.database.models import (
+    CargaFisioterapeutaORM,
+    DisponibilidadDiariaORM,
+    ReservaORM,
+    reconstruir_disponibilidad
+)
+from app.domain.entities import ConflictoReservaError, Reserva
+from tests.conftest import nuevo_container
+
+pytestmark = pytest.mark.anyio
+
+FECHA = date(2026, 1, 5)
+
+
+def reserva(paciente_id, espacio_id, fisioterapeuta_id=1, maquina_id=None):
+    return Reserva(
+        paciente_id=paciente_id,
+        fisioterapeuta_id=fisioterapeuta_id,
+        espacio_id=espacio_id,
+        bloque_id=1,
+        maquina_id=maquina_id,
+        fecha=FECHA
+    )
+
+
+async def test_sin_reservas_queda_vacia(container, clinica):
+    async with clinica() as db:
+        assert await reconstruir_disponibilidad(db) == 0
+
+
+async def test_se_recalcula_desde_las_reservas(container, clinica):
+    async with container.scope() as scope:
+        await scope.get_repository("reserva").crear_muchas([
+            reserva(1, 1, maquina_id=1), reserva(2, 2), reserva(9, 3, fisioterapeuta_id=2)
+        ])
+    async with clinica() as db:
+        # Tablas perdidas o desajustadas respecto de las reservas
+        await db.execute(delete(CargaFisioterapeutaORM))
+        await db.execute(update(DisponibilidadDiariaORM).values(espacios_ocupados=0))
+        await db.commit()
+        
+        assert await reconstruir_disponibilidad(db) == 1
+        
+        bloque = (await db.execute(select(DisponibilidadDiariaORM))).scalar_one()
+        assert (bloque.espacios_ocupados, bloque.maquinas_en_uso) == (3, 1)
+        cargas = await db.execute(
+            select(
+                CargaFisioterapeutaORM.fisioterapeuta_id,
+                CargaFisioterapeutaORM.pacientes,
+                CargaFisioterapeutaORM.pacientes_trato_especial
+            ).order_by(CargaFisioterapeutaORM.fisioterapeuta_id)
+        )
+        assert cargas.all() == [(1, 2, 0), (2, 1, 1)]
+    
+    # Con la carga recuperada, la capacidad del fisioterapeuta vuelve a respetarse
+    async with container.scope() as scope:
+        with pytest.raises(ConflictoReservaError):
+            await scope.get_repository("reserva").crear(reserva(3, 4))
+
+
+async def ocupacion(session_factory):
+    async with session_factory() as db:
+        espacios = await db.scalar(select(func.coalesce(func.sum(DisponibilidadDiariaORM.espacios_ocupados), 0)))
+        pacientes = await db.scalar(select(func.coalesce(func.sum(CargaFisioterapeutaORM.pacientes), 0)))
+    return espacios, pacientes
+
+
+async def test_eliminar_descuenta_cada_reserva_una_sola_vez(container, clinica):
+    async with container.scope() as scope:
+        creadas = await scope.get_repository("reserva").crear_muchas([reserva(1, 1), reserva(2, 2)])
+    
+    # Dos peticiones eliminan la misma reserva: solo una la borra y la descuenta
+    async with container.scope() as scope, nuevo_container(clinica).scope() as otro:
+        assert await scope.get_repository("reserva").eliminar(creadas[0].id) is True
+        assert await otro.get_repository("reserva").eliminar(creadas[0].id) is False
+    
+    assert await ocupacion(clinica) == (1, 1)
+
+
+async def test_eliminar_paciente_descuenta_sus_reservas(container, clinica):
+    async with container.scope() as scope:
+        await scope.get_repository("reserva").crear_muchas([
+            reserva(1, 1), reserva(1, 2, fisioterapeuta_id=2), reserva(2, 3)
+        ])
+        assert await scope.get_repository("paciente").eliminar(1) is True
+    
+    assert await ocupacion(clinica) == (1, 1)
+    async with clinica() as db:
+        assert await db.scalar(select(func.count()).select_from(ReservaORM)) == 1
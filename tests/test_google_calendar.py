@@ -0,0 +1,190 @@
+"""
+CalendarioGoogle con un transporte HTTP falso (http_factory): inserción de
+eventos en peticiones batch, errores por evento y documento de descubrimiento
+guardado en disco.
+"""
+
+import json
+
+import httplib2
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
+
+from app.adapters.external import google_calendar
+from app.adapters.external.google_calendar import CalendarioGoogle, construir_servicio
+
+pytestmark = pytest.mark.anyio
+
+# Documento de descubrimiento de Calendar v3 reducido a events.insert
+DOCUMENTO_CALENDAR = {
+    "kind": "discovery#restDescription",
+    "discoveryVersion": "v1",
+    "id": "calendar:v3",
+    "name": "calendar",
+    "version": "v3",
+    "protocol": "rest",
+    "rootUrl": "https://www.googleapis.com/",
+    "servicePath": "calendar/v3/",
+    "baseUrl": "https://www.googleapis.com/calendar/v3/",
+    "batchPath": "batch/calendar/v3",
+    "parameters": {},
+    "schemas": {
+        "Event": {
+            "id": "Event",
+            "type": "object",
+            "properties": {"id": {"type": "string"}, "summary": {"type": "string"}}
+        }
+    },
+    "resources": {
+        "events": {
+            "methods": {
+                "insert": {
+                    "id": "calendar.events.insert",
+                    "path": "calendars/{calendarId}/events",
+                    "httpMethod": "POST",
+                    "parameters": {
+                        "calendarId": {"type": "string", "required": True, "location": "path"},
+                        "sendUpdates": {"type": "string", "location": "query"}
+                    },
+                    "parameterOrder": ["calendarId"],
+                    "request": {"$ref": "Event"},
+                    "response": {"$ref": "Event"}
+                }
+            }
+        }
+    }
+}
+
+FRONTERA = "batch_respuesta"
+
+
+def respuesta_batch(partes):
+    """Respuesta multipart de un batch: ``partes`` es [(request_id, estado, cuerpo)]"""
+    cuerpo = ""
+    for request_id, estado, contenido in partes:
+        cuerpo += (
+            f"--{FRONTERA}\r\n"
+            "Content-Type: application/http\r\n"
+            "Content-Transfer-Encoding: binary\r\n"
+            f"Content-ID: <response-lote + {request_id}>\r\n"
+            "\r\n"
+            f"HTTP/1.1 {estado}\r\n"
+            "Content-Type: application/json\r\n"
+            "\r\n"
+            f"{json.dumps(contenido)}\r\n"
+        )
+    cuerpo += f"--{FRONTERA}--"
+    return {"status": "200", "content-type": f"multipart/mixed; boundary={FRONTERA}"}, cuerpo
+
+
+def evento(numero):
+    return {"summary": f"Sesión {numero}"}
+
+
+@pytest.fixture
+def service():
+    return build_from_document(DOCUMENTO_CALENDAR, http=httplib2.Http())
+
+
+async def test_crear_eventos_agrupa_en_lotes(service):
+    transporte = HttpMockSequence([
+        respuesta_batch([(0, "200 OK", {"id": "evt-0"}), (1, "200 OK", {"id": "evt-1"})]),
+        respuesta_batch([(2, "200 OK", {"id": "evt-2"})])
+    ])
+    transportes = []
+    
+    def http_factory():
+        transportes.append(transporte)
+        return transporte
+    
+    calendario = CalendarioGoogle(service=service, calendar_id="clinica", http_factory=http_factory, tamano_lote=2)
+    
+    assert await calendario.crear_eventos([evento(i) for i in range(3)]) == ["evt-0", "evt-1", "evt-2"]
+    # Un transporte por operación y una petición batch por cada lote de 2
+    assert len(transportes) == 1
+    assert [uri for uri, *_ in transporte.request_sequence] == [
+        "https://www.googleapis.com/batch/calendar/v3"
+    ] * 2
+    _, _, cuerpo, _ = transporte.request_sequence[0]
+    assert "POST /calendar/v3/calendars/clinica/events?sendUpdates=all" in cuerpo
+
+
+async def test_error_de_un_evento_no_impide_los_demas(service):
+    transporte = HttpMockSequence([
+        respuesta_batch([
+            (0, "200 OK", {"id": "evt-0"}),
+            (1, "403 Forbidden", {"error": {"code": 403, "message": "Rate Limit Exceeded"}}),
+            (2, "200 OK", {"id": "evt-2"})
+        ])
+    ])
+    calendario = CalendarioGoogle(service=service, http_factory=lambda: transporte)
+    
+    resultados = await calendario.crear_eventos([evento(i) for i in range(3)])
+    
+    assert resultados[0] == "evt-0"
+    assert isinstance(resultados[1], HttpError)
+    assert resultados[1].resp.status == 403
+    assert resultados[2] == "evt-2"
+
+
+async def test_evento_con_id_que_ya_existe_cuenta_como_creado(service):
+    transporte = HttpMockSequence([
+        respuesta_batch([
+            (0, "409 Conflict", {"error": {"code": 409, "message": "The requested identifier already exists."}}),
+            (1, "409 Conflict", {"error": {"code": 409, "message": "The requested identifier already exists."}})
+        ])
+    ])
+    calendario = CalendarioGoogle(service=service, http_factory=lambda: transporte)
+    
+    resultados = await calendario.crear_eventos([{**evento(0), "id": "fisio000001"}, evento(1)])
+    
+    assert resultados[0] == "fisio000001"
+    # Sin id propio, un 409 sigue siendo un error
+    assert isinstance(resultados[1], HttpError)
+    _, _, cuerpo, _ = transporte.request_sequence[0]
+    assert '"id": "fisio000001"' in cuerpo
+
+
+async def test_sin_eventos_no_hay_peticiones(service):
+    calendario = CalendarioGoogle(service=service, http_factory=lambda: pytest.fail("no debe abrir transporte"))
+    
+    assert await calendario.crear_eventos([]) == []
+
+
+def test_documento_de_descubrimiento_se_descarga_una_vez(tmp_path, monkeypatch):
+    ruta = tmp_path / "descubrimiento" / "calendar_v3.json"
+    descargas = []
+    
+    def build(*args, **kwargs):
+        descargas.append(args)
+        return build_from_document(DOCUMENTO_CALENDAR, http=httplib2.Http())
+    
+    monkeypatch.setattr(google_calendar, "build", build)
+    credenciales = AnonymousCredentials()
+    
+    primero = construir_servicio(credenciales, ruta_cache=str(ruta))
+    segundo = construir_servicio(credenciales, ruta_cache=str(ruta))
+    
+    assert descargas == [("calendar", "v3")]
+    assert json.loads(ruta.read_text(encoding="utf-8"))["id"] == "calendar:v3"
+    assert hasattr(primero, "events") and hasattr(segundo, "events")
+
+
+def test_documento_de_descubrimiento_corrupto_se_vuelve_a_descargar(tmp_path, monkeypatch):
+    ruta = tmp_path / "calendar_v3.json"
+    ruta.write_text("{no es json", encoding="utf-8")
+    descargas = []
+    
+    def build(*args, **kwargs):
+        descargas.append(args)
+        return build_from_document(DOCUMENTO_CALENDAR, http=httplib2.Http())
+    
+    monkeypatch.setattr(google_calendar, "build", build)
+    
+    construir_servicio(AnonymousCredentials(), ruta_cache=str(ruta))
+    
+    assert len(descargas) == 1
+    assert json.loads(ruta.read_text(encoding="utf-8"))["id"] == "calendar:v3"
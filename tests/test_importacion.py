@@ -0,0 +1,58 @@
+"""
+Importación masiva: validación por filas, carga por lotes y lectura del archivo
+fuera del bucle de eventos.
+"""
+
+import io
+import threading
+
+import pytest
+from fastapi import UploadFile
+
+from app.adapters.api.importacion import importar_archivo
+from app.domain.entities import Paciente
+from app.schemas.fisioterapia import PacienteCreate
+
+pytestmark = pytest.mark.anyio
+
+
+def archivo_csv(filas):
+    contenido = "nombre,telefono,usa_magneto\n" + "".join(f"{fila}\n" for fila in filas)
+    return UploadFile(io.BytesIO(contenido.encode("utf-8")), filename="pacientes.csv")
+
+
+async def test_las_filas_se_leen_en_un_hilo_y_se_cargan_por_lotes():
+    hilos_lectura = set()
+    lotes = []
+    
+    def a_entidad(datos):
+        hilos_lectura.add(threading.get_ident())
+        return Paciente(**datos)
+    
+    async def cargar_lote(pacientes):
+        lotes.append([p.nombre for p in pacientes])
+        return len(pacientes)
+    
+    resultado = await importar_archivo(
+        archivo_csv(["Ana,600,true", ",601,false", "Luis,no,false", "Eva,,false", "Juan,602,true"]),
+        "csv", PacienteCreate, a_entidad, cargar_lote, tamano_lote=2
+    )
+    
+    assert lotes == [["Ana", "Eva"], ["Juan"]]
+    assert (resultado.total_filas, resultado.importados) == (5, 3)
+    assert [e.fila for e in resultado.errores] == [2, 3]
+    assert threading.get_ident() not in hilos_lectura
+
+
+async def test_importar_pacientes_por_la_api(cliente):
+    contenido = '{"nombre": "Ana"}\n{"nombre": ""}\nno es json\n{"nombre": "Eva", "usa_magneto": true}\n'
+    
+    respuesta = await cliente.post(
+        "/api/pacientes/bulk",
+        files={"archivo": ("pacientes.ndjson", contenido.encode("utf-8"), "application/x-ndjson")}
+    )
+    
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert (cuerpo["total_filas"], cuerpo["importados"]) == (4, 2)
+    assert [e["fila"] for e in cuerpo["errores"]] == [2, 3]
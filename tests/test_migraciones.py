@@ -0,0 +1,169 @@
+"""
+Migraciones de Alembic: el esquema base más las revisiones posteriores llegan
+exactamente a los modelos, también desde una base de datos anterior a ellas.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from app.db.base import Base
+import app.adapters.database.models  # noqa: F401 - registra las tablas en Base.metadata
+from app.db.esquema import (
+    REVISION_BASE,
+    EsquemaDesactualizadoError,
+    configuracion_alembic,
+    marcar_esquema,
+    preparar_esquema,
+    revisiones_esperadas
+)
+
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migraciones.db'}"
+
+
+@pytest.fixture
+def engine(url):
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+def diferencias(engine):
+    with engine.connect() as conn:
+        return compare_metadata(MigrationContext.configure(conn), Base.metadata)
+
+
+def revision(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def crear_base_anterior(url, engine):
+    """Base de datos como la dejaba create_all antes de las migraciones: esquema 0001 sin revisión"""
+    command.upgrade(configuracion_alembic(url), REVISION_BASE)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+        conn.execute(text("INSERT INTO pacientes (id, nombre) VALUES (1, 'Ana')"))
+        conn.execute(text("INSERT INTO fisioterapeutas (id, nombre) VALUES (1, 'Luis')"))
+        conn.execute(text("INSERT INTO espacios (id, nombre) VALUES (1, 'Espacio 1')"))
+        conn.execute(text("INSERT INTO bloques_horarios (id, hora_inicio, hora_fin) VALUES (1, '08:00:00', '08:40:00')"))
+        conn.execute(
+            text("INSERT INTO reservas (paciente_id, fisioterapeuta_id, espacio_id, bloque_id, fecha) "
+                 "VALUES (1, 1, 1, 1, :fecha)"),
+            {"fecha": date(2026, 1, 5)}
+        )
+        conn.execute(
+            text("INSERT INTO citas (titulo, inicio, fin, google_event_id) VALUES ('Sesión', :inicio, :fin, 'evt-1')"),
+            {"inicio": datetime(2026, 1, 5, 8), "fin": datetime(2026, 1, 5, 9)}
+        )
+
+
+def test_upgrade_head_coincide_con_los_modelos(url, engine):
+    command.upgrade(configuracion_alembic(url), "head")
+    
+    assert diferencias(engine) == []
+    assert revision(engine) in revisiones_esperadas()
+
+
+def test_downgrade_y_upgrade_completos(url, engine):
+    config = configuracion_alembic(url)
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+    command.upgrade(config, "head")
+    
+    assert diferencias(engine) == []
+
+
+def test_base_anterior_se_marca_con_la_revision_base_y_se_actualiza(url, engine):
+    crear_base_anterior(url, engine)
+    
+    with pytest.raises(EsquemaDesactualizadoError, match=f"alembic stamp {REVISION_BASE}"):
+        preparar_esquema(engine)
+    
+    marcar_esquema(REVISION_BASE, url=url)
+    command.upgrade(configuracion_alembic(url), "head")
+    
+    assert diferencias(engine) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM reservas")).scalar() == 1
+        assert conn.execute(text("SELECT google_event_id FROM citas")).scalar() == "evt-1"
+        # Los pacientes sin fecha de alta la reciben al migrar (clave de la paginación por cursor)
+        assert conn.execute(text("SELECT count(*) FROM pacientes WHERE created_at IS NULL")).scalar() == 0
+        # La disponibilidad materializada se carga desde las reservas existentes
+        assert conn.execute(text(
+            "SELECT bloque_id, espacios_ocupados, maquinas_en_uso FROM disponibilidad_diaria"
+        )).all() == [(1, 1, 0)]
+        assert conn.execute(text(
+            "SELECT bloque_id, fisioterapeuta_id, pacientes, pacientes_trato_especial "
+            "FROM carga_fisioterapeuta_bloque"
+        )).all() == [(1, 1, 1, 0)]
+        # google_event_id ya admite NULL (citas con el evento pendiente en el outbox)
+        conn.execute(
+            text("INSERT INTO citas (titulo, inicio, fin) VALUES ('Pendiente', :inicio, :fin)"),
+            {"inicio": datetime(2026, 1, 6, 8), "fin": datetime(2026, 1, 6, 9)}
+        )
+
+
+def test_reservas_duplicadas_detienen_la_migracion_sin_borrar_nada(url, engine):
+    config = configuracion_alembic(url)
+    command.upgrade(config, "0002")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO pacientes (id, nombre) VALUES (1, 'Ana')"))
+        conn.execute(text("INSERT INTO fisioterapeutas (id, nombre) VALUES (1, 'Luis')"))
+        conn.execute(text("INSERT INTO espacios (id, nombre) VALUES (1, 'Espacio 1'), (2, 'Espacio 2'), (3, 'Espacio 3')"))
+        conn.execute(text("INSERT INTO maquinas (id, codigo) VALUES (1, 'MAQ-1')"))
+        conn.execute(text("INSERT INTO bloques_horarios (id, hora_inicio, hora_fin) "
+                          "VALUES (1, '08:00:00', '08:40:00'), (2, '09:00:00', '09:40:00')"))
+        for reserva_id, espacio_id, bloque_id, maquina_id in [
+            (1, 1, 1, None),
+            (2, 1, 1, None),  # mismo espacio
+            (3, 2, 1, 1),
+            (4, 3, 1, 1),     # misma máquina
+            (5, 1, 2, None)
+        ]:
+            conn.execute(
+                text("INSERT INTO reservas (id, paciente_id, fisioterapeuta_id, espacio_id, bloque_id, maquina_id, fecha) "
+                     "VALUES (:id, 1, 1, :espacio, :bloque, :maquina, :fecha)"),
+                {"id": reserva_id, "espacio": espacio_id, "bloque": bloque_id,
+                 "maquina": maquina_id, "fecha": date(2026, 1, 5)}
+            )
+    
+    with pytest.raises(RuntimeError) as error:
+        command.upgrade(config, "head")
+    
+    assert "fecha=2026-01-05 bloque_id=1 espacio_id=1: reservas [1, 2]" in str(error.value)
+    assert "fecha=2026-01-05 bloque_id=1 maquina_id=1: reservas [3, 4]" in str(error.value)
+    assert revision(engine) == "0002"
+    with engine.connect() as conn:
+        ids = conn.execute(text("SELECT id FROM reservas ORDER BY id")).scalars().all()
+    assert ids == [1, 2, 3, 4, 5]
+    
+    # Resueltos los conflictos, la migración continúa
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE reservas SET bloque_id = 2, espacio_id = 2 WHERE id = 2"))
+        conn.execute(text("UPDATE reservas SET maquina_id = NULL WHERE id = 4"))
+    command.upgrade(config, "head")
+    assert diferencias(engine) == []
+
+
+def test_preparar_esquema_crea_las_tablas_en_una_base_vacia(engine):
+    assert preparar_esquema(engine) in revisiones_esperadas()
+    
+    assert diferencias(engine) == []
+    assert revision(engine) in revisiones_esperadas()
+
+
+def test_preparar_esquema_aplica_las_migraciones_pendientes(url, engine):
+    command.upgrade(configuracion_alembic(url), REVISION_BASE)
+    
+    preparar_esquema(engine)
+    
+    assert diferencias(engine) == []
+    assert revision(engine) in revisiones_esperadas()
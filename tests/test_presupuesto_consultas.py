@@ -0,0 +1,74 @@
+"""
+Presupuesto de consultas SQL de las rutas más usadas: no puede crecer con el
+tamaño del rango, del lote ni de la página (sin N+1), ni repetir una sentencia.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.domain.entities import Reserva
+
+pytestmark = pytest.mark.anyio
+
+
+def tratamientos(total):
+    """``total`` tratamientos de 4 sesiones que caben juntos en la clínica de prueba"""
+    return [
+        {
+            "paciente_id": i,
+            "fisioterapeuta_id": 1 + i % 3,
+            "bloque_id": 1 + i % 4,
+            "fecha_inicio": "2026-02-02",
+            "total_sesiones": 4,
+            "requiere_maquina": i % 2 == 0
+        }
+        for i in range(1, total + 1)
+    ]
+
+
+@pytest.mark.parametrize("dias", [7, 31])
+async def test_disponibilidad(cliente, container, presupuesto_consultas, dias):
+    async with container.scope() as scope:
+        await scope.get_repository("reserva").crear_muchas([
+            Reserva(paciente_id=1, fisioterapeuta_id=1, espacio_id=1, bloque_id=1, fecha=date(2026, 1, 5)),
+            Reserva(paciente_id=2, fisioterapeuta_id=1, espacio_id=2, bloque_id=2, fecha=date(2026, 1, 6))
+        ])
+    params = {
+        "fecha_inicio": "2026-01-05",
+        "fecha_fin": date.fromordinal(date(2026, 1, 5).toordinal() + dias - 1).isoformat(),
+        "paciente_id": 1,
+        "fisioterapeuta_id": 1
+    }
+    
+    with presupuesto_consultas(maximo=4, repeticiones=1):
+        respuesta = await cliente.get("/api/citas/disponibles", params=params)
+    assert respuesta.status_code == 200
+    assert respuesta.json()["total_bloques"] == dias * 4
+    
+    # Sin reservas nuevas en el rango, la respuesta sale de la caché
+    with presupuesto_consultas(maximo=0):
+        assert (await cliente.get("/api/citas/disponibles", params=params)).status_code == 200
+
+
+@pytest.mark.parametrize("total", [1, 10])
+async def test_agendar_lote(cliente, presupuesto_consultas, total):
+    # Catálogos, pacientes, fisioterapeutas, ocupación e inserciones: igual con 1 que con 10
+    with presupuesto_consultas(maximo=12, repeticiones=1):
+        respuesta = await cliente.post("/api/citas/agendar/lote", json={"tratamientos": tratamientos(total)})
+    
+    assert respuesta.status_code == 200
+    assert respuesta.json()["total_agendados"] == total
+    assert respuesta.json()["total_sesiones_agendadas"] == total * 4
+
+
+async def test_listado_de_pacientes(cliente, presupuesto_consultas):
+    with presupuesto_consultas(maximo=1):
+        primera = await cliente.get("/api/pacientes/", params={"limit": 4})
+    assert len(primera.json()["items"]) == 4
+    
+    with presupuesto_consultas(maximo=1):
+        siguiente = await cliente.get(
+            "/api/pacientes/", params={"limit": 4, "cursor": primera.json()["next_cursor"]}
+        )
+    assert [p["id"] for p in siguiente.json()["items"]] == [5, 6, 7, 8]
@@ -0,0 +1,47 @@
+"""
+Reserva optimista: si otra petición confirma antes el mismo espacio, la
+restricción única de reservas rechaza la inserción y el caso de uso vuelve a
+planificar con el siguiente espacio libre.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.db.instrumentacion import medir_proceso
+from tests.conftest import nuevo_container
+
+pytestmark = pytest.mark.anyio
+
+FECHA = date(2026, 1, 5)
+
+
+async def test_reservas_concurrentes_del_mismo_espacio_reintentan(container, clinica):
+    otro = nuevo_container(clinica)
+    async with container.scope() as scope, otro.scope() as scope_otro:
+        repo = scope.get_repository("reserva")
+        crear_muchas = repo.crear_muchas
+        intentos = []
+        
+        async def crear_tras_la_otra_peticion(reservas):
+            # La otra petición confirma entre la planificación y la escritura de esta
+            if not intentos:
+                await scope_otro.get_use_case("agendar_tratamiento").ejecutar(
+                    paciente_id=2, fisioterapeuta_id=2, bloque_id=1, fecha_inicio=FECHA, total_sesiones=1
+                )
+            intentos.append([r.espacio_id for r in reservas])
+            return await crear_muchas(reservas)
+        
+        repo.crear_muchas = crear_tras_la_otra_peticion
+        with medir_proceso(detectar=False) as medicion:
+            creadas = await scope.get_use_case("agendar_tratamiento").ejecutar(
+                paciente_id=1, fisioterapeuta_id=1, bloque_id=1, fecha_inicio=FECHA, total_sesiones=1
+            )
+    
+    assert intentos == [[1], [2]]
+    assert medicion.conflictos == 1
+    assert [r.espacio_id for r in creadas] == [2]
+    
+    async with container.scope() as scope:
+        reservas = await scope.get_repository("reserva").listar_por_rango(FECHA, FECHA)
+    assert sorted((r.paciente_id, r.espacio_id) for r in reservas) == [(1, 2), (2, 1)]
@@ -0,0 +1,192 @@
+"""
+SincronizadorCalendario contra un calendario falso: envío del outbox, reintentos
+con backoff y reclamo de lotes sin bloqueos abiertos durante la llamada a Google.
+
+La prueba de SKIP LOCKED necesita PostgreSQL: solo corre si DATABASE_URL_PRUEBAS
+apunta a una base dedicada (postgresql+asyncpg://...); sus tablas se recrean.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.adapters.database.models import CitaORM, CitaRepositoryImpl, OutboxCalendarioORM
+from app.adapters.external.sincronizador_calendario import SincronizadorCalendario
+from app.db.base import Base
+from app.domain.entities import Cita
+from app.domain.ports import ServicioCalendario
+
+pytestmark = pytest.mark.anyio
+
+DATABASE_URL_PRUEBAS = os.getenv("DATABASE_URL_PRUEBAS")
+
+
+class CalendarioFalso(ServicioCalendario):
+    """Devuelve las respuestas preparadas (una lista por llamada, o una excepción)"""
+    
+    def __init__(self, *respuestas, durante_envio=None):
+        self.respuestas = list(respuestas)
+        self.llamadas = []
+        self.durante_envio = durante_envio
+    
+    async def crear_eventos(self, eventos):
+        self.llamadas.append(eventos)
+        if self.durante_envio:
+            await self.durante_envio()
+        respuesta = self.respuestas.pop(0)
+        if isinstance(respuesta, BaseException):
+            raise respuesta
+        return respuesta
+
+
+async def encolar(session_factory, total):
+    async with session_factory() as db:
+        citas = [
+            Cita(titulo=f"Sesión {i}", inicio=datetime(2026, 1, 5, 8 + i), fin=datetime(2026, 1, 5, 9 + i))
+            for i in range(total)
+        ]
+        await CitaRepositoryImpl(db).crear_con_evento_pendiente(
+            citas, [{"summary": cita.titulo} for cita in citas]
+        )
+
+
+async def outbox(session_factory):
+    async with session_factory() as db:
+        result = await db.execute(select(OutboxCalendarioORM).order_by(OutboxCalendarioORM.id))
+        return list(result.scalars().all())
+
+
+async def eventos_google(session_factory):
+    async with session_factory() as db:
+        result = await db.execute(select(CitaORM.google_event_id).order_by(CitaORM.id))
+        return list(result.scalars().all())
+
+
+async def test_envia_el_outbox_y_completa_las_citas(session_factory):
+    await encolar(session_factory, 2)
+    calendario = CalendarioFalso(["evt-0", "evt-1"])
+    sincronizador = SincronizadorCalendario(session_factory, calendario)
+    
+    assert await sincronizador.procesar_lote() == 2
+    
+    assert calendario.llamadas == [[
+        {"summary": "Sesión 0", "id": "fisio000001"},
+        {"summary": "Sesión 1", "id": "fisio000002"}
+    ]]
+    assert await eventos_google(session_factory) == ["evt-0", "evt-1"]
+    assert [(e.estado, e.intentos) for e in await outbox(session_factory)] == [("enviado", 1)] * 2
+    assert sincronizador.enviados == 2
+    assert await sincronizador.procesar_lote() == 0
+
+
+async def test_fallos_se_reintentan_con_backoff_hasta_agotar_los_intentos(session_factory):
+    await encolar(session_factory, 2)
+    calendario = CalendarioFalso(
+        [RuntimeError("503 Backend Error"), "evt-1"],
+        ConnectionError("sin red")
+    )
+    sincronizador = SincronizadorCalendario(
+        session_factory, calendario, max_intentos=2, backoff_base=10, backoff_max=60
+    )
+    
+    antes = datetime.utcnow()
+    assert await sincronizador.procesar_lote() == 2
+    fallido, enviado = await outbox(session_factory)
+    assert (fallido.estado, fallido.intentos, fallido.ultimo_error) == ("pendiente", 1, "503 Backend Error")
+    # Primer reintento: base * 2^0 con jitter entre 0.5 y 1
+    assert antes + timedelta(seconds=5) <= fallido.proximo_intento <= datetime.utcnow() + timedelta(seconds=10)
+    assert enviado.estado == "enviado"
+    assert await eventos_google(session_factory) == [None, "evt-1"]
+    
+    # Hasta que vence el backoff no se vuelve a enviar
+    assert await sincronizador.procesar_lote() == 0
+    
+    async with session_factory() as db:
+        await db.execute(update(OutboxCalendarioORM).values(proximo_intento=datetime.utcnow()))
+        await db.commit()
+    assert await sincronizador.procesar_lote() == 1
+    fallido, _ = await outbox(session_factory)
+    assert (fallido.estado, fallido.intentos, fallido.ultimo_error) == ("fallido", 2, "sin red")
+    assert sincronizador.fallidos == 1
+    assert len(calendario.llamadas) == 2
+    # El reintento lleva el mismo id: si el primer envío llegó, Google lo rechaza como duplicado
+    assert calendario.llamadas[1] == [calendario.llamadas[0][0]]
+
+
+async def test_el_lote_se_reclama_antes_de_llamar_a_google(session_factory):
+    await encolar(session_factory, 2)
+    otro_worker = SincronizadorCalendario(session_factory, CalendarioFalso())
+    durante = {}
+    
+    async def durante_envio():
+        # El reclamo ya está confirmado: otra sesión lo ve y otro worker no lo toma
+        durante["plazos"] = [e.proximo_intento for e in await outbox(session_factory)]
+        durante["otro_worker"] = await otro_worker.procesar_lote()
+    
+    sincronizador = SincronizadorCalendario(
+        session_factory, CalendarioFalso(["evt-0", "evt-1"], durante_envio=durante_envio), plazo_envio=300
+    )
+    
+    antes = datetime.utcnow()
+    assert await sincronizador.procesar_lote() == 2
+    
+    assert all(plazo >= antes + timedelta(seconds=300) for plazo in durante["plazos"])
+    assert durante["otro_worker"] == 0
+    assert await eventos_google(session_factory) == ["evt-0", "evt-1"]
+
+
+async def test_worker_caido_durante_el_envio_se_recupera_al_vencer_el_plazo(session_factory):
+    await encolar(session_factory, 1)
+    caido = SincronizadorCalendario(session_factory, CalendarioFalso(asyncio.CancelledError()), plazo_envio=300)
+    
+    with pytest.raises(asyncio.CancelledError):
+        await caido.procesar_lote()
+    
+    (evento,) = await outbox(session_factory)
+    assert (evento.estado, evento.intentos) == ("pendiente", 0)
+    
+    sincronizador = SincronizadorCalendario(session_factory, CalendarioFalso(["evt-0"]))
+    assert await sincronizador.procesar_lote() == 0
+    async with session_factory() as db:
+        await db.execute(update(OutboxCalendarioORM).values(proximo_intento=datetime.utcnow()))
+        await db.commit()
+    assert await sincronizador.procesar_lote() == 1
+    assert await eventos_google(session_factory) == ["evt-0"]
+
+
+@pytest.fixture
+async def session_factory_postgres():
+    if not DATABASE_URL_PRUEBAS:
+        pytest.skip("DATABASE_URL_PRUEBAS no está definida (base PostgreSQL dedicada)")
+    engine = create_async_engine(DATABASE_URL_PRUEBAS)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_skip_locked_omite_los_eventos_que_otro_worker_esta_reclamando(session_factory_postgres):
+    session_factory = session_factory_postgres
+    await encolar(session_factory, 3)
+    calendario = CalendarioFalso(["evt-1", "evt-2"])
+    sincronizador = SincronizadorCalendario(session_factory, calendario)
+    
+    async with session_factory() as otro:
+        # Otro worker tiene el primer evento bloqueado (a mitad de su reclamo)
+        await otro.execute(
+            select(OutboxCalendarioORM).order_by(OutboxCalendarioORM.id).limit(1).with_for_update()
+        )
+        procesados = await asyncio.wait_for(sincronizador.procesar_lote(), timeout=10)
+        await otro.rollback()
+    
+    assert procesados == 2
+    assert calendario.llamadas == [[
+        {"summary": "Sesión 1", "id": "fisio000002"},
+        {"summary": "Sesión 2", "id": "fisio000003"}
+    ]]
+    assert await eventos_google(session_factory) == [None, "evt-1", "evt-2"]
@@ -0,0 +1,35 @@
+"""
+Versiones de reservas por fecha: acotadas y sin invalidar de menos.
+"""
+
+from datetime import date, timedelta
+
+from app.adapters.database.versiones import VersionesReservas
+
+
+def dia(n):
+    return date(2026, 1, 1) + timedelta(days=n)
+
+
+def test_la_version_de_un_rango_solo_cambia_con_sus_fechas():
+    versiones = VersionesReservas()
+    versiones.incrementar([dia(10)])
+    antes = versiones.version(dia(0), dia(5))
+    
+    versiones.incrementar([dia(20)])
+    assert versiones.version(dia(0), dia(5)) == antes
+    assert versiones.version(dia(15), dia(25)) > versiones.version(dia(0), dia(12))
+    
+    versiones.incrementar()
+    assert versiones.version(dia(0), dia(5)) > antes
+
+
+def test_las_fechas_descartadas_pasan_a_la_version_global():
+    versiones = VersionesReservas(maximo_fechas=3)
+    for n in range(10):
+        versiones.incrementar([dia(n)])
+    
+    assert len(versiones._por_fecha) == 3
+    assert versiones.version(dia(9), dia(9)) == 10
+    # Las fechas antiguas ya no tienen número propio, pero nunca bajan del que tenían
+    assert versiones.version(dia(0), dia(0)) >= 7
@@ -10,7 +10,7 @@ try:
     from app.adapters.api.routes.pacientes import router as pacientes_router
     from app.adapters.api.routes.citas import router as citas_router
     from app.adapters.database.models import PacienteRepositoryImpl, CitaORM
-    from app.adapters.external.google_calendar import calendar_service
+    from app.adapters.external.google_calendar import obtener_calendario
     from app.shared.schemas import CitaResponse, PacienteResponse
     from app.domain.entities import Paciente
     from app.domain.usecases import CrearPaciente